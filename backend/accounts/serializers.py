@@ -90,8 +90,8 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_active_elections_vote_status(self, obj) -> dict:
         try:
-            from elections.models import Vote
-            return Vote.get_user_active_election_vote_map(obj)
+            from elections.voter_state import get_user_vote_map
+            return get_user_vote_map(obj)
         except Exception:
             return {}
 
@@ -124,56 +124,24 @@ def send_voting_reminders(request):
         )
 
     try:
-        from elections.models import Election, Vote
-        from utils.tasks import send_voting_reminder_task
+        from elections.models import Election
+        from elections.notifications import start_voting_reminders
 
-        # Get active elections
-        active_elections = Election.objects.filter(status="active")
-
-        if not active_elections:
+        if not Election.objects.filter(status="active").exists():
             return Response(
-                {"message": "No active elections found", "reminders_sent": 0}
-            )
-
-        total_queued = 0
-        task_ids = []
-
-        for election in active_elections:
-            # Get users who haven't voted in this election
-            voted_user_ids = (
-                Vote.objects.filter(candidate__position__election=election)
-                .values_list("voter_id", flat=True)
-                .distinct()
-            )
-
-            eligible_users = (
-                User.objects.filter(
-                    can_vote=True, is_active=True, phone_number__isnull=False
-                )
-                .exclude(phone_number__exact="")
-                .exclude(id__in=voted_user_ids)
+                {"message": "No active elections found", "reminders_queued": 0}
             )
 
-            for user in eligible_users:
-                task = send_voting_reminder_task.delay(user.id, election.id)
-                task_ids.append(task.id)
-                total_queued += 1
-
-        if total_queued == 0:
-            return Response(
-                {
-                    "message": "No users found who need voting reminders",
-                    "reminders_queued": 0,
-                }
-            )
+        # Recipients are resolved and messaged in batches by background tasks
+        job = start_voting_reminders(requested_by=request.user)
 
         return Response(
             {
-                "message": "Voting reminders sent to voters",
-                "reminders_sent": total_queued,
-                # "task_ids": task_ids[:10],  # Return first 10 task IDs
-                # "total_tasks": len(task_ids),
-            }
+                "message": "Voting reminders are being sent",
+                "job_id": str(job.id),
+                "status_url": f"/api/elections/notification-jobs/{job.id}/",
+            },
+            status=status.HTTP_202_ACCEPTED,
         )
 
     except Exception as e:
@@ -237,20 +237,25 @@ reset_user_password_schema = extend_schema(
 send_voting_reminders_schema = extend_schema(
     summary="Send voting reminders (Admin/EC only)",
     description="""
-    This endpoint sends voting reminders to users who haven't voted in active elections.    
+    This endpoint starts a background job that sends voting reminders to users who haven't voted in active elections,
+    one reminder per active election the user has not voted in.
+    Recipients are resolved and messaged in batches; poll status_url for progress.
     """,
     request=None,  # No request body needed
     responses={
+        202: inline_serializer(
+            name="VotingRemindersStartedSerializer",
+            fields={
+                "message": serializers.CharField(),
+                "job_id": serializers.UUIDField(),
+                "status_url": serializers.CharField(),
+            },
+        ),
         200: inline_serializer(
             name="VotingRemindersSuccessSerializer",
             fields={
                 "message": serializers.CharField(),
                 "reminders_queued": serializers.IntegerField(),
-                # "task_ids": serializers.ListField(
-                #     child=serializers.CharField(),
-                #     help_text="List of Celery task IDs (first 10 shown)",
-                # ),
-                # "total_tasks": serializers.IntegerField(),
             },
         ),
     },
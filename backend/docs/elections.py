@@ -49,6 +49,68 @@ retrieve_update_delete_election_schema = extend_schema(
     tags=["Elections"],
 )
 
+election_ballot_schema = extend_schema(
+    summary="Get the ballot for an election",
+    description="""
+    Retrieve the ballot definition of an election: its positions in order and
+    the candidates for each position. Served from a cached snapshot that is
+    rebuilt whenever positions or candidates change, so no results or vote
+    counts are included.
+    """,
+    request=None,
+    parameters=[
+        OpenApiParameter(
+            name="election_id",
+            type=OpenApiTypes.UUID,
+            location=OpenApiParameter.PATH,
+            description="The UUID of the election",
+        ),
+    ],
+    responses={
+        200: inline_serializer(
+            name="BallotDefinitionSerializer",
+            fields={
+                "election_id": serializers.UUIDField(),
+                "title": serializers.CharField(),
+                "description": serializers.CharField(),
+                "status": serializers.CharField(),
+                "start_date": serializers.DateTimeField(),
+                "end_date": serializers.DateTimeField(),
+                "positions": inline_serializer(
+                    name="BallotPositionSerializer",
+                    fields={
+                        "id": serializers.UUIDField(),
+                        "title": serializers.CharField(),
+                        "description": serializers.CharField(),
+                        "order": serializers.IntegerField(),
+                        "max_candidates": serializers.IntegerField(),
+                        "is_single_candidate": serializers.BooleanField(),
+                        "candidates": inline_serializer(
+                            name="BallotCandidateSerializer",
+                            fields={
+                                "id": serializers.UUIDField(),
+                                "order": serializers.IntegerField(),
+                                "manifesto": serializers.CharField(),
+                                "profile_picture": serializers.URLField(allow_null=True),
+                                "user": serializers.DictField(),
+                            },
+                            many=True,
+                        ),
+                    },
+                    many=True,
+                ),
+            },
+        ),
+        404: inline_serializer(
+            name="BallotNotFoundSerializer",
+            fields={
+                "detail": serializers.CharField(),
+            },
+        ),
+    },
+    tags=["Elections"],
+)
+
 cast_vote_schema = extend_schema(
     summary="Cast votes (single or full ballot) with anonymous encryption",
     description="""
@@ -639,13 +701,55 @@ verify_vote_integrity_schema = extend_schema(
     tags=["Security", "Admin"],
 )
 
+verify_election_votes_schema = extend_schema(
+    summary="Verify every vote of an election",
+    description="""
+    Queue a background re-verification of all votes in an election.
+    Only EC members and staff can start a verification run.
+    
+    The run:
+    - Re-checks each vote's cryptographic hash
+    - Re-checks each vote's digital signature against the persistent signing key
+    - Updates the votes' verification status in bulk
+    - Creates an audit log entry with the summary
+    """,
+    request=None,
+    parameters=[
+        OpenApiParameter(
+            name="election_id",
+            type=OpenApiTypes.UUID,
+            location=OpenApiParameter.PATH,
+            description="The UUID of the election",
+        ),
+    ],
+    responses={
+        202: inline_serializer(
+            name="VerifyElectionVotesSerializer",
+            fields={
+                "message": serializers.CharField(),
+                "election_id": serializers.UUIDField(),
+                "task_id": serializers.CharField(),
+            },
+        ),
+        403: inline_serializer(
+            name="VerifyElectionVotesForbiddenSerializer",
+            fields={
+                "error": serializers.CharField(),
+            },
+        ),
+    },
+    tags=["Security", "Admin"],
+)
+
 audit_trail_schema = extend_schema(
     summary="Get audit trail for an election",
     description="""
     Retrieve the comprehensive audit trail for a specific election.
     Only EC members and staff can access audit trails.
     
-    Returns the latest 100 audit log entries including:
+    Returns audit log entries newest first, page_size (default 100, at most 500)
+    per request. Pass the returned next_cursor as cursor to fetch the next page;
+    it is null on the last page. Entries include:
     - All voting activities
     - Election management actions
     - Security events
@@ -662,6 +766,20 @@ audit_trail_schema = extend_schema(
             location=OpenApiParameter.PATH,
             description="The UUID of the election",
         ),
+        OpenApiParameter(
+            name="cursor",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="next_cursor from the previous page",
+        ),
+        OpenApiParameter(
+            name="page_size",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Entries per page (default 100, max 500)",
+        ),
     ],
     responses={
         200: inline_serializer(
@@ -673,6 +791,7 @@ audit_trail_schema = extend_schema(
                     name="AuditLogEntrySerializer",
                     fields={
                         "id": serializers.UUIDField(),
+                        "sequence": serializers.IntegerField(),
                         "timestamp": serializers.DateTimeField(),
                         "action": serializers.CharField(),
                         "user": serializers.CharField(),
@@ -685,6 +804,7 @@ audit_trail_schema = extend_schema(
                     many=True,
                 ),
                 "total_entries": serializers.IntegerField(),
+                "next_cursor": serializers.IntegerField(allow_null=True),
                 "generated_at": serializers.DateTimeField(),
                 "generated_by": serializers.CharField(),
             },
@@ -749,3 +869,48 @@ suspicious_activity_schema = extend_schema(
     },
     tags=["Security", "Admin"],
 )
+
+notification_job_schema = extend_schema(
+    summary="Get the progress of a bulk SMS job",
+    description="""
+    Poll a bulk notification job: voting reminders or the results-published SMS.
+    Only EC members and staff can view notification jobs.
+    
+    Recipients are sent in batches; the counts cover the batches run so far.
+    A batch that failed is retried for its undelivered recipients only.
+    """,
+    request=None,
+    parameters=[
+        OpenApiParameter(
+            name="job_id",
+            type=OpenApiTypes.UUID,
+            location=OpenApiParameter.PATH,
+            description="The job_id returned when the job was started",
+        ),
+    ],
+    responses={
+        200: inline_serializer(
+            name="NotificationJobSerializer",
+            fields={
+                "job_id": serializers.UUIDField(),
+                "kind": serializers.CharField(),
+                "status": serializers.CharField(),
+                "total_recipients": serializers.IntegerField(),
+                "total_batches": serializers.IntegerField(),
+                "batches_done": serializers.IntegerField(),
+                "sent": serializers.IntegerField(),
+                "failed": serializers.IntegerField(),
+                "skipped": serializers.IntegerField(),
+                "created_at": serializers.DateTimeField(),
+                "completed_at": serializers.DateTimeField(allow_null=True),
+            },
+        ),
+        403: inline_serializer(
+            name="NotificationJobForbiddenSerializer",
+            fields={
+                "error": serializers.CharField(),
+            },
+        ),
+    },
+    tags=["Admin"],
+)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Election, Position, Candidate, Vote, ElectionResult, VotingSession, AuditLog, ElectionSecurity
+from .models import Election, Position, Candidate, Vote, ElectionResult, VotingSession, AuditLog, AuditCheckpoint, ElectionSecurity, TallySnapshot, TallyEntry, NotificationJob, NotificationBatch
+from .tally import get_context_tally
 
 
 class PositionInline(admin.TabularInline):
@@ -40,8 +41,19 @@ class PositionAdmin(admin.ModelAdmin):
 class CandidateAdmin(admin.ModelAdmin):
     list_display = ("position", "vote_count")
     list_filter = ("position__election", "position")
+    list_select_related = ("position__election", "user")
     search_fields = ("user__student_id", "position__title")
 
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        # One tally per election on the page rather than one per row
+        tallies = {}
+        for candidate in changelist.result_list:
+            candidate._election_tally = get_context_tally(
+                tallies, candidate.position.election_id
+            )
+        return changelist
+
 
 @admin.register(Vote)
 class VoteAdmin(admin.ModelAdmin):
@@ -83,6 +95,25 @@ class ElectionResultAdmin(admin.ModelAdmin):
     readonly_fields = ("generated_at",)
 
 
+class TallyEntryInline(admin.TabularInline):
+    model = TallyEntry
+    extra = 0
+    readonly_fields = ("position_id", "candidate_id", "approve", "votes")
+
+
+@admin.register(TallySnapshot)
+class TallySnapshotAdmin(admin.ModelAdmin):
+    list_display = (
+        "election",
+        "total_votes",
+        "total_voters",
+        "corrupt_votes",
+        "computed_at",
+    )
+    readonly_fields = ("computed_at",)
+    inlines = [TallyEntryInline]
+
+
 @admin.register(VotingSession)
 class VotingSessionAdmin(admin.ModelAdmin):
     list_display = (
@@ -98,11 +129,47 @@ class VotingSessionAdmin(admin.ModelAdmin):
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = (
         "id",
+        "sequence",
         "user",
         "action",
         "timestamp",
     )
-    readonly_fields = ("timestamp",)
+    readonly_fields = ("timestamp", "sequence", "chain_hash")
+
+
+@admin.register(AuditCheckpoint)
+class AuditCheckpointAdmin(admin.ModelAdmin):
+    list_display = (
+        "sequence",
+        "entries_verified",
+        "created_at",
+    )
+    readonly_fields = ("sequence", "chain_hash", "entries_verified", "created_at")
+
+
+class NotificationBatchInline(admin.TabularInline):
+    model = NotificationBatch
+    extra = 0
+    fields = ("index", "election", "status", "sent_count", "skipped_count", "attempts", "error")
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "status",
+        "total_recipients",
+        "total_batches",
+        "created_at",
+        "completed_at",
+    )
+    list_filter = ("kind", "status")
+    readonly_fields = ("created_at", "completed_at")
+    inlines = [NotificationBatchInline]
+
 
 @admin.register(ElectionSecurity)
 class ElectionSecurityAdmin(admin.ModelAdmin):
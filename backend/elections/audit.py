@@ -0,0 +1,311 @@
+"""
+Batched audit log writer
+Requests queue audit entries instead of inserting AuditLog rows. Entries are
+pushed as JSON onto a Redis list (one RPUSH) and written by
+flush_audit_log, which takes batches off the list, computes the integrity
+hashes, links each batch into the audit hash chain and stores it with one
+bulk_create. The list is trimmed only after a batch is stored, and entries
+carry their final primary key, so a flush that dies half way is simply
+repeated by the next one without duplicating rows. Celery beat flushes every AUDIT_FLUSH_INTERVAL seconds and
+a full batch triggers a flush straight away.
+
+One flusher runs at a time: the lock holds a token of its owner, is only
+released by that owner, and each trim checks and renews it, so a flusher
+that outlived its lock stops instead of trimming entries it never wrote.
+A run handles at most FLUSH_MAX_BATCHES batches. An entry that cannot be
+decoded or stored is moved to the quarantine list rather than holding up
+the queue.
+
+Without Redis (development, tests) entries are buffered in process and
+flushed by the next queueing call that finds the buffer full or older than
+the interval, or by flush_audit_log. If Redis rejects an entry it is written
+directly so it is never lost.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from utils.cache import get_redis_client, run_script
+from utils.network import clean_ip_address
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "audit:queue"
+QUARANTINE_KEY = "audit:quarantine"
+FLUSH_LOCK_KEY = "audit:flush_lock"
+FLUSH_LOCK_TIMEOUT = 60
+# Batches per flush run, so a run ends well within the lock timeout
+FLUSH_MAX_BATCHES = 20
+
+# Errors that make an entry unstorable, as opposed to the database being unavailable
+ENTRY_ERRORS = (DataError, IntegrityError, KeyError, TypeError, ValueError)
+
+# KEYS[1] is the lock, KEYS[2] the queue. ARGV: owner token, lock timeout, entries to trim.
+# Trims and renews the lock only while ARGV[1] still owns it; returns 1 if it did.
+TRIM_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('LTRIM', KEYS[2], ARGV[3], -1)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# KEYS[1] is the lock, ARGV[1] the owner token
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_local_buffer: List[Dict] = []
+_local_lock = threading.Lock()
+_local_oldest: Optional[float] = None
+
+
+def _batch_size() -> int:
+    return getattr(settings, "AUDIT_FLUSH_BATCH_SIZE", 200)
+
+
+def _flush_interval() -> float:
+    return getattr(settings, "AUDIT_FLUSH_INTERVAL", 5)
+
+
+def build_audit_entry(
+    action: str,
+    resource_type: str,
+    resource_id,
+    user_id=None,
+    ip_address=None,
+    user_agent: str = "",
+    details: Optional[Dict] = None,
+) -> Dict:
+    """A JSON-serializable audit entry stamped with its id and event time"""
+    return {
+        "id": str(uuid.uuid4()),
+        "timestamp": timezone.now().isoformat(),
+        "action": action,
+        "user_id": str(user_id) if user_id else None,
+        "resource_type": resource_type,
+        "resource_id": str(resource_id),
+        "ip_address": clean_ip_address(ip_address) if ip_address else None,
+        "user_agent": user_agent or "",
+        "details": details or {},
+    }
+
+
+def log_audit_event(action: str, resource_type: str, resource_id, **kwargs) -> str:
+    """Queue one audit entry; returns the id its AuditLog row will have"""
+    entry = build_audit_entry(action, resource_type, resource_id, **kwargs)
+    enqueue_audit_entries([entry])
+    return entry["id"]
+
+
+def enqueue_audit_entries(entries: List[Dict]):
+    if not entries:
+        return
+    client = get_redis_client()
+    if client is None:
+        _buffer_locally(entries)
+        return
+
+    try:
+        length = client.rpush(cache.make_key(QUEUE_KEY), *[json.dumps(entry) for entry in entries])
+    except Exception as e:
+        logger.error(f"Audit queue unavailable, writing {len(entries)} entries directly: {str(e)}")
+        write_audit_entries(entries)
+        return
+
+    # Flush once per completed batch rather than on every push past the threshold
+    batch_size = _batch_size()
+    if length // batch_size > (length - len(entries)) // batch_size:
+        _schedule_flush()
+
+
+def enqueue_audit_entries_on_commit(entries: List[Dict]):
+    """Queue the entries once the transaction they describe commits"""
+    transaction.on_commit(lambda: enqueue_audit_entries(entries))
+
+
+def _schedule_flush():
+    try:
+        from utils.tasks import flush_audit_log_task
+
+        flush_audit_log_task.delay()
+    except Exception as e:
+        # The periodic flush picks the entries up
+        logger.error(f"Failed to schedule an audit log flush: {str(e)}")
+
+
+def _buffer_locally(entries: List[Dict]):
+    global _local_oldest
+
+    with _local_lock:
+        _local_buffer.extend(entries)
+        if _local_oldest is None:
+            _local_oldest = time.monotonic()
+        due = (
+            len(_local_buffer) >= _batch_size()
+            or time.monotonic() - _local_oldest >= _flush_interval()
+        )
+    if due:
+        _flush_local_buffer()
+
+
+def _flush_local_buffer() -> int:
+    global _local_oldest
+
+    with _local_lock:
+        entries = list(_local_buffer)
+        _local_buffer.clear()
+        _local_oldest = None
+    if not entries:
+        return 0
+    try:
+        written, rejected = _write_or_reject(entries)
+    except Exception:
+        with _local_lock:
+            _local_buffer[:0] = entries
+        raise
+    for entry in rejected:
+        logger.error(f"Dropping unstorable audit entry: {json.dumps(entry, default=str)[:200]}")
+    return written
+
+
+def _write_or_reject(entries: List[Dict]):
+    """
+    Store entries, falling back to one at a time if the batch is rejected.
+    Returns the rows created and the entries that could not be stored;
+    database outages are raised.
+    """
+    try:
+        return write_audit_entries(entries), []
+    except ENTRY_ERRORS:
+        if len(entries) == 1:
+            return 0, entries
+    written, rejected = 0, []
+    for entry in entries:
+        try:
+            written += write_audit_entries([entry])
+        except ENTRY_ERRORS as e:
+            logger.error(f"Audit entry {entry.get('id')} cannot be stored: {str(e)}")
+            rejected.append(entry)
+    return written, rejected
+
+
+def write_audit_entries(entries: Iterable[Dict]) -> int:
+    """
+    Store queued entries with one bulk_create, hashing them first.
+    Entries whose id already exists (a repeated flush) are skipped.
+    Returns the number of rows created.
+    """
+    from django.contrib.auth import get_user_model
+
+    from .audit_chain import store_chained
+    from .models import AuditLog
+
+    entries = list(entries)
+    if not entries:
+        return 0
+
+    ids = [entry["id"] for entry in entries]
+    stored = {
+        str(pk) for pk in AuditLog.objects.filter(id__in=ids).order_by().values_list("id", flat=True)
+    }
+    user_ids = {entry["user_id"] for entry in entries if entry["user_id"]}
+    # Users deleted since the entry was queued are recorded as anonymous
+    known_users = {
+        str(pk)
+        for pk in get_user_model().objects.filter(id__in=user_ids).values_list("id", flat=True)
+    }
+
+    audit_logs = []
+    for entry in entries:
+        if entry["id"] in stored:
+            continue
+        stored.add(entry["id"])
+        audit_log = AuditLog(
+            id=entry["id"],
+            timestamp=parse_datetime(entry["timestamp"]),
+            action=entry["action"],
+            user_id=entry["user_id"] if entry["user_id"] in known_users else None,
+            resource_type=entry["resource_type"],
+            resource_id=entry["resource_id"],
+            ip_address=entry["ip_address"],
+            user_agent=entry["user_agent"],
+            details=entry["details"],
+            election_id=AuditLog.election_id_from_details(entry["details"]),
+        )
+        # bulk_create bypasses AuditLog.save, so hash explicitly
+        audit_log.integrity_hash = audit_log.compute_integrity_hash()
+        audit_logs.append(audit_log)
+
+    # Sequence numbers follow queue order
+    store_chained(audit_logs, lambda: AuditLog.objects.bulk_create(audit_logs))
+    return len(audit_logs)
+
+
+def _decode(raw: bytes) -> Optional[Dict]:
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        logger.error(f"Unreadable audit entry: {raw[:200]!r}")
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def flush_audit_log(max_batches: Optional[int] = FLUSH_MAX_BATCHES) -> int:
+    """Write queued audit entries in batches; returns the number of rows created"""
+    written = _flush_local_buffer()
+
+    client = get_redis_client()
+    if client is None:
+        return written
+
+    # One flusher at a time keeps batches in queue order
+    lock_key = cache.make_key(FLUSH_LOCK_KEY)
+    token = uuid.uuid4().hex
+    if not client.set(lock_key, token, nx=True, ex=FLUSH_LOCK_TIMEOUT):
+        return written
+    try:
+        queue_key = cache.make_key(QUEUE_KEY)
+        batch_size = _batch_size()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            raw_entries = client.lrange(queue_key, 0, batch_size - 1)
+            if not raw_entries:
+                break
+            entries, quarantined = [], []
+            for raw in raw_entries:
+                entry = _decode(raw)
+                if entry is None:
+                    quarantined.append(raw)
+                else:
+                    entries.append(entry)
+            batch_written, rejected = _write_or_reject(entries)
+            written += batch_written
+            quarantined += [json.dumps(entry, default=str) for entry in rejected]
+            if quarantined:
+                client.rpush(cache.make_key(QUARANTINE_KEY), *quarantined)
+            # Only drop entries from the queue once they are stored, and only while
+            # this flusher holds the lock
+            if not run_script(
+                client, TRIM_SCRIPT, [lock_key, queue_key], [token, FLUSH_LOCK_TIMEOUT, len(raw_entries)]
+            ):
+                logger.warning("Audit flush lock expired; leaving the rest to the next flush")
+                break
+            batches += 1
+    finally:
+        run_script(client, RELEASE_SCRIPT, [lock_key], [token])
+    return written
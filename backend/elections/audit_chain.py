@@ -0,0 +1,146 @@
+"""
+Hash chain over the audit log
+Every AuditLog row gets the next `sequence` number and a chain_hash: an HMAC
+(keyed with VOTE_HASH_SECRET) over the previous entry's chain_hash, its own
+sequence and its integrity_hash. Editing, deleting or reordering an entry
+breaks its link, and the chain cannot be rebuilt without the secret.
+AuditCheckpoint rows record a verified prefix of the chain, so verification
+only walks the entries added since the last checkpoint, streaming them in
+sequence order in fixed-size chunks.
+"""
+
+import hashlib
+import hmac
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger(__name__)
+
+GENESIS_HASH = "0" * 64
+
+# Writers that race for the same sequence numbers retry on the unique constraint
+CHAIN_WRITE_ATTEMPTS = 5
+
+# Failures listed in a verification summary; the total is always counted
+MAX_REPORTED_FAILURES = 100
+
+
+def compute_chain_hash(previous_hash: str, sequence: int, integrity_hash: str) -> str:
+    from .crypto import _get_hash_secret
+
+    message = f"{previous_hash}:{sequence}:{integrity_hash}".encode()
+    return hmac.new(_get_hash_secret(), message, hashlib.sha256).hexdigest()
+
+
+def _chain_head() -> Tuple[int, str]:
+    from .models import AuditLog
+
+    head = (
+        AuditLog.objects.filter(sequence__isnull=False)
+        .order_by("-sequence")
+        .values_list("sequence", "chain_hash")
+        .first()
+    )
+    return head or (0, GENESIS_HASH)
+
+
+def link_audit_logs(audit_logs: List) -> None:
+    """Give unsaved AuditLog instances the next sequence numbers and chain hashes"""
+    sequence, previous_hash = _chain_head()
+    for audit_log in audit_logs:
+        sequence += 1
+        audit_log.sequence = sequence
+        audit_log.chain_hash = compute_chain_hash(previous_hash, sequence, audit_log.integrity_hash)
+        previous_hash = audit_log.chain_hash
+
+
+def store_chained(audit_logs: List, write: Callable[[], object]) -> None:
+    """Link audit_logs to the head of the chain and insert them with write()"""
+    for attempt in range(CHAIN_WRITE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                link_audit_logs(audit_logs)
+                write()
+            return
+        except IntegrityError:
+            # Another writer appended first; relink on the new head
+            if attempt == CHAIN_WRITE_ATTEMPTS - 1:
+                raise
+
+
+def verify_audit_chain(
+    full: bool = False, chunk_size: Optional[int] = None, checkpoint: bool = True
+) -> Dict:
+    """
+    Verify the audit log from the last checkpoint (or from the start with full=True).
+
+    Each entry's integrity hash is recomputed from its content and its chain hash from
+    the previous link; gaps in the sequence are reported. When everything checks out and
+    new entries were verified, a checkpoint is stored (unless checkpoint=False).
+    """
+    from .models import AuditCheckpoint, AuditLog
+
+    if chunk_size is None:
+        chunk_size = getattr(settings, "AUDIT_VERIFY_CHUNK_SIZE", 1000)
+
+    summary = {
+        "start_sequence": 0,
+        "end_sequence": 0,
+        "entries_verified": 0,
+        "failure_count": 0,
+        "failures": [],
+        "checkpoint_id": None,
+    }
+
+    def fail(sequence, reason):
+        summary["failure_count"] += 1
+        if len(summary["failures"]) < MAX_REPORTED_FAILURES:
+            summary["failures"].append({"sequence": sequence, "reason": reason})
+
+    sequence, previous_hash = 0, GENESIS_HASH
+    anchor = None if full else AuditCheckpoint.objects.order_by("-sequence").first()
+    if anchor is not None:
+        stored = (
+            AuditLog.objects.filter(sequence=anchor.sequence)
+            .values_list("chain_hash", flat=True)
+            .first()
+        )
+        if stored != anchor.chain_hash:
+            fail(anchor.sequence, "entry no longer matches the last checkpoint")
+        sequence, previous_hash = anchor.sequence, anchor.chain_hash
+    summary["start_sequence"] = sequence
+
+    while True:
+        # Keyset pagination keeps each chunk an index range scan
+        chunk = list(AuditLog.objects.filter(sequence__gt=sequence).order_by("sequence")[:chunk_size])
+        if not chunk:
+            break
+        for audit_log in chunk:
+            if audit_log.sequence != sequence + 1:
+                fail(sequence + 1, f"entries {sequence + 1} to {audit_log.sequence - 1} are missing")
+            if not audit_log.has_valid_integrity_hash():
+                fail(audit_log.sequence, "content does not match its integrity hash")
+            expected = compute_chain_hash(previous_hash, audit_log.sequence, audit_log.integrity_hash)
+            if audit_log.chain_hash != expected:
+                fail(audit_log.sequence, "chain hash does not follow from the previous entry")
+            # Continue from the stored link so one edit is reported once
+            sequence, previous_hash = audit_log.sequence, audit_log.chain_hash
+            summary["entries_verified"] += 1
+
+    unchained = AuditLog.objects.filter(sequence__isnull=True).count()
+    if unchained:
+        fail(None, f"{unchained} entries are not part of the chain")
+
+    summary["end_sequence"] = sequence
+    if checkpoint and summary["entries_verified"] and not summary["failure_count"]:
+        summary["checkpoint_id"] = AuditCheckpoint.objects.create(
+            sequence=sequence,
+            chain_hash=previous_hash,
+            entries_verified=summary["entries_verified"],
+        ).id
+    if summary["failure_count"]:
+        logger.warning(f"Audit chain verification found {summary['failure_count']} problem(s)")
+    return summary
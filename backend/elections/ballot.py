@@ -0,0 +1,159 @@
+"""
+Batched ballot writer
+Builds every vote of a ballot up front, checks all anonymous tokens for
+duplicates in one query and stores the votes with one bulk insert, so a
+ballot costs the same number of queries whatever the number of positions.
+Audit entries are queued for the batched audit writer once the ballot commits.
+"""
+
+from typing import Dict, List
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from utils.network import clean_ip_address
+
+from .audit import build_audit_entry, enqueue_audit_entries_on_commit
+from .ballot_definition import get_ballot_definition
+from .counters import record_votes_on_commit
+from .tokens import get_voter_tokens
+from .voter_state import mark_user_voted_on_commit
+
+
+class DuplicateVoteError(ValueError):
+    """The voter already has a stored vote for one of the ballot's positions"""
+
+    def __init__(self, positions=()):
+        self.positions = list(positions)
+        if self.positions:
+            titles = ", ".join(position.title for position in self.positions)
+            message = f"Already voted for position {titles}"
+        else:
+            message = "This voter has already voted for this position"
+        super().__init__(message)
+
+
+def cast_ballot(
+    voter,
+    election,
+    items: List[Dict],
+    ip_address=None,
+    user_agent: str = "",
+    session_ip_address=None,
+):
+    """
+    Encrypt, sign and store a ballot atomically.
+
+    items are dicts with "position", "candidate" and optional "approve", as produced
+    by BulkCastVoteSerializer. Raises DuplicateVoteError (nothing is written) when the
+    voter has already voted for any of the positions. Returns the created Vote rows.
+    """
+    from .crypto import get_digital_signature, get_voting_crypto
+    from .models import Vote
+
+    crypto = get_voting_crypto()
+    signature_util = get_digital_signature()
+
+    votes = [
+        Vote.build_secure_vote(
+            voter,
+            item["candidate"],
+            ip_address=ip_address,
+            approve=item.get("approve", True),
+            position=item["position"],
+            election=election,
+            crypto=crypto,
+            signature_util=signature_util,
+        )
+        for item in items
+    ]
+
+    # One IN query over the voter's tokens for every position of the election:
+    # matches on the ballot's positions are duplicates, and no match at all
+    # means this is the voter's first ballot in the election
+    positions_by_token = {
+        vote.anonymous_voter_token: item["position"] for vote, item in zip(votes, items)
+    }
+    election_tokens = set(positions_by_token)
+    definition = get_ballot_definition(election.id)
+    if definition is not None:
+        election_tokens.update(
+            get_voter_tokens(
+                voter.id, election.id, [position.id for position in definition.positions]
+            ).values()
+        )
+    already_voted = list(
+        Vote.objects.filter(anonymous_voter_token__in=list(election_tokens)).values_list(
+            "anonymous_voter_token", flat=True
+        )
+    )
+    duplicates = [
+        positions_by_token[token] for token in already_voted if token in positions_by_token
+    ]
+    if duplicates:
+        raise DuplicateVoteError(duplicates)
+    first_ballot = not already_voted
+
+    audit_entries = [
+        build_audit_entry(
+            "vote_cast",
+            "vote",
+            vote.id,
+            user_id=voter.id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            details={
+                "election_id": str(election.id),
+                "position_id": str(item["position"].id),
+                "candidate_id": str(item["candidate"].id),
+                "approve": bool(item.get("approve", True)),
+                "encrypted": bool(vote.encrypted_vote_data),
+                "verified": vote.integrity_verified,
+            },
+        )
+        for vote, item in zip(votes, items)
+    ]
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                # A concurrent submission that slipped past the check above is
+                # rejected here by unique_anonymous_vote_per_position
+                Vote.objects.bulk_create(votes)
+        except IntegrityError:
+            raise DuplicateVoteError()
+
+        # Written by the audit log flush, outside the voter's request
+        enqueue_audit_entries_on_commit(audit_entries)
+        record_votes_in_session(
+            voter,
+            election,
+            len(votes),
+            clean_ip_address(session_ip_address) or clean_ip_address(ip_address),
+            user_agent,
+        )
+        record_votes_on_commit(election.id, votes, new_voter=first_ballot)
+        mark_user_voted_on_commit(voter.id, election.id)
+
+    return votes
+
+
+def record_votes_in_session(voter, election, count: int, ip_address=None, user_agent: str = ""):
+    """
+    Add count votes to the voter's open session, opening one if needed (a session
+    is not opened without an IP address)
+    """
+    from .models import VotingSession
+
+    updated = VotingSession.objects.filter(
+        user=voter, election=election, session_end__isnull=True
+    ).update(votes_cast=F("votes_cast") + count)
+    if updated or ip_address is None:
+        return
+    VotingSession.objects.create(
+        user=voter,
+        election=election,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        votes_cast=count,
+    )
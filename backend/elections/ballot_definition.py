@@ -0,0 +1,247 @@
+"""
+Cached ballot definitions
+An immutable snapshot of an election's ballot (positions, candidates, order,
+single-candidate flags, picture URLs) kept in the shared Django cache and in a
+small in-process LRU. Each election has a version token in the shared cache;
+saving or deleting a Position, Candidate or the Election replaces the token,
+which invalidates every process's copy on its next read.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Definitions held per process; versions are still checked against the shared cache
+LOCAL_BALLOT_CACHE_SIZE = 64
+
+_local_ballots = OrderedDict()
+_local_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class BallotCandidate:
+    id: str
+    order: int
+    manifesto: str
+    # Media-relative URL; made absolute per request in as_dict
+    profile_picture: Optional[str]
+    user_id: Optional[str]
+    display_name: str
+    first_name: str
+    last_name: str
+    student_id: str
+    program: str
+    year_of_study: str
+
+    def as_dict(self, request=None) -> Dict:
+        picture = self.profile_picture
+        if picture and request is not None:
+            picture = request.build_absolute_uri(picture)
+        return {
+            "id": self.id,
+            "order": self.order,
+            "manifesto": self.manifesto,
+            "profile_picture": picture,
+            "user": {
+                "id": self.user_id,
+                "display_name": self.display_name,
+                "first_name": self.first_name,
+                "last_name": self.last_name,
+                "student_id": self.student_id,
+                "program": self.program,
+                "year_of_study": self.year_of_study,
+            },
+        }
+
+
+@dataclass(frozen=True)
+class BallotPosition:
+    id: str
+    title: str
+    description: str
+    order: int
+    max_candidates: int
+    candidates: Tuple[BallotCandidate, ...]
+
+    @property
+    def is_single_candidate(self) -> bool:
+        return len(self.candidates) == 1
+
+    def as_dict(self, request=None) -> Dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "order": self.order,
+            "max_candidates": self.max_candidates,
+            "is_single_candidate": self.is_single_candidate,
+            "candidates": [candidate.as_dict(request) for candidate in self.candidates],
+        }
+
+
+@dataclass(frozen=True)
+class BallotDefinition:
+    election_id: str
+    title: str
+    description: str
+    status: str
+    start_date: str
+    end_date: str
+    positions: Tuple[BallotPosition, ...]
+
+    def as_dict(self, request=None) -> Dict:
+        return {
+            "election_id": self.election_id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "positions": [position.as_dict(request) for position in self.positions],
+        }
+
+
+def build_ballot_definition(election_id) -> Optional[BallotDefinition]:
+    """Read an election's ballot from the database (3 queries); None if it does not exist"""
+    from django.db.models import Prefetch
+
+    from .models import Candidate, Election
+
+    election = (
+        Election.objects.filter(id=election_id)
+        .prefetch_related(
+            Prefetch(
+                "positions__candidates",
+                queryset=Candidate.objects.select_related("user").order_by("order"),
+            )
+        )
+        .first()
+    )
+    if election is None:
+        return None
+
+    positions = []
+    for position in election.positions.all():
+        candidates = []
+        for candidate in position.candidates.all():
+            user = candidate.user
+            candidates.append(
+                BallotCandidate(
+                    id=str(candidate.id),
+                    order=candidate.order,
+                    manifesto=candidate.manifesto,
+                    profile_picture=(
+                        candidate.profile_picture.url if candidate.profile_picture else None
+                    ),
+                    user_id=str(user.id) if user else None,
+                    display_name=user.display_name if user else "",
+                    first_name=user.first_name if user else "",
+                    last_name=user.last_name if user else "",
+                    student_id=user.student_id if user else "",
+                    program=user.program if user else "",
+                    year_of_study=user.year_of_study if user else "",
+                )
+            )
+        positions.append(
+            BallotPosition(
+                id=str(position.id),
+                title=position.title,
+                description=position.description,
+                order=position.order,
+                max_candidates=position.max_candidates,
+                candidates=tuple(candidates),
+            )
+        )
+
+    return BallotDefinition(
+        election_id=str(election.id),
+        title=election.title,
+        description=election.description,
+        status=election.status,
+        start_date=election.start_date.isoformat(),
+        end_date=election.end_date.isoformat(),
+        positions=tuple(positions),
+    )
+
+
+def _version_key(election_id) -> str:
+    return f"ballot:{election_id}:version"
+
+
+def _definition_key(election_id, version: str) -> str:
+    return f"ballot:{election_id}:{version}"
+
+
+def _current_version(election_id) -> str:
+    key = _version_key(election_id)
+    version = cache.get(key)
+    if version is None:
+        # add() keeps the first token when several processes race here
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_ballot_definition(election_id) -> Optional[BallotDefinition]:
+    """Return the ballot for an election from the local LRU or shared cache, building it on a miss"""
+    key = str(election_id)
+    try:
+        version = _current_version(key)
+    except Exception as e:
+        logger.error(f"Ballot cache unavailable, reading election {key} from the database: {str(e)}")
+        return build_ballot_definition(key)
+
+    with _local_lock:
+        local = _local_ballots.get(key)
+        if local is not None and local[0] == version:
+            _local_ballots.move_to_end(key)
+            return local[1]
+
+    definition = cache.get(_definition_key(key, version))
+    if definition is None:
+        definition = build_ballot_definition(key)
+        if definition is None:
+            return None
+        cache.set(
+            _definition_key(key, version),
+            definition,
+            getattr(settings, "BALLOT_CACHE_TIMEOUT", 60 * 60 * 24),
+        )
+
+    with _local_lock:
+        _local_ballots[key] = (version, definition)
+        _local_ballots.move_to_end(key)
+        while len(_local_ballots) > LOCAL_BALLOT_CACHE_SIZE:
+            _local_ballots.popitem(last=False)
+    return definition
+
+
+def invalidate_ballot_definition(election_id):
+    """Replace the election's version token so every process rebuilds its ballot"""
+    key = str(election_id)
+    try:
+        cache.set(_version_key(key), uuid.uuid4().hex, timeout=None)
+    except Exception as e:
+        logger.error(f"Failed to invalidate cached ballot for election {key}: {str(e)}")
+    with _local_lock:
+        _local_ballots.pop(key, None)
+
+
+def invalidate_ballot_definition_on_commit(election_id):
+    """Invalidate once the surrounding transaction commits so no reader caches uncommitted rows"""
+    transaction.on_commit(lambda: invalidate_ballot_definition(election_id))
+
+
+def warm_ballot_definition(election_id) -> Optional[BallotDefinition]:
+    """Rebuild and cache the ballot now, e.g. when an election becomes active"""
+    invalidate_ballot_definition(election_id)
+    return get_ballot_definition(election_id)
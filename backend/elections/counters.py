@@ -0,0 +1,352 @@
+"""
+Election-wide vote counters
+Running totals of stored votes per election and per position, how many of
+them are encrypted and verified, and how many voters have cast a ballot,
+kept in the shared Django cache so model properties and dashboards never
+COUNT(*) the vote table. Votes are also bucketed per minute for the live
+turnout feed. Ballots increment the counters when they commit (a single
+Redis round trip); a counter that is missing is seeded from the database on
+its next read, and the reconcile_vote_counters task periodically overwrites
+them from the database to correct any drift.
+
+While a counter is missing its increments are parked in the election's
+pending hash. Seeding notes the pending amounts, counts the database, then
+sets the counter only if it is still missing (SET NX) together with the
+amounts that arrived during the count, so a ballot committing mid-count is
+not lost. A ballot committed before the count whose increment lands after
+the pending amounts were read is counted twice; reconciliation corrects it.
+"""
+
+import logging
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from utils.cache import get_redis_client, run_script
+
+logger = logging.getLogger(__name__)
+
+TOTAL = "total"
+ENCRYPTED = "encrypted"
+VERIFIED = "verified"
+VOTERS = "voters"
+ELECTION_COUNTERS = (TOTAL, ENCRYPTED, VERIFIED, VOTERS)
+
+# Per-minute vote buckets are kept this long (seconds)
+MINUTE_BUCKET_TIMEOUT = 60 * 60 * 3
+MINUTE_BUCKET_FORMAT = "%Y%m%d%H%M"
+
+# KEYS[1..ARGV[1]] are seeded counters, incremented only if they exist; a missing
+# one's amount is added to its field (ARGV[4..]) of the pending hash KEYS[ARGV[1] + 1],
+# which expires after ARGV[3] seconds. The remaining KEYS are minute buckets, created
+# on demand and expiring after ARGV[2] seconds. Amounts follow the fields.
+INCREMENT_SCRIPT = """
+local seeded = tonumber(ARGV[1])
+local pending = KEYS[seeded + 1]
+for i = 1, seeded do
+    local amount = ARGV[3 + seeded + i]
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('INCRBY', KEYS[i], amount)
+    else
+        redis.call('HINCRBY', pending, ARGV[3 + i], amount)
+        redis.call('EXPIRE', pending, ARGV[3])
+    end
+end
+for i = seeded + 2, #KEYS do
+    redis.call('INCRBY', KEYS[i], ARGV[2 + seeded + i])
+    redis.call('EXPIRE', KEYS[i], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1..n] are counters and KEYS[n + 1] the pending hash. ARGV[1] is the counter
+# timeout, then for each counter its pending field, database count and the pending
+# amount read before counting. A counter that is still missing is set to its count
+# plus what was parked since; returns every counter's value.
+SEED_SCRIPT = """
+local n = #KEYS - 1
+local pending = KEYS[n + 1]
+local values = {}
+for i = 1, n do
+    local field = ARGV[3 * i - 1]
+    local value = tonumber(ARGV[3 * i])
+    local raced = tonumber(redis.call('HGET', pending, field) or '0') - tonumber(ARGV[3 * i + 1])
+    if raced > 0 then
+        value = value + raced
+    end
+    if redis.call('SET', KEYS[i], value, 'NX', 'EX', ARGV[1]) then
+        redis.call('HDEL', pending, field)
+    else
+        value = tonumber(redis.call('GET', KEYS[i]) or value)
+    end
+    values[i] = value
+end
+return values
+"""
+
+
+def _timeout() -> int:
+    return getattr(settings, "VOTE_COUNTER_TIMEOUT", 60 * 60 * 24 * 7)
+
+
+def _counter_key(election_id, name: str) -> str:
+    return f"vote_counter:{election_id}:{name}"
+
+
+def _position_key(election_id, position_id) -> str:
+    return f"vote_counter:{election_id}:position:{position_id}"
+
+
+def _pending_key(election_id) -> str:
+    return f"vote_counter:{election_id}:pending"
+
+
+def _minute_key(election_id, minute) -> str:
+    return f"vote_counter:{election_id}:minute:{minute.strftime(MINUTE_BUCKET_FORMAT)}"
+
+
+def _empty_counts() -> Dict:
+    return {TOTAL: 0, ENCRYPTED: 0, VERIFIED: 0, VOTERS: 0, "positions": {}}
+
+
+def _flatten(election_id, counts: Dict) -> Dict[str, int]:
+    values = {_counter_key(election_id, name): counts[name] for name in ELECTION_COUNTERS}
+    for position_id, count in counts["positions"].items():
+        values[_position_key(election_id, position_id)] = count
+    return values
+
+
+def count_election_votes(election_id) -> Dict:
+    """Counters for an election straight from the database (three queries)"""
+    from django.db.models import Count, Q
+
+    from .models import Position, Vote, VotingSession
+
+    counts = _empty_counts()
+    # Vote.position_id is not a foreign key, so aggregate the votes once and
+    # list the positions separately to include those without votes
+    totals = Vote.objects.filter(election_id=election_id).values("position_id").annotate(
+        total=Count("id"),
+        encrypted=Count("id", filter=Q(encrypted_vote_data__gt="")),
+        verified=Count("id", filter=Q(integrity_verified=True, signature_verified=True)),
+    )
+    for position_id in Position.objects.filter(election_id=election_id).values_list("id", flat=True):
+        counts["positions"][str(position_id)] = 0
+    for row in totals:
+        counts["positions"][str(row["position_id"])] = row["total"]
+        for name in (TOTAL, ENCRYPTED, VERIFIED):
+            counts[name] += row[name]
+    # Votes are anonymous; voters are counted from their voting sessions
+    counts[VOTERS] = (
+        VotingSession.objects.filter(election_id=election_id, votes_cast__gt=0)
+        .values("user_id")
+        .distinct()
+        .count()
+    )
+    return counts
+
+
+def refresh_election_counters(election_id) -> Dict:
+    """Overwrite an election's counters with the database values"""
+    counts = count_election_votes(election_id)
+    try:
+        cache.set_many(_flatten(election_id, counts), _timeout())
+    except Exception as e:
+        logger.error(f"Failed to store vote counters for election {election_id}: {str(e)}")
+    return counts
+
+
+def _read_pending(election_id) -> Dict[str, int]:
+    client = get_redis_client()
+    if client is not None:
+        return {
+            (field.decode() if isinstance(field, bytes) else field): int(amount)
+            for field, amount in client.hgetall(cache.make_key(_pending_key(election_id))).items()
+        }
+    return cache.get(_pending_key(election_id)) or {}
+
+
+def _seed_election_counters(election_id) -> Dict:
+    """Set the election's missing counters from the database; returns the stored counts"""
+    seen = _read_pending(election_id)
+    counts = count_election_votes(election_id)
+    counters = _flatten(election_id, counts)
+
+    client = get_redis_client()
+    if client is not None:
+        args = [_timeout()]
+        for key, value in counters.items():
+            args += [key, value, seen.get(key, 0)]
+        stored = dict(
+            zip(
+                counters,
+                run_script(
+                    client,
+                    SEED_SCRIPT,
+                    [cache.make_key(key) for key in [*counters, _pending_key(election_id)]],
+                    args,
+                ),
+            )
+        )
+    else:
+        stored = {}
+        pending = cache.get(_pending_key(election_id)) or {}
+        for key, value in counters.items():
+            value += max(pending.get(key, 0) - seen.get(key, 0), 0)
+            if cache.add(key, value, _timeout()):
+                pending.pop(key, None)
+            else:
+                value = cache.get(key, value)
+            stored[key] = value
+        cache.set(_pending_key(election_id), pending, _timeout())
+
+    for name in ELECTION_COUNTERS:
+        counts[name] = int(stored[_counter_key(election_id, name)])
+    for position_id in counts["positions"]:
+        counts["positions"][position_id] = int(stored[_position_key(election_id, position_id)])
+    return counts
+
+
+def get_election_counts(election_id, position_ids: Optional[Iterable] = None) -> Dict:
+    """
+    {"total", "encrypted", "verified", "voters", "positions": {position_id: total}} for an election.
+    position_ids defaults to the positions on the cached ballot definition.
+    """
+    from .ballot_definition import get_ballot_definition
+
+    election_id = str(election_id)
+    try:
+        if position_ids is None:
+            definition = get_ballot_definition(election_id)
+            position_ids = [position.id for position in definition.positions] if definition else []
+        position_ids = [str(position_id) for position_id in position_ids]
+
+        keys = [_counter_key(election_id, name) for name in ELECTION_COUNTERS]
+        keys += [_position_key(election_id, position_id) for position_id in position_ids]
+        cached = cache.get_many(keys)
+        if len(cached) < len(keys):
+            return _seed_election_counts(election_id, position_ids)
+
+        counts = {name: cached[_counter_key(election_id, name)] for name in ELECTION_COUNTERS}
+        counts["positions"] = {
+            position_id: cached[_position_key(election_id, position_id)]
+            for position_id in position_ids
+        }
+        return counts
+    except Exception as e:
+        logger.error(f"Vote counters unavailable for election {election_id}: {str(e)}")
+        return count_election_votes(election_id)
+
+
+def _seed_election_counts(election_id, position_ids) -> Dict:
+    counts = _seed_election_counters(election_id)
+    counts["positions"] = {
+        position_id: counts["positions"].get(position_id, 0) for position_id in position_ids
+    }
+    return counts
+
+
+def get_total_votes(election_id) -> int:
+    try:
+        total = cache.get(_counter_key(election_id, TOTAL))
+        if total is None:
+            total = _seed_election_counters(election_id)[TOTAL]
+        return total
+    except Exception as e:
+        logger.error(f"Vote counters unavailable for election {election_id}: {str(e)}")
+        return count_election_votes(election_id)[TOTAL]
+
+
+def get_position_total(election_id, position_id) -> int:
+    try:
+        total = cache.get(_position_key(election_id, position_id))
+        if total is None:
+            total = _seed_election_counters(election_id)["positions"].get(str(position_id), 0)
+        return total
+    except Exception as e:
+        logger.error(f"Vote counters unavailable for election {election_id}: {str(e)}")
+        return count_election_votes(election_id)["positions"].get(str(position_id), 0)
+
+
+def get_votes_per_minute(election_id, minutes: int = 60, now=None) -> List[Dict]:
+    """Votes stored in each of the last `minutes` minutes, oldest first"""
+    now = (now or timezone.now()).replace(second=0, microsecond=0)
+    buckets = [now - timedelta(minutes=offset) for offset in range(minutes - 1, -1, -1)]
+    try:
+        cached = cache.get_many([_minute_key(election_id, minute) for minute in buckets])
+    except Exception as e:
+        logger.error(f"Vote counters unavailable for election {election_id}: {str(e)}")
+        cached = {}
+    return [
+        {"minute": minute.isoformat(), "votes": cached.get(_minute_key(election_id, minute), 0)}
+        for minute in buckets
+    ]
+
+
+def _increment(election_id, seeded: Dict[str, int], buckets: Dict[str, int]):
+    client = get_redis_client()
+    if client is not None:
+        keys = [cache.make_key(key) for key in [*seeded, _pending_key(election_id), *buckets]]
+        run_script(
+            client,
+            INCREMENT_SCRIPT,
+            keys,
+            [
+                len(seeded),
+                MINUTE_BUCKET_TIMEOUT,
+                _timeout(),
+                *seeded,
+                *seeded.values(),
+                *buckets.values(),
+            ],
+        )
+        return
+
+    missing = {}
+    for key, amount in seeded.items():
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Not seeded yet; kept for the seeding that counts from the database
+            missing[key] = amount
+    if missing:
+        pending = cache.get(_pending_key(election_id)) or {}
+        for key, amount in missing.items():
+            pending[key] = pending.get(key, 0) + amount
+        cache.set(_pending_key(election_id), pending, _timeout())
+    for key, amount in buckets.items():
+        cache.add(key, 0, MINUTE_BUCKET_TIMEOUT)
+        cache.incr(key, amount)
+
+
+def record_votes(election_id, votes: Iterable, new_voter: bool = False, now=None):
+    """Add freshly stored Vote rows of one election to its counters"""
+    amounts = Counter()
+    for vote in votes:
+        amounts[_counter_key(election_id, TOTAL)] += 1
+        amounts[_position_key(election_id, vote.position_id)] += 1
+        if vote.encrypted_vote_data:
+            amounts[_counter_key(election_id, ENCRYPTED)] += 1
+        if vote.integrity_verified and vote.signature_verified:
+            amounts[_counter_key(election_id, VERIFIED)] += 1
+    if not amounts:
+        return
+    if new_voter:
+        amounts[_counter_key(election_id, VOTERS)] += 1
+    bucket = {_minute_key(election_id, now or timezone.now()): amounts[_counter_key(election_id, TOTAL)]}
+    try:
+        _increment(election_id, dict(amounts), bucket)
+    except Exception as e:
+        # Drift is corrected by the next reconciliation
+        logger.error(f"Failed to update vote counters for election {election_id}: {str(e)}")
+
+
+def record_votes_on_commit(election_id, votes: Iterable, new_voter: bool = False):
+    """Count the votes only once the transaction storing them commits"""
+    votes = list(votes)
+    transaction.on_commit(lambda: record_votes(election_id, votes, new_voter))
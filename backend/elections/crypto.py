@@ -5,16 +5,174 @@ Provides encryption/decryption and digital signature capabilities
 
 import hashlib
 import hmac
+import logging
+import multiprocessing
+import os
 import secrets
-from typing import Dict, Tuple
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa, padding
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 from django.conf import settings
+from django.core.signals import setting_changed
 import base64
 import json
 
+logger = logging.getLogger(__name__)
+
+# (row key, decrypted vote data or None, error message or None)
+DecryptedRow = Tuple[Any, Optional[Dict], Optional[str]]
+# (row key, vote_hash valid, signature valid, error message or None)
+VerifiedRow = Tuple[Any, bool, bool, Optional[str]]
+
+
+def _get_hash_secret() -> bytes:
+    return getattr(settings, "VOTE_HASH_SECRET", "default-secret-key").encode()
+
+
+def _decrypt_with_cipher(cipher_suite: Fernet, encrypted_data: str) -> Dict:
+    """Decode, decrypt and unwrap one encrypted vote payload"""
+    encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode())
+    decrypted_data = cipher_suite.decrypt(encrypted_bytes)
+    enhanced_data = json.loads(decrypted_data.decode())
+    return enhanced_data["vote_data"]
+
+
+def _decrypt_rows(cipher_suite: Fernet, rows) -> list:
+    """Decrypt (key, encrypted_data) pairs, reporting failures instead of raising"""
+    results = []
+    for key, encrypted_data in rows:
+        if not encrypted_data:
+            results.append((key, None, "Missing encrypted vote data"))
+            continue
+        try:
+            results.append((key, _decrypt_with_cipher(cipher_suite, encrypted_data), None))
+        except Exception as e:
+            results.append((key, None, f"Failed to decrypt vote data: {str(e)}"))
+    return results
+
+
+def _compute_vote_hash(secret_key: bytes, voter_id, candidate_id, position_id, election_id, timestamp) -> str:
+    vote_string = f"{voter_id}:{candidate_id}:{position_id}:{election_id}:{timestamp}"
+    return hmac.new(secret_key, vote_string.encode(), hashlib.sha256).hexdigest()
+
+
+def _build_vote_verifier(symmetric_key: bytes, hash_secret: bytes, public_key_pems: Dict[str, bytes]):
+    public_keys = {
+        algorithm: serialization.load_pem_public_key(pem, backend=default_backend())
+        for algorithm, pem in public_key_pems.items()
+    }
+    return Fernet(symmetric_key), hash_secret, public_keys
+
+
+def _verify_rows(verifier, rows) -> list:
+    """Re-check (key, encrypted_data, vote_hash, signature_hex, signature_algorithm) rows.
+
+    Returns (key, integrity_valid, signature_valid, error) tuples; a vote that
+    cannot be decrypted fails both checks.
+    """
+    cipher_suite, hash_secret, public_keys = verifier
+    results = []
+    for key, encrypted_data, vote_hash, signature_hex, algorithm in rows:
+        if not encrypted_data:
+            results.append((key, False, False, "Missing encrypted vote data"))
+            continue
+        try:
+            vote_data = _decrypt_with_cipher(cipher_suite, encrypted_data)
+            expected_hash = _compute_vote_hash(
+                hash_secret,
+                vote_data["voter_id"],
+                vote_data["candidate_id"],
+                vote_data["position_id"],
+                vote_data["election_id"],
+                vote_data["timestamp"],
+            )
+            hash_valid = hmac.compare_digest(vote_hash or "", expected_hash)
+            vote_bytes = json.dumps(vote_data, sort_keys=True).encode()
+            public_key = public_keys.get(algorithm)
+            signature_valid = public_key is not None and SIGNATURE_BACKENDS[
+                algorithm
+            ].verify_with_key(public_key, vote_bytes, bytes.fromhex(signature_hex or ""))
+            results.append((key, hash_valid, signature_valid, None))
+        except Exception as e:
+            results.append((key, False, False, f"Failed to verify vote: {str(e)}"))
+    return results
+
+
+# Per-worker-process state (cipher, verifier), built once by the pool initializer
+_worker_state = None
+
+
+def _init_pool_worker(build_state, state_args):
+    global _worker_state
+    _worker_state = build_state(*state_args)
+
+
+def _run_pool_chunk(chunk_func, rows) -> list:
+    return chunk_func(_worker_state, rows)
+
+
+def _map_chunks(
+    rows: Iterable,
+    chunk_func: Callable,
+    build_state: Callable,
+    state_args: Tuple,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator:
+    """
+    Apply chunk_func(state, chunk) to rows split into chunks, across a process pool
+    (serially inside daemonic processes such as Celery prefork workers).
+    build_state(*state_args) runs once per worker; both callables must be module-level
+    so they can be pickled. Results are yielded in input order.
+    """
+    if workers is None:
+        workers = getattr(settings, "VOTE_DECRYPT_WORKERS", None) or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = getattr(settings, "VOTE_DECRYPT_CHUNK_SIZE", 500)
+
+    rows = iter(rows)
+    chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return
+    second_chunk = next(chunks, None)
+
+    # Small scans are not worth the cost of starting worker processes, and daemonic
+    # processes (Celery prefork workers) may not start any
+    if workers <= 1 or second_chunk is None or multiprocessing.current_process().daemon:
+        state = build_state(*state_args)
+        yield from chunk_func(state, first_chunk)
+        if second_chunk is not None:
+            yield from chunk_func(state, second_chunk)
+            for chunk in chunks:
+                yield from chunk_func(state, chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_pool_worker,
+        initargs=(build_state, state_args),
+    ) as executor:
+        # Keep a bounded window of chunks in flight so memory stays flat
+        pending = deque()
+        max_in_flight = workers * 2
+        for chunk in [first_chunk, second_chunk]:
+            pending.append(executor.submit(_run_pool_chunk, chunk_func, chunk))
+        for chunk in chunks:
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_run_pool_chunk, chunk_func, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
 
 class VotingCrypto:
     """Enhanced cryptographic utilities for secure voting"""
@@ -60,6 +218,9 @@ class VotingCrypto:
             # If we reach here, the provided key is invalid; fall through to generate
 
         # Generate new key (should be persisted in production)
+        logger.warning(
+            "VOTING_ENCRYPTION_KEY is missing or invalid; using an ephemeral key for this process"
+        )
         return Fernet.generate_key()
 
     def encrypt_vote_data(self, vote_data: Dict) -> str:
@@ -85,14 +246,54 @@ class VotingCrypto:
         Decrypt vote data and verify integrity
         """
         try:
-            # Decode and decrypt
-            encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode())
-            decrypted_data = self.cipher_suite.decrypt(encrypted_bytes)
-            enhanced_data = json.loads(decrypted_data.decode())
-            return enhanced_data["vote_data"]
+            return _decrypt_with_cipher(self.cipher_suite, encrypted_data)
         except Exception as e:
             raise ValueError(f"Failed to decrypt vote data: {str(e)}")
 
+    def bulk_decrypt_votes(
+        self,
+        rows: Iterable[Tuple[Any, str]],
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[DecryptedRow]:
+        """
+        Decrypt many (key, encrypted_data) pairs across a process pool.
+        Yields (key, vote_data, error) in input order; corrupt rows are yielded
+        with vote_data=None and an error message instead of being dropped.
+        """
+        return _map_chunks(
+            rows,
+            _decrypt_rows,
+            Fernet,
+            (self.symmetric_key,),
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+
+    def bulk_decrypt_queryset(
+        self,
+        queryset,
+        key_fields: Tuple[str, ...] = ("id",),
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[DecryptedRow]:
+        """
+        Stream a Vote queryset and decrypt it with bulk_decrypt_votes.
+        The key of each row is the value of key_fields (a tuple when several are given).
+        """
+        if chunk_size is None:
+            chunk_size = getattr(settings, "VOTE_DECRYPT_CHUNK_SIZE", 500)
+
+        values = queryset.values_list(*key_fields, "encrypted_vote_data").iterator(
+            chunk_size=chunk_size
+        )
+        if len(key_fields) == 1:
+            rows = ((row[0], row[1]) for row in values)
+        else:
+            rows = ((row[:-1], row[-1]) for row in values)
+
+        return self.bulk_decrypt_votes(rows, workers=workers, chunk_size=chunk_size)
+
     def generate_vote_hash(
         self,
         voter_id: str,
@@ -104,19 +305,10 @@ class VotingCrypto:
         """
         Generate cryptographic hash for vote integrity
         """
-        vote_string = (
-            f"{voter_id}:{candidate_id}:{position_id}:{election_id}:{timestamp}"
-        )
-
         # Use HMAC with secret key for additional security
-        secret_key = getattr(
-            settings, "VOTE_HASH_SECRET", "default-secret-key"
-        ).encode()
-        vote_hash = hmac.new(
-            secret_key, vote_string.encode(), hashlib.sha256
-        ).hexdigest()
-
-        return vote_hash
+        return _compute_vote_hash(
+            _get_hash_secret(), voter_id, candidate_id, position_id, election_id, timestamp
+        )
 
     def verify_vote_integrity(
         self,
@@ -159,34 +351,27 @@ class VotingCrypto:
         return hashlib.sha256(sorted_data.encode()).hexdigest()
 
 
-class DigitalSignature:
-    """Digital signature utilities for vote verification"""
+RSA_PSS_SHA256 = "rsa-pss-sha256"
+ED25519 = "ed25519"
 
-    def __init__(self):
-        self.private_key, self.public_key = self._load_or_generate_keys()
 
-    def _load_or_generate_keys(self) -> Tuple[rsa.RSAPrivateKey, rsa.RSAPublicKey]:
-        """Load existing keys or generate new RSA key pair"""
-        try:
-            # In production, load keys from secure storage
-            private_key = rsa.generate_private_key(
-                public_exponent=65537, key_size=2048, backend=default_backend()
-            )
-            public_key = private_key.public_key()
+class RSAPSSSignatureBackend:
+    """RSA-2048 with PSS padding over SHA-256 (the original vote signature scheme)"""
 
-            return private_key, public_key
-        except Exception:
-            # Fallback key generation
-            private_key = rsa.generate_private_key(
-                public_exponent=65537, key_size=2048, backend=default_backend()
-            )
-            return private_key, private_key.public_key()
+    algorithm = RSA_PSS_SHA256
+    key_type = rsa.RSAPrivateKey
+    key_path_setting = "VOTE_SIGNING_KEY_PATH"
+    inline_key_setting = "VOTE_SIGNING_PRIVATE_KEY"
 
-    def sign_vote(self, vote_data: bytes) -> bytes:
-        """
-        Create digital signature for vote data
-        """
-        signature = self.private_key.sign(
+    @staticmethod
+    def generate_private_key(key_size: Optional[int] = None):
+        return rsa.generate_private_key(
+            public_exponent=65537, key_size=key_size or 2048, backend=default_backend()
+        )
+
+    @staticmethod
+    def sign_with_key(private_key, vote_data: bytes) -> bytes:
+        return private_key.sign(
             vote_data,
             padding.PSS(
                 mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH
@@ -194,14 +379,10 @@ class DigitalSignature:
             hashes.SHA256(),
         )
 
-        return signature
-
-    def verify_vote_signature(self, vote_data: bytes, signature: bytes) -> bool:
-        """
-        Verify digital signature of vote data
-        """
+    @staticmethod
+    def verify_with_key(public_key, vote_data: bytes, signature: bytes) -> bool:
         try:
-            self.public_key.verify(
+            public_key.verify(
                 signature,
                 vote_data,
                 padding.PSS(
@@ -215,6 +396,242 @@ class DigitalSignature:
             return False
 
 
+class Ed25519SignatureBackend:
+    """Ed25519 signatures: much cheaper to produce than RSA, 64-byte signatures"""
+
+    algorithm = ED25519
+    key_type = ed25519.Ed25519PrivateKey
+    key_path_setting = "VOTE_ED25519_KEY_PATH"
+    inline_key_setting = "VOTE_ED25519_PRIVATE_KEY"
+
+    @staticmethod
+    def generate_private_key(key_size: Optional[int] = None):
+        # Ed25519 keys have a fixed size
+        return ed25519.Ed25519PrivateKey.generate()
+
+    @staticmethod
+    def sign_with_key(private_key, vote_data: bytes) -> bytes:
+        return private_key.sign(vote_data)
+
+    @staticmethod
+    def verify_with_key(public_key, vote_data: bytes, signature: bytes) -> bool:
+        try:
+            public_key.verify(signature, vote_data)
+            return True
+        except Exception:
+            return False
+
+
+# Stored on each Vote as signature_algorithm so old votes verify after a switch
+SIGNATURE_BACKENDS = {
+    backend.algorithm: backend for backend in (RSAPSSSignatureBackend, Ed25519SignatureBackend)
+}
+
+
+def get_signature_algorithm() -> str:
+    """Signature algorithm used for new votes (VOTE_SIGNATURE_ALGORITHM)"""
+    algorithm = getattr(settings, "VOTE_SIGNATURE_ALGORITHM", RSA_PSS_SHA256) or RSA_PSS_SHA256
+    if algorithm not in SIGNATURE_BACKENDS:
+        logger.error(
+            f"Unknown VOTE_SIGNATURE_ALGORITHM {algorithm!r}; falling back to {RSA_PSS_SHA256}"
+        )
+        return RSA_PSS_SHA256
+    return algorithm
+
+
+class DigitalSignature:
+    """Digital signature utilities for vote verification"""
+
+    def __init__(self, algorithm: Optional[str] = None):
+        self.algorithm = algorithm or get_signature_algorithm()
+        # algorithm -> (private_key, public_key); keys for algorithms other than
+        # the signing one are only loaded when a vote using them is verified
+        self._keys = {}
+        self._keys_lock = threading.Lock()
+        self.private_key, self.public_key = self._get_keys(self.algorithm)
+
+    def _get_keys(self, algorithm: str) -> Tuple[Any, Any]:
+        if algorithm not in self._keys:
+            with self._keys_lock:
+                if algorithm not in self._keys:
+                    self._keys[algorithm] = self._load_or_generate_keys(algorithm)
+        return self._keys[algorithm]
+
+    def _load_or_generate_keys(self, algorithm: str) -> Tuple[Any, Any]:
+        """Load the signing key for an algorithm from the key store or generate a new key pair"""
+        backend = SIGNATURE_BACKENDS[algorithm]
+        private_key = load_signing_key(algorithm)
+        if private_key is not None:
+            return private_key, private_key.public_key()
+
+        # Fallback key generation (signatures only verifiable within this process)
+        logger.warning(
+            f"No {algorithm} vote signing key is configured ({backend.key_path_setting} / "
+            f"{backend.inline_key_setting}); generating an ephemeral key"
+        )
+        private_key = backend.generate_private_key()
+        return private_key, private_key.public_key()
+
+    def public_key_pem(self, algorithm: Optional[str] = None) -> bytes:
+        _private_key, public_key = self._get_keys(algorithm or self.algorithm)
+        return public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+
+    def sign_vote(self, vote_data: bytes) -> bytes:
+        """
+        Create digital signature for vote data with the configured algorithm
+        """
+        return SIGNATURE_BACKENDS[self.algorithm].sign_with_key(self.private_key, vote_data)
+
+    def verify_vote_signature(
+        self, vote_data: bytes, signature: bytes, algorithm: Optional[str] = None
+    ) -> bool:
+        """
+        Verify digital signature of vote data; algorithm is the tag stored on the vote
+        """
+        algorithm = algorithm or self.algorithm
+        if algorithm not in SIGNATURE_BACKENDS:
+            return False
+        _private_key, public_key = self._get_keys(algorithm)
+        return SIGNATURE_BACKENDS[algorithm].verify_with_key(public_key, vote_data, signature)
+
+
+def _load_pem_private_key(key_bytes: bytes):
+    # Allow single-line env values with escaped newlines
+    key_bytes = bytes(key_bytes).replace(b"\\n", b"\n")
+    return serialization.load_pem_private_key(key_bytes, password=None, backend=default_backend())
+
+
+def load_signing_key(algorithm: str = RSA_PSS_SHA256):
+    """
+    Signing key store: read the algorithm's PEM private key from its key path
+    setting (e.g. VOTE_SIGNING_KEY_PATH), falling back to the inline PEM setting.
+    Returns None when neither is configured or loadable.
+    """
+    backend = SIGNATURE_BACKENDS[algorithm]
+
+    key_path = getattr(settings, backend.key_path_setting, None)
+    if key_path:
+        try:
+            with open(key_path, "rb") as key_file:
+                private_key = _load_pem_private_key(key_file.read())
+            if isinstance(private_key, backend.key_type):
+                return private_key
+            logger.error(f"Signing key at {backend.key_path_setting} is not an {algorithm} key")
+        except Exception as e:
+            logger.error(f"Signing key at {backend.key_path_setting} could not be loaded: {str(e)}")
+
+    key_setting = getattr(settings, backend.inline_key_setting, None)
+    if key_setting:
+        try:
+            key_bytes = (
+                key_setting if isinstance(key_setting, (bytes, bytearray)) else str(key_setting).encode()
+            )
+            private_key = _load_pem_private_key(key_bytes)
+            if isinstance(private_key, backend.key_type):
+                return private_key
+            logger.error(f"{backend.inline_key_setting} is not an {algorithm} key")
+        except Exception as e:
+            logger.error(f"{backend.inline_key_setting} could not be loaded: {str(e)}")
+
+    return None
+
+
+def generate_signing_key_pem(algorithm: str = RSA_PSS_SHA256, key_size: Optional[int] = None) -> bytes:
+    """Generate a new signing private key serialized as unencrypted PKCS8 PEM"""
+    private_key = SIGNATURE_BACKENDS[algorithm].generate_private_key(key_size)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+# Process-wide crypto services. Building a VotingCrypto parses the key settings
+# and a DigitalSignature may generate a signing key, so both are created once.
+_services_lock = threading.Lock()
+_voting_crypto = None
+_digital_signature = None
+
+# Settings that invalidate the cached services when changed (e.g. override_settings)
+CRYPTO_SETTINGS = {
+    "VOTING_ENCRYPTION_KEY",
+    "VOTE_HASH_SECRET",
+    "VOTER_ANONYMIZATION_SALT",
+    "VOTE_SIGNING_PRIVATE_KEY",
+    "VOTE_SIGNING_KEY_PATH",
+    "VOTE_SIGNATURE_ALGORITHM",
+    "VOTE_ED25519_KEY_PATH",
+    "VOTE_ED25519_PRIVATE_KEY",
+}
+
+
+def get_voting_crypto() -> VotingCrypto:
+    """Return the lazily initialised VotingCrypto shared by this process"""
+    global _voting_crypto
+    if _voting_crypto is None:
+        with _services_lock:
+            if _voting_crypto is None:
+                _voting_crypto = VotingCrypto()
+    return _voting_crypto
+
+
+def get_digital_signature() -> DigitalSignature:
+    """Return the lazily initialised DigitalSignature shared by this process"""
+    global _digital_signature
+    if _digital_signature is None:
+        with _services_lock:
+            if _digital_signature is None:
+                _digital_signature = DigitalSignature()
+    return _digital_signature
+
+
+def bulk_verify_votes(
+    rows: Iterable[Tuple[Any, str, str, str, str]],
+    algorithms: Iterable[str] = (RSA_PSS_SHA256,),
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[VerifiedRow]:
+    """
+    Re-check vote hashes and signatures for (key, encrypted_data, vote_hash,
+    signature_hex, signature_algorithm) rows across a process pool, using the
+    shared encryption key, hash secret and the public keys of the given
+    signature algorithms. Yields (key, integrity_valid, signature_valid, error)
+    in input order.
+    """
+    signer = get_digital_signature()
+    state_args = (
+        get_voting_crypto().symmetric_key,
+        _get_hash_secret(),
+        {
+            algorithm: signer.public_key_pem(algorithm)
+            for algorithm in algorithms
+            if algorithm in SIGNATURE_BACKENDS
+        },
+    )
+    return _map_chunks(
+        rows, _verify_rows, _build_vote_verifier, state_args, workers=workers, chunk_size=chunk_size
+    )
+
+
+def reset_crypto_services():
+    """Drop the cached crypto services so they are rebuilt from current settings"""
+    global _voting_crypto, _digital_signature
+    with _services_lock:
+        _voting_crypto = None
+        _digital_signature = None
+
+
+def _reset_crypto_services_on_setting_change(setting, **kwargs):
+    if setting in CRYPTO_SETTINGS:
+        reset_crypto_services()
+
+
+setting_changed.connect(_reset_crypto_services_on_setting_change)
+
+
 # Security configuration checker
 def check_security_configuration() -> Dict[str, bool]:
     """
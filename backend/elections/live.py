@@ -0,0 +1,162 @@
+"""
+Live turnout feed for EC dashboards
+Each ASGI process runs at most one producer per election. It reads the cached
+vote counters every LIVE_TURNOUT_INTERVAL seconds and fans each changed
+snapshot out to every connected dashboard, so the number of open dashboards
+does not change the load on the cache or the database. Producers start with
+their first subscriber and stop once the last one disconnects.
+
+Snapshots are numbered by a sequence kept in the shared cache, so every
+process and every request agrees on it and a dashboard can resume from the
+last sequence it saw, whichever worker answers.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Dict, Optional, Set
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .ballot_definition import get_ballot_definition
+from .counters import get_election_counts, get_votes_per_minute
+
+logger = logging.getLogger(__name__)
+
+ELIGIBLE_VOTERS_KEY = "live_turnout:eligible_voters"
+ELIGIBLE_VOTERS_TIMEOUT = 60
+SNAPSHOT_KEY = "live_turnout:{}:snapshot"
+SEQUENCE_KEY = "live_turnout:{}:sequence"
+
+
+def _interval() -> float:
+    return getattr(settings, "LIVE_TURNOUT_INTERVAL", 2)
+
+
+def get_eligible_voter_count() -> int:
+    """Verified exhibition entries, as in admin_stats; shared by every producer for a minute"""
+    from accounts.models import ExhibitionEntry
+
+    return cache.get_or_set(
+        ELIGIBLE_VOTERS_KEY,
+        lambda: ExhibitionEntry.objects.filter(is_verified=True).count(),
+        ELIGIBLE_VOTERS_TIMEOUT,
+    )
+
+
+def build_turnout_snapshot(election_id) -> Optional[Dict]:
+    """Turnout, votes per position and votes per minute from the counters; None if the election is gone"""
+    definition = get_ballot_definition(election_id)
+    if definition is None:
+        return None
+
+    counts = get_election_counts(
+        election_id, [position.id for position in definition.positions]
+    )
+    eligible_voters = get_eligible_voter_count()
+    return {
+        "election_id": definition.election_id,
+        "status": definition.status,
+        "voters": counts["voters"],
+        "eligible_voters": eligible_voters,
+        "turnout_percentage": (
+            round(counts["voters"] / eligible_voters * 100, 2) if eligible_voters else 0.0
+        ),
+        "total_votes": counts["total"],
+        "positions": [
+            {
+                "position_id": position.id,
+                "title": position.title,
+                "votes": counts["positions"][position.id],
+            }
+            for position in definition.positions
+        ],
+        "votes_per_minute": get_votes_per_minute(
+            election_id, getattr(settings, "LIVE_TURNOUT_MINUTES", 60)
+        ),
+    }
+
+
+def stamp_turnout_snapshot(election_id, data: Dict) -> Dict:
+    """data numbered with the election's shared sequence, which moves on only when data changed"""
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    snapshot_key = SNAPSHOT_KEY.format(election_id)
+    current = cache.get(snapshot_key)
+    if current is not None and current["digest"] == digest:
+        return current["snapshot"]
+
+    sequence_key = SEQUENCE_KEY.format(election_id)
+    cache.add(sequence_key, 0, None)
+    snapshot = {"sequence": cache.incr(sequence_key), **data}
+    cache.set(snapshot_key, {"digest": digest, "snapshot": snapshot}, None)
+    return snapshot
+
+
+def current_turnout_snapshot(election_id) -> Optional[Dict]:
+    """The election's latest numbered snapshot; None if the election is gone"""
+    data = build_turnout_snapshot(election_id)
+    if data is None:
+        return None
+    return stamp_turnout_snapshot(election_id, data)
+
+
+class TurnoutProducer:
+    """Polls one election's counters and publishes snapshots to subscriber queues"""
+
+    def __init__(self, election_id):
+        self.election_id = str(election_id)
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.snapshot: Optional[Dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        # Dashboards only need the latest snapshot, so each queue holds one
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers.add(queue)
+        if self.snapshot is not None:
+            queue.put_nowait(self.snapshot)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, snapshot: Dict):
+        self.snapshot = snapshot
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(self.snapshot)
+
+    async def _run(self):
+        try:
+            while self.subscribers:
+                try:
+                    snapshot = await sync_to_async(current_turnout_snapshot)(self.election_id)
+                except Exception as e:
+                    logger.error(f"Live turnout update failed for election {self.election_id}: {str(e)}")
+                else:
+                    if snapshot is not None and (
+                        self.snapshot is None or snapshot["sequence"] != self.snapshot["sequence"]
+                    ):
+                        self.publish(snapshot)
+                await asyncio.sleep(_interval())
+        finally:
+            if not self.subscribers and _producers.get(self.election_id) is self:
+                del _producers[self.election_id]
+
+
+_producers: Dict[str, TurnoutProducer] = {}
+
+
+def get_turnout_producer(election_id) -> TurnoutProducer:
+    """The process-wide producer for an election"""
+    key = str(election_id)
+    producer = _producers.get(key)
+    if producer is None:
+        producer = _producers[key] = TurnoutProducer(key)
+    return producer
@@ -0,0 +1,69 @@
+import json
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from elections.crypto import SIGNATURE_BACKENDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark vote signing and verification for each signature backend "
+        "using throwaway keys"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--votes",
+            type=int,
+            default=1000,
+            help="Votes to sign and verify per backend (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        count = options["votes"]
+        # Same shape as the payload signed by Vote.create_secure_vote
+        payloads = [
+            json.dumps(
+                {
+                    "voter_id": str(uuid.uuid4()),
+                    "voter_username": f"voter{i}",
+                    "voter_student_id": f"ST{i:06d}",
+                    "candidate_id": str(uuid.uuid4()),
+                    "candidate_name": f"ST{i + 1:06d}",
+                    "position_id": str(uuid.uuid4()),
+                    "position_title": "President",
+                    "election_id": str(uuid.uuid4()),
+                    "election_title": "GMSA General Election",
+                    "timestamp": timezone.now().isoformat(),
+                    "approve": True,
+                },
+                sort_keys=True,
+            ).encode()
+            for i in range(count)
+        ]
+
+        self.stdout.write(f"{'algorithm':<16}{'sign/s':>12}{'verify/s':>12}")
+        for algorithm, backend in SIGNATURE_BACKENDS.items():
+            private_key = backend.generate_private_key()
+            public_key = private_key.public_key()
+
+            started = time.perf_counter()
+            signatures = [backend.sign_with_key(private_key, payload) for payload in payloads]
+            sign_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            verified = all(
+                backend.verify_with_key(public_key, payload, signature)
+                for payload, signature in zip(payloads, signatures)
+            )
+            verify_seconds = time.perf_counter() - started
+
+            if not verified:
+                self.stdout.write(self.style.ERROR(f"{algorithm}: signature verification failed"))
+                continue
+
+            self.stdout.write(
+                f"{algorithm:<16}{count / sign_seconds:>12.0f}{count / verify_seconds:>12.0f}"
+            )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from elections.models import Election
+from elections.tally import (
+    FINAL_ELECTION_STATUSES,
+    check_tally_consistency,
+    materialize_election_tally,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-derive materialized election tallies from the encrypted votes and "
+        "report any drift"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "election_ids",
+            nargs="*",
+            help="Elections to check (default: all completed and archived elections)",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rebuild the stored tally for elections that drifted or were never materialized",
+        )
+
+    def handle(self, *args, **options):
+        if options["election_ids"]:
+            elections = Election.objects.filter(id__in=options["election_ids"])
+        else:
+            elections = Election.objects.filter(status__in=FINAL_ELECTION_STATUSES)
+
+        drifted = 0
+        for election in elections:
+            drift = check_tally_consistency(election.id)
+            if not drift:
+                self.stdout.write(self.style.SUCCESS(f"OK      {election.id} {election.title}"))
+                continue
+
+            drifted += 1
+            self.stdout.write(self.style.ERROR(f"DRIFT   {election.id} {election.title}"))
+            for item in drift:
+                self.stdout.write(f"        {item}")
+
+            if options["repair"]:
+                materialize_election_tally(election.id)
+                self.stdout.write(self.style.WARNING("        tally rebuilt"))
+
+        if drifted and not options["repair"]:
+            raise CommandError(f"{drifted} election(s) have tally drift")
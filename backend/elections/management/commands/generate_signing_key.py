@@ -0,0 +1,50 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from elections.crypto import SIGNATURE_BACKENDS, RSA_PSS_SHA256, generate_signing_key_pem
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the private key used to sign votes (PEM) for VOTE_SIGNING_KEY_PATH "
+        "or, with --algorithm ed25519, VOTE_ED25519_KEY_PATH"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Where to write the PEM private key")
+        parser.add_argument(
+            "--algorithm",
+            choices=sorted(SIGNATURE_BACKENDS),
+            default=RSA_PSS_SHA256,
+            help=f"Signature scheme (default: {RSA_PSS_SHA256})",
+        )
+        parser.add_argument(
+            "--key-size",
+            type=int,
+            default=2048,
+            help="RSA key size in bits (default: 2048; ignored for ed25519)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Overwrite an existing key file (existing signatures will no longer verify)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if os.path.exists(path) and not options["force"]:
+            raise CommandError(f"{path} already exists; use --force to replace it")
+
+        backend = SIGNATURE_BACKENDS[options["algorithm"]]
+        pem = generate_signing_key_pem(options["algorithm"], options["key_size"])
+        # Owner read/write only
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as key_file:
+            key_file.write(pem)
+
+        self.stdout.write(self.style.SUCCESS(f"Signing key written to {path}"))
+        self.stdout.write(f"{backend.key_path_setting}={os.path.abspath(path)}")
+        self.stdout.write("")
+        self.stdout.write(
+            "Note: Keep this file out of version control and restart the server and workers."
+        )
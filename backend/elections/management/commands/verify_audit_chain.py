@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from elections.audit_chain import verify_audit_chain
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify the audit log hash chain from the last checkpoint and record a new "
+        "checkpoint when it is intact"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Verify from the first entry instead of the last checkpoint",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Entries read per query (default: AUDIT_VERIFY_CHUNK_SIZE)",
+        )
+        parser.add_argument(
+            "--no-checkpoint",
+            action="store_true",
+            help="Do not record a checkpoint after a successful run",
+        )
+
+    def handle(self, *args, **options):
+        summary = verify_audit_chain(
+            full=options["full"],
+            chunk_size=options["chunk_size"],
+            checkpoint=not options["no_checkpoint"],
+        )
+
+        self.stdout.write(
+            f"Verified {summary['entries_verified']} entries "
+            f"(sequence {summary['start_sequence'] + 1} to {summary['end_sequence']})"
+        )
+        for failure in summary["failures"]:
+            self.stdout.write(self.style.ERROR(f"  {failure['sequence']}: {failure['reason']}"))
+
+        if summary["failure_count"]:
+            raise CommandError(f"{summary['failure_count']} problem(s) found in the audit chain")
+        if summary["checkpoint_id"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Checkpoint recorded at sequence {summary['end_sequence']}")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Audit chain intact"))
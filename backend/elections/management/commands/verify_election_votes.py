@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from elections.integrity import verify_election_votes
+from elections.models import Election
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-check the hash and digital signature of every vote in an election and "
+        "store the integrity_verified / signature_verified flags"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("election_ids", nargs="+", help="Elections to verify")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Worker processes (default: VOTE_DECRYPT_WORKERS or one per CPU)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Votes per worker chunk (default: VOTE_DECRYPT_CHUNK_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        elections = Election.objects.filter(id__in=options["election_ids"])
+
+        failed = 0
+        for election in elections:
+            summary = verify_election_votes(
+                election.id, workers=options["workers"], chunk_size=options["chunk_size"]
+            )
+            invalid = summary["total_votes"] - summary["valid_votes"]
+            style = self.style.SUCCESS if not invalid else self.style.ERROR
+            self.stdout.write(
+                style(
+                    f"{election.id} {election.title}: {summary['valid_votes']}/"
+                    f"{summary['total_votes']} valid"
+                )
+            )
+            if invalid:
+                failed += 1
+                self.stdout.write(
+                    f"        integrity failures: {summary['integrity_failures']}, "
+                    f"signature failures: {summary['signature_failures']}, "
+                    f"unreadable: {summary['unreadable_votes']}"
+                )
+
+        if failed:
+            raise CommandError(f"{failed} election(s) have votes that failed verification")
@@ -5,10 +5,12 @@ Security middleware for voting system
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth import get_user_model
-from django.core.cache import cache, caches
 from django.conf import settings
-from .models import AuditLog, VotingSession
+from .audit import log_audit_event
 from .crypto import create_audit_entry
+from utils.network import get_client_ip
+from .ratelimit import is_rate_limited
+from .session_tracking import parse_election_id, track_voting_request
 
 
 User = get_user_model()
@@ -50,52 +52,40 @@ class SecurityMiddleware(MiddlewareMixin):
         return response
 
     def _is_rate_limited(self, request):
-        """Check if request should be rate limited"""
+        """Check if request should be rate limited (limits per path prefix in settings.RATE_LIMITS)"""
 
-        # Get client IP
-        ip = self._get_client_ip(request)
+        return is_rate_limited(request.path, self._rate_limit_identity(request))
 
-        # Different limits for different endpoints
-        limits = {
-            "/api/elections/vote/": (10, 60),  # 10 votes per minute
-            "/api/auth/login/": (5, 300),  # 5 login attempts per 5 minutes
-            "/api/auth/register/": (3, 3600),  # 3 registrations per hour
-        }
+    def _rate_limit_identity(self, request):
+        """Authenticated users are limited per account, everyone else per client IP"""
 
-        for endpoint, (max_requests, window) in limits.items():
-            if request.path.startswith(endpoint):
-                return self._check_rate_limit(ip, endpoint, max_requests, window)
+        user_id = self._authenticated_user_id(request)
+        if user_id:
+            return f"user:{user_id}"
+        return f"ip:{self._get_client_ip(request)}"
 
-        # Default rate limit
-        return self._check_rate_limit(ip, "default", 60, 60)  # 60 requests per minute
+    def _authenticated_user_id(self, request):
+        """The session user's id, or the user id in a valid JWT access token"""
 
-    def _check_rate_limit(self, key, endpoint, max_requests, window):
-        """Check rate limit for specific key and endpoint"""
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.id
 
-        cache_key = f"rate_limit:{endpoint}:{key}"
-        try:
-            current_requests = cache.get(cache_key, 0)
-        except Exception:
-            # Fallback to local memory cache if default cache (Redis) is unavailable
-            try:
-                local_cache = caches["local"]
-            except Exception:
-                local_cache = cache
-            current_requests = local_cache.get(cache_key, 0)
-
-        if current_requests >= max_requests:
-            return True
-
-        # Increment counter
+        # DRF authenticates JWTs after the middleware; the signed claim is enough here
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+        from rest_framework_simplejwt.settings import api_settings
+
+        authentication = JWTAuthentication()
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+        if raw_token is None:
+            return None
         try:
-            cache.set(cache_key, current_requests + 1, window)
-        except Exception:
-            try:
-                local_cache = caches["local"]
-            except Exception:
-                local_cache = cache
-            local_cache.set(cache_key, current_requests + 1, window)
-        return False
+            token = authentication.get_validated_token(raw_token)
+        except (InvalidToken, TokenError):
+            return None
+        return token.get(api_settings.USER_ID_CLAIM)
 
     def _requires_ip_whitelist(self, request):
         """Check if request requires IP whitelisting"""
@@ -120,15 +110,9 @@ class SecurityMiddleware(MiddlewareMixin):
         return client_ip in whitelisted_ips or not whitelisted_ips
 
     def _get_client_ip(self, request):
-        """Get real client IP address"""
+        """Get real client IP address (X-Forwarded-For only from trusted proxies)"""
 
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0]
-        else:
-            ip = request.META.get("REMOTE_ADDR")
-
-        return ip
+        return get_client_ip(request)
 
     def _log_user_action(self, request, response):
         """Log user actions for audit trail"""
@@ -174,12 +158,12 @@ class SecurityMiddleware(MiddlewareMixin):
                 },
             )
 
-            # Save to database
-            AuditLog.objects.create(
-                action=action,
-                user=request.user,
-                resource_type=resource_type,
-                resource_id=resource_id,
+            # Queue for the batched audit writer
+            log_audit_event(
+                action,
+                resource_type,
+                resource_id,
+                user_id=request.user.id,
                 ip_address=self._get_client_ip(request),
                 user_agent=request.META.get("HTTP_USER_AGENT", ""),
                 details=audit_data["details"],
@@ -233,32 +217,26 @@ class VotingSessionMiddleware(MiddlewareMixin):
         return None
 
     def _start_or_update_session(self, request):
-        """Start new voting session or update existing one"""
+        """Record the request in the cached session; flush_voting_sessions writes it"""
 
         try:
-            # Extract election ID from path
-            election_id = self._extract_election_id(request.path)
+            # /api/elections/vote/ carries the election in its body; cast_ballot
+            # records those sessions itself
+            election_id = parse_election_id(self._extract_election_id(request.path))
             if not election_id:
                 return
 
-            from elections.models import Election
-
-            election = Election.objects.get(id=election_id)
+            ip_address = get_client_ip(request)
+            if not ip_address:
+                return
 
-            # Get or create voting session
-            session, created = VotingSession.objects.get_or_create(
-                user=request.user,
-                election=election,
-                session_end__isnull=True,  # Active session
-                defaults={
-                    "ip_address": self._get_client_ip(request),
-                    "user_agent": request.META.get("HTTP_USER_AGENT", ""),
-                },
+            track_voting_request(
+                request.user.id,
+                election_id,
+                ip_address,
+                request.META.get("HTTP_USER_AGENT", ""),
             )
 
-            # Check for suspicious activity
-            self._check_suspicious_activity(session, request)
-
         except Exception as e:
             print(f"Session tracking error: {e}")
 
@@ -273,37 +251,6 @@ class VotingSessionMiddleware(MiddlewareMixin):
 
         return None
 
-    def _check_suspicious_activity(self, session, request):
-        """Check for suspicious voting activity"""
-
-        current_ip = self._get_client_ip(request)
-
-        # Check for IP address changes
-        if session.ip_address != current_ip:
-            session.mark_suspicious("IP address changed during session")
-
-        # Check for rapid voting
-        recent_votes = session.votes_cast
-        if recent_votes > 10:  # More than 10 votes in session
-            session.mark_suspicious("Unusually high number of votes")
-
-        # Check for user agent changes
-        current_ua = request.META.get("HTTP_USER_AGENT", "")
-        if session.user_agent != current_ua:
-            session.mark_suspicious("User agent changed during session")
-
-    def _get_client_ip(self, request):
-        """Get real client IP address"""
-
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0]
-        else:
-            ip = request.META.get("REMOTE_ADDR")
-
-        return ip
-
-
 class SecureHeadersMiddleware(MiddlewareMixin):
     """Add security headers to responses"""
 
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0009_alter_election_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TallySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_votes', models.PositiveIntegerField(default=0)),
+                ('total_voters', models.PositiveIntegerField(default=0)),
+                ('corrupt_votes', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('election', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tally_snapshot', to='elections.election')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TallyEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position_id', models.UUIDField()),
+                ('candidate_id', models.UUIDField(blank=True, null=True)),
+                ('approve', models.BooleanField(blank=True, null=True)),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='elections.tallysnapshot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'position_id', 'candidate_id', 'approve'), name='unique_tally_entry_per_choice')],
+            },
+        ),
+    ]
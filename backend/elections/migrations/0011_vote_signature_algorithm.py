@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0010_tallysnapshot_tallyentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='signature_algorithm',
+            field=models.CharField(default='rsa-pss-sha256', max_length=20),
+        ),
+    ]
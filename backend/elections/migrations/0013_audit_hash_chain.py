@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+def chain_existing_entries(apps, schema_editor):
+    """
+    Link existing audit entries into the hash chain in timestamp order
+    """
+    from elections.audit_chain import GENESIS_HASH, compute_chain_hash
+
+    AuditLog = apps.get_model("elections", "AuditLog")
+
+    sequence, previous_hash = 0, GENESIS_HASH
+    pending = []
+    for audit_log in AuditLog.objects.order_by("timestamp", "id").only("id", "integrity_hash").iterator(
+        chunk_size=1000
+    ):
+        sequence += 1
+        audit_log.sequence = sequence
+        audit_log.chain_hash = compute_chain_hash(previous_hash, sequence, audit_log.integrity_hash)
+        previous_hash = audit_log.chain_hash
+        pending.append(audit_log)
+        if len(pending) >= 1000:
+            AuditLog.objects.bulk_update(pending, ["sequence", "chain_hash"])
+            pending = []
+    if pending:
+        AuditLog.objects.bulk_update(pending, ["sequence", "chain_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0012_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.BigIntegerField()),
+                ('chain_hash', models.CharField(max_length=64)),
+                ('entries_verified', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-sequence'],
+            },
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='chain_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='sequence',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.RunPython(chain_existing_entries, migrations.RunPython.noop),
+    ]
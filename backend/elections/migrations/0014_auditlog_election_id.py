@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:32
+
+import uuid
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_election_ids(apps, schema_editor):
+    """
+    Fill election_id from details["election_id"] on existing audit entries
+    """
+    AuditLog = apps.get_model("elections", "AuditLog")
+
+    def election_id(details):
+        try:
+            return uuid.UUID(str(details["election_id"])) if details["election_id"] else None
+        except ValueError:
+            return None
+
+    pending = []
+    entries = AuditLog.objects.filter(details__has_key="election_id").only("id", "details")
+    for audit_log in entries.iterator(chunk_size=1000):
+        audit_log.election_id = election_id(audit_log.details)
+        pending.append(audit_log)
+        if len(pending) >= 1000:
+            AuditLog.objects.bulk_update(pending, ["election_id"])
+            pending = []
+    if pending:
+        AuditLog.objects.bulk_update(pending, ["election_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0013_audit_hash_chain'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='election_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        # Backfill before the indexes are built
+        migrations.RunPython(copy_election_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['election_id', 'sequence'], name='elections_a_electio_addc55_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['election_id', 'resource_type'], name='elections_a_electio_3957ea_idx'),
+        ),
+    ]
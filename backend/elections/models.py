@@ -1,10 +1,13 @@
 import profile
+import logging
 import uuid
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
 import json
 
+logger = logging.getLogger(__name__)
+
 
 class Election(models.Model):
     STATUS_CHOICES = [
@@ -55,24 +58,18 @@ class Election(models.Model):
     @property
     def total_votes(self):
         """Count total votes in this election"""
-        return Vote.objects.filter(election_id=self.id).count()
+        from .counters import get_total_votes
+
+        return get_total_votes(self.id)
 
     @property
     def total_voters(self):
         """Count unique voters in this election by decrypting voter_id and deduplicating.
         Note: This preserves anonymity externally and runs server-side only.
         """
-        from .crypto import VotingCrypto
+        from .tally import get_election_tally
 
-        crypto = VotingCrypto()
-        voter_ids = set()
-        for v in Vote.objects.filter(election_id=self.id).only("encrypted_vote_data"):
-            try:
-                data = crypto.decrypt_vote_data(v.encrypted_vote_data)
-                voter_ids.add(data.get("voter_id"))
-            except Exception:
-                continue
-        return len(voter_ids)
+        return get_election_tally(self.id).total_voters
 
 
 class Position(models.Model):
@@ -95,7 +92,9 @@ class Position(models.Model):
     @property
     def total_votes(self):
         """Count total votes for this position"""
-        return Vote.objects.filter(position_id=self.id).count()
+        from .counters import get_position_total
+
+        return get_position_total(self.election_id, self.id)
 
 
 class Candidate(models.Model):
@@ -133,9 +132,18 @@ class Candidate(models.Model):
     @property
     def vote_count(self):
         """Count votes for this candidate by decrypting vote data"""
-        from .crypto import VotingCrypto
+        from .crypto import get_voting_crypto
+        from .tally import load_materialized_tally
 
-        crypto = VotingCrypto()
+        # Set by list views that load one tally per election for all of their rows
+        tally = getattr(self, "_election_tally", None)
+        if tally is None:
+            # Final elections are served from the materialized tally without decryption
+            tally = load_materialized_tally(self.position.election_id)
+        if tally is not None:
+            return tally.vote_count(self.id)
+
+        crypto = get_voting_crypto()
 
         count = 0
         votes_for_position = Vote.objects.filter(position_id=self.position.id)
@@ -185,6 +193,9 @@ class Vote(models.Model):
         max_length=64, null=True, blank=True
     )  # Cryptographic hash for integrity
     digital_signature = models.TextField(null=True, blank=True)  # Digital signature
+    signature_algorithm = models.CharField(
+        max_length=20, default="rsa-pss-sha256"
+    )  # Scheme used for digital_signature (see crypto.SIGNATURE_BACKENDS)
     anonymous_voter_token = models.CharField(
         max_length=32, unique=True, null=True, blank=True
     )  # Anonymized voter ID
@@ -213,15 +224,28 @@ class Vote(models.Model):
         return f"Anonymous vote {short_id} in election {self.election_id}"
 
     @classmethod
-    def create_secure_vote(cls, voter, candidate, ip_address=None, approve: bool = True):
+    def build_secure_vote(
+        cls,
+        voter,
+        candidate,
+        ip_address=None,
+        approve: bool = True,
+        position=None,
+        election=None,
+        crypto=None,
+        signature_util=None,
+    ):
         """
-        Create a new secure anonymous vote with encryption and digital signature.
-        No direct references to voter or candidate are stored.
+        Build (without saving) an encrypted, signed anonymous vote.
+        position/election default to the candidate's; pass them when already loaded.
         """
-        from .crypto import VotingCrypto, DigitalSignature
+        from .crypto import get_voting_crypto, get_digital_signature
+        from .tokens import get_voter_token
 
-        crypto = VotingCrypto()
-        signature_util = DigitalSignature()
+        crypto = crypto or get_voting_crypto()
+        signature_util = signature_util or get_digital_signature()
+        position = position or candidate.position
+        election = election or position.election
 
         # Create vote data (this will be encrypted)
         vote_data = {
@@ -232,10 +256,10 @@ class Vote(models.Model):
             "candidate_name": (
                 str(candidate.user.student_id) if candidate.user else "Unknown"
             ),
-            "position_id": str(candidate.position.id),
-            "position_title": candidate.position.title,
-            "election_id": str(candidate.position.election.id),
-            "election_title": candidate.position.election.title,
+            "position_id": str(position.id),
+            "position_title": position.title,
+            "election_id": str(election.id),
+            "election_title": election.title,
             "timestamp": timezone.now().isoformat(),
             "approve": bool(approve),
         }
@@ -257,31 +281,46 @@ class Vote(models.Model):
         signature = signature_util.sign_vote(vote_bytes)
 
         # Create anonymous voter token (allows checking for duplicate votes without revealing identity)
-        anonymous_token = crypto.anonymize_voter_data(
-            str(voter.id), str(candidate.position.election.id), str(candidate.position.id)
-        )
-
-        # Check if this voter has already voted for this position
-        existing_vote = cls.objects.filter(
-            anonymous_voter_token=anonymous_token, position_id=candidate.position.id
-        ).first()
-
-        if existing_vote:
-            raise ValueError("This voter has already voted for this position")
+        anonymous_token = get_voter_token(voter.id, election.id, position.id)
 
-        # Create the anonymous secure vote
-        secure_vote = cls.objects.create(
-            election_id=candidate.position.election.id,
-            position_id=candidate.position.id,
+        return cls(
+            election_id=election.id,
+            position_id=position.id,
             ip_address=ip_address,
             encrypted_vote_data=encrypted_data,
             vote_hash=vote_hash,
             digital_signature=signature.hex(),
+            signature_algorithm=signature_util.algorithm,
             anonymous_voter_token=anonymous_token,
             signature_verified=True,
             integrity_verified=True,
         )
 
+    @classmethod
+    def create_secure_vote(cls, voter, candidate, ip_address=None, approve: bool = True):
+        """
+        Create a new secure anonymous vote with encryption and digital signature.
+        No direct references to voter or candidate are stored.
+        """
+        secure_vote = cls.build_secure_vote(
+            voter, candidate, ip_address=ip_address, approve=approve
+        )
+
+        # Check if this voter has already voted for this position
+        if cls.objects.filter(
+            anonymous_voter_token=secure_vote.anonymous_voter_token,
+            position_id=secure_vote.position_id,
+        ).exists():
+            raise ValueError("This voter has already voted for this position")
+
+        # Create the anonymous secure vote
+        secure_vote.save(force_insert=True)
+
+        from .counters import record_votes_on_commit
+        from .voter_state import mark_user_voted_on_commit
+
+        record_votes_on_commit(secure_vote.election_id, [secure_vote])
+        mark_user_voted_on_commit(voter.id, secure_vote.election_id)
         return secure_vote
 
     @classmethod
@@ -290,13 +329,9 @@ class Vote(models.Model):
         Check if a voter has already voted for a specific position
         using anonymous token (preserves anonymity)
         """
-        from .crypto import VotingCrypto
+        from .tokens import get_voter_token
 
-        crypto = VotingCrypto()
-
-        anonymous_token = crypto.anonymize_voter_data(
-            str(voter.id), str(position.election.id), str(position.id)
-        )
+        anonymous_token = get_voter_token(voter.id, position.election_id, position.id)
 
         return cls.objects.filter(
             anonymous_voter_token=anonymous_token, position_id=position.id
@@ -308,30 +343,35 @@ class Vote(models.Model):
         Get election results by decrypting votes (admin only)
         Returns a dictionary with candidate vote counts
         """
-        from .crypto import VotingCrypto
+        from .crypto import get_voting_crypto
 
-        crypto = VotingCrypto()
+        crypto = get_voting_crypto()
 
         results = {}
-        votes = cls.objects.filter(election_id=election.id)
+        corrupt = 0
+        votes = crypto.bulk_decrypt_queryset(
+            cls.objects.filter(election_id=election.id).order_by("id")
+        )
 
-        for vote in votes:
-            try:
-                vote_data = crypto.decrypt_vote_data(vote.encrypted_vote_data)
-                candidate_id = vote_data.get("candidate_id")
-                position_id = vote_data.get("position_id")
+        for vote_id, vote_data, error in votes:
+            if vote_data is None:
+                # Skip corrupted votes
+                corrupt += 1
+                continue
 
-                if position_id not in results:
-                    results[position_id] = {}
+            candidate_id = vote_data.get("candidate_id")
+            position_id = vote_data.get("position_id")
 
-                if candidate_id not in results[position_id]:
-                    results[position_id][candidate_id] = 0
+            if position_id not in results:
+                results[position_id] = {}
 
-                results[position_id][candidate_id] += 1
+            if candidate_id not in results[position_id]:
+                results[position_id][candidate_id] = 0
 
-            except Exception:
-                # Skip corrupted votes
-                continue
+            results[position_id][candidate_id] += 1
+
+        if corrupt:
+            logger.warning(f"Election {election.id}: skipped {corrupt} corrupted vote(s)")
 
         return results
 
@@ -341,21 +381,24 @@ class Vote(models.Model):
 
         Maintains anonymity during the election; only used post-completion (e.g., for notifications).
         """
-        from .crypto import VotingCrypto
+        from .crypto import get_voting_crypto
 
-        crypto = VotingCrypto()
+        crypto = get_voting_crypto()
         voter_ids = set()
-        qs = cls.objects.filter(election_id=election.id).only("encrypted_vote_data")
-        for vote in qs:
-            if not vote.encrypted_vote_data:
-                continue
-            try:
-                vote_data = crypto.decrypt_vote_data(vote.encrypted_vote_data)
-                vid = vote_data.get("voter_id")
-                if vid:
-                    voter_ids.add(vid)
-            except Exception:
+        corrupt = 0
+        votes = crypto.bulk_decrypt_queryset(
+            cls.objects.filter(election_id=election.id).order_by("id")
+        )
+        for vote_id, vote_data, error in votes:
+            if vote_data is None:
+                corrupt += 1
                 continue
+            vid = vote_data.get("voter_id")
+            if vid:
+                voter_ids.add(vid)
+
+        if corrupt:
+            logger.warning(f"Election {election.id}: skipped {corrupt} corrupted vote(s)")
         return list(voter_ids)
 
     def decrypt_vote_data(self):
@@ -365,9 +408,9 @@ class Vote(models.Model):
         if not self.encrypted_vote_data:
             return None
 
-        from .crypto import VotingCrypto
+        from .crypto import get_voting_crypto
 
-        crypto = VotingCrypto()
+        crypto = get_voting_crypto()
         return crypto.decrypt_vote_data(self.encrypted_vote_data)
 
     def verify_integrity(self):
@@ -378,10 +421,10 @@ class Vote(models.Model):
             return False
 
         try:
-            from .crypto import VotingCrypto, DigitalSignature
+            from .crypto import get_voting_crypto, get_digital_signature
 
-            crypto = VotingCrypto()
-            signature_util = DigitalSignature()
+            crypto = get_voting_crypto()
+            signature_util = get_digital_signature()
 
             # Decrypt vote data
             vote_data = self.decrypt_vote_data()
@@ -400,7 +443,7 @@ class Vote(models.Model):
             vote_bytes = json.dumps(vote_data, sort_keys=True).encode()
             signature_bytes = bytes.fromhex(self.digital_signature)
             signature_valid = signature_util.verify_vote_signature(
-                vote_bytes, signature_bytes
+                vote_bytes, signature_bytes, algorithm=self.signature_algorithm
             )
 
             # Update verification status
@@ -451,28 +494,42 @@ class Vote(models.Model):
         indicating whether the user has at least one vote in each.
         Uses anonymous tokens derived from (voter_id, election_id, position_id).
         """
-        from .crypto import VotingCrypto
-
         # Collect all active positions (position_id, election_id)
         active_positions = list(
             Position.objects.filter(election__status="active").values_list("id", "election_id")
         )
-        if not active_positions:
+        return cls._vote_map_for_positions(voter, active_positions)
+
+    @classmethod
+    def get_user_election_vote_map(cls, voter, election_ids) -> dict:
+        """Same mapping as get_user_active_election_vote_map for the given elections,
+        resolved with one query for positions and one for votes."""
+        positions = list(
+            Position.objects.filter(election_id__in=list(election_ids)).values_list(
+                "id", "election_id"
+            )
+        )
+        return cls._vote_map_for_positions(voter, positions)
+
+    @classmethod
+    def _vote_map_for_positions(cls, voter, positions) -> dict:
+        from .tokens import get_voter_tokens
+
+        if not positions:
             return {}
 
-        # Initialize mapping with False
-        election_ids = [eid for (_pid, eid) in active_positions]
-        vote_map = {str(eid): False for eid in set(election_ids)}
+        # Group positions per election so tokens come from the per-election cache
+        positions_by_election = {}
+        for position_id, election_id in positions:
+            positions_by_election.setdefault(election_id, []).append(position_id)
+        vote_map = {str(eid): False for eid in positions_by_election}
 
-        crypto = VotingCrypto()
         position_ids = []
         tokens = []
-        for position_id, election_id in active_positions:
-            position_ids.append(position_id)
-            tokens.append(
-                crypto.anonymize_voter_data(
-                    str(voter.id), str(election_id), str(position_id)
-                )
+        for election_id, election_position_ids in positions_by_election.items():
+            position_ids.extend(election_position_ids)
+            tokens.extend(
+                get_voter_tokens(voter.id, election_id, election_position_ids).values()
             )
 
         # Single query to find any matching votes and which elections they belong to
@@ -492,18 +549,14 @@ class Vote(models.Model):
     @classmethod
     def has_user_voted_in_election(cls, voter, election) -> bool:
         """Check if the given voter has any vote in the specified election using anonymous tokens."""
-        from .crypto import VotingCrypto
         from .models import Position
+        from .tokens import get_voter_tokens
 
         positions = list(Position.objects.filter(election=election).values_list("id", flat=True))
         if not positions:
             return False
 
-        crypto = VotingCrypto()
-        tokens = [
-            crypto.anonymize_voter_data(str(voter.id), str(election.id), str(pid))
-            for pid in positions
-        ]
+        tokens = list(get_voter_tokens(voter.id, election.id, positions).values())
         return cls.objects.filter(election_id=election.id, anonymous_voter_token__in=tokens).exists()
 
 
@@ -521,6 +574,46 @@ class ElectionResult(models.Model):
         return f"Results for {self.election.title}"
 
 
+class TallySnapshot(models.Model):
+    """Materialized vote tally for an election whose votes are final"""
+
+    election = models.OneToOneField(
+        Election, on_delete=models.CASCADE, related_name="tally_snapshot"
+    )
+    total_votes = models.PositiveIntegerField(default=0)
+    total_voters = models.PositiveIntegerField(default=0)
+    corrupt_votes = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Tally for {self.election.title}"
+
+
+class TallyEntry(models.Model):
+    """Vote count per (position, candidate, approve) within a tally snapshot.
+    candidate_id and approve are null for votes that could not be decrypted.
+    """
+
+    snapshot = models.ForeignKey(
+        TallySnapshot, on_delete=models.CASCADE, related_name="entries"
+    )
+    position_id = models.UUIDField()
+    candidate_id = models.UUIDField(null=True, blank=True)
+    approve = models.BooleanField(null=True, blank=True)
+    votes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["snapshot", "position_id", "candidate_id", "approve"],
+                name="unique_tally_entry_per_choice",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.candidate_id} ({self.approve}): {self.votes}"
+
+
 class AuditLog(models.Model):
     """Comprehensive audit logging for all system actions"""
 
@@ -540,7 +633,8 @@ class AuditLog(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Event time; set when the entry is queued, not when the batch is written
+    timestamp = models.DateTimeField(default=timezone.now)
     action = models.CharField(max_length=50, choices=ACTION_CHOICES)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
@@ -552,9 +646,14 @@ class AuditLog(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     details = models.JSONField(default=dict)
+    # Copy of details["election_id"] that can be indexed
+    election_id = models.UUIDField(null=True, blank=True, editable=False)
 
     # Security fields
     integrity_hash = models.CharField(max_length=64)  # SHA-256 hash for integrity
+    # Position and link in the audit hash chain (see elections.audit_chain)
+    sequence = models.BigIntegerField(unique=True, null=True, blank=True, editable=False)
+    chain_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     class Meta:
         ordering = ["-timestamp"]
@@ -562,30 +661,76 @@ class AuditLog(models.Model):
             models.Index(fields=["user", "timestamp"]),
             models.Index(fields=["action", "timestamp"]),
             models.Index(fields=["resource_type", "resource_id"]),
+            models.Index(fields=["election_id", "sequence"]),
+            models.Index(fields=["election_id", "resource_type"]),
         ]
 
     def __str__(self):
         return f"{self.action} by {self.user} at {self.timestamp}"
 
+    @staticmethod
+    def election_id_from_details(details):
+        """The election an entry's details refer to, or None"""
+        value = details.get("election_id") if isinstance(details, dict) else None
+        try:
+            return uuid.UUID(str(value)) if value else None
+        except ValueError:
+            return None
+
+    def compute_integrity_hash(self, include_timestamp: bool = True) -> str:
+        """SHA-256 over the entry's content; set before insert (also for bulk_create)"""
+        from .crypto import get_voting_crypto
+
+        crypto = get_voting_crypto()
+        audit_data = {
+            "action": self.action,
+            "user_id": str(self.user_id) if self.user_id else "anonymous",
+            "resource_type": self.resource_type,
+            "resource_id": self.resource_id,
+            "timestamp": (
+                self.timestamp.isoformat() if self.timestamp and include_timestamp else ""
+            ),
+            "details": self.details,
+        }
+        return crypto.generate_election_audit_hash(audit_data)
+
+    def has_valid_integrity_hash(self) -> bool:
+        if self.integrity_hash == self.compute_integrity_hash():
+            return True
+        # Entries stored before timestamps were set ahead of hashing were hashed
+        # with an empty timestamp
+        return self.integrity_hash == self.compute_integrity_hash(include_timestamp=False)
+
     def save(self, *args, **kwargs):
         # Generate integrity hash before saving
         if not self.integrity_hash:
-            from .crypto import VotingCrypto
-
-            crypto = VotingCrypto()
-            audit_data = {
-                "action": self.action,
-                "user_id": str(self.user.id) if self.user else "anonymous",
-                "resource_type": self.resource_type,
-                "resource_id": self.resource_id,
-                "timestamp": self.timestamp.isoformat() if self.timestamp else "",
-                "details": self.details,
-            }
-            self.integrity_hash = crypto.generate_election_audit_hash(audit_data)
+            self.integrity_hash = self.compute_integrity_hash()
+        if self.election_id is None:
+            self.election_id = self.election_id_from_details(self.details)
+
+        if self._state.adding and self.sequence is None:
+            from .audit_chain import store_chained
 
+            store_chained([self], lambda: super(AuditLog, self).save(*args, **kwargs))
+            return
         super().save(*args, **kwargs)
 
 
+class AuditCheckpoint(models.Model):
+    """A verified prefix of the audit log hash chain, up to and including `sequence`"""
+
+    sequence = models.BigIntegerField()
+    chain_hash = models.CharField(max_length=64)
+    entries_verified = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-sequence"]
+
+    def __str__(self):
+        return f"Audit checkpoint at {self.sequence}"
+
+
 class ElectionSecurity(models.Model):
     """Security configuration for elections"""
 
@@ -660,3 +805,98 @@ class VotingSession(models.Model):
         """End the voting session"""
         self.session_end = timezone.now()
         self.save(update_fields=["session_end"])
+
+
+class NotificationJob(models.Model):
+    """A bulk SMS send split into NotificationBatch chunks; polled for progress"""
+
+    KIND_CHOICES = [
+        ("voting_reminder", "Voting reminder"),
+        ("results_published", "Results published"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    election = models.ForeignKey(
+        Election, on_delete=models.CASCADE, null=True, blank=True, related_name="notification_jobs"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    total_recipients = models.PositiveIntegerField(default=0)
+    total_batches = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job {self.id} ({self.status})"
+
+    def progress(self) -> dict:
+        """Delivery totals over the job's batches (one query)"""
+        totals = self.batches.aggregate(
+            batches_done=models.Count("id", filter=~models.Q(status="pending")),
+            sent=models.Sum("sent_count"),
+            skipped=models.Sum("skipped_count"),
+        )
+        failed = sum(
+            len(user_ids)
+            for user_ids in self.batches.filter(status="failed").values_list(
+                "failed_user_ids", flat=True
+            )
+        )
+        return {
+            "job_id": str(self.id),
+            "kind": self.kind,
+            "status": self.status,
+            "total_recipients": self.total_recipients,
+            "total_batches": self.total_batches,
+            "batches_done": totals["batches_done"],
+            "sent": totals["sent"] or 0,
+            "failed": failed,
+            "skipped": totals["skipped"] or 0,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+        }
+
+
+class NotificationBatch(models.Model):
+    """One chunk of a NotificationJob's recipients and its delivery state"""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    job = models.ForeignKey(NotificationJob, on_delete=models.CASCADE, related_name="batches")
+    election = models.ForeignKey(Election, on_delete=models.CASCADE)
+    index = models.PositiveIntegerField()
+    user_ids = models.JSONField(default=list)
+    # Recipients still to be delivered after a failed attempt; a retry sends only to these
+    failed_user_ids = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    sent_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["job", "index"]
+        constraints = [
+            models.UniqueConstraint(fields=["job", "index"], name="unique_notification_batch_index")
+        ]
+
+    def __str__(self):
+        return f"Batch {self.index} of job {self.job_id} ({self.status})"
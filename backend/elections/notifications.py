@@ -0,0 +1,362 @@
+"""
+Chunked bulk SMS jobs
+A NotificationJob is created in the request and planned by a Celery task:
+recipients are resolved in bulk and stored as NotificationBatch rows of
+NOTIFICATION_BATCH_SIZE user ids, one send task per batch is fanned out with
+a chord, and the chord callback completes the job. Broker traffic therefore
+grows with the number of batches, not users. Each batch records who is still
+undelivered, so a retried batch only resends to those recipients.
+
+Voting reminders are sent per election: a user who has not voted in two
+active elections gets a reminder for each.
+
+Planning is retried and a redelivered planning task re-sends the batches
+still pending; a per-batch lock keeps a batch from being sent by two tasks
+at once, and a job is only completed once none of its batches is pending. A results job whose planning failed for good is restarted when
+results are published again.
+
+Voters are identified by their anonymous tokens: the tokens already used in
+an election are loaded once and each candidate recipient's tokens are
+derived locally, without touching the voter token LRU and without
+decrypting any vote. Users are streamed in id order, so recipient lists
+never have to fit in memory or in a task argument.
+"""
+
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from utils.sms_service import SMSMessageTemplates
+
+logger = logging.getLogger(__name__)
+
+VOTING_REMINDER = "voting_reminder"
+RESULTS_PUBLISHED = "results_published"
+
+# Batch rows inserted per query while planning
+PLAN_INSERT_SIZE = 100
+# User ids fetched per round trip while streaming recipients
+USER_FETCH_SIZE = 2000
+# How long a batch may be held by one send task (seconds)
+BATCH_LOCK_TIMEOUT = 600
+
+
+def _batch_size() -> int:
+    return getattr(settings, "NOTIFICATION_BATCH_SIZE", 500)
+
+
+def start_notification_job(kind: str, election=None, requested_by=None):
+    """Create a job and plan it in the background once the transaction commits"""
+    from .models import NotificationJob
+
+    job = NotificationJob.objects.create(kind=kind, election=election, requested_by=requested_by)
+
+    def enqueue():
+        from utils.tasks import plan_notification_job_task
+
+        plan_notification_job_task.delay(str(job.id))
+
+    transaction.on_commit(enqueue)
+    return job
+
+
+class BatchInProgress(Exception):
+    """Another task is sending the batch"""
+
+
+def start_voting_reminders(requested_by=None):
+    """Remind eligible users of each active election they have not voted in"""
+    return start_notification_job(VOTING_REMINDER, requested_by=requested_by)
+
+
+def restart_notification_job(job):
+    """Plan a failed job again once the transaction commits"""
+    from .models import NotificationJob
+
+    if NotificationJob.objects.filter(id=job.id, status="failed").update(status="pending", error=""):
+        job.status, job.error = "pending", ""
+
+        def enqueue():
+            from utils.tasks import plan_notification_job_task
+
+            plan_notification_job_task.delay(str(job.id))
+
+        transaction.on_commit(enqueue)
+    return job
+
+
+def start_results_published(election, requested_by=None):
+    """
+    Tell the election's voters that results are out; at most one job per election.
+    A job whose planning failed is restarted instead of being replaced.
+    """
+    from .models import NotificationJob
+
+    existing = (
+        NotificationJob.objects.filter(kind=RESULTS_PUBLISHED, election=election)
+        .order_by("-created_at")
+        .first()
+    )
+    if existing is None:
+        return start_notification_job(RESULTS_PUBLISHED, election=election, requested_by=requested_by)
+    if existing.status == "failed":
+        restart_notification_job(existing)
+    return existing
+
+
+def reminder_recipients():
+    """Users who can receive voting reminders"""
+    from django.contrib.auth import get_user_model
+
+    return (
+        get_user_model()
+        .objects.filter(can_vote=True, is_active=True, phone_number__isnull=False)
+        .exclude(phone_number__exact="")
+    )
+
+
+def iter_voter_ids(election, user_ids: Iterable, voted: bool = True) -> Iterator[str]:
+    """
+    Ids from user_ids that voted in the election (or, with voted=False, that did not),
+    resolved through anonymous tokens
+    """
+    from .crypto import get_voting_crypto
+    from .models import Position, Vote
+
+    position_ids = [
+        str(position_id)
+        for position_id in Position.objects.filter(election=election).values_list("id", flat=True)
+    ]
+    used_tokens = set(
+        Vote.objects.filter(election_id=election.id)
+        .order_by()
+        .values_list("anonymous_voter_token", flat=True)
+        .distinct()
+    )
+    crypto = get_voting_crypto()
+    election_id = str(election.id)
+    for user_id in user_ids:
+        user_id = str(user_id)
+        has_voted = any(
+            crypto.anonymize_voter_data(user_id, election_id, position_id) in used_tokens
+            for position_id in position_ids
+        )
+        if has_voted == voted:
+            yield user_id
+
+
+def _chunks(user_ids: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(user_id)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def create_batches(job, election, user_ids: Iterable[str], first_index: int = 0) -> Tuple[int, int]:
+    """
+    Store user_ids as batches of the job, numbered from first_index.
+    Returns the recipients and the index of the next batch.
+    """
+    from .models import NotificationBatch
+
+    pending, recipients, index = [], 0, first_index
+    for chunk in _chunks(user_ids, _batch_size()):
+        pending.append(NotificationBatch(job=job, election=election, index=index, user_ids=chunk))
+        recipients += len(chunk)
+        index += 1
+        if len(pending) == PLAN_INSERT_SIZE:
+            NotificationBatch.objects.bulk_create(pending)
+            pending = []
+    NotificationBatch.objects.bulk_create(pending)
+    return recipients, index
+
+
+def _plan_voting_reminders(job) -> int:
+    from .models import Election
+
+    recipients, index = 0, 0
+    for election in Election.objects.filter(status="active").order_by("start_date", "id"):
+        user_ids = (
+            reminder_recipients()
+            .order_by("id")
+            .values_list("id", flat=True)
+            .iterator(chunk_size=USER_FETCH_SIZE)
+        )
+        added, index = create_batches(
+            job, election, iter_voter_ids(election, user_ids, voted=False), index
+        )
+        recipients += added
+    return recipients
+
+
+def _plan_results_published(job) -> int:
+    from django.contrib.auth import get_user_model
+
+    from .tally import load_materialized_tally, materialize_election_tally
+
+    election = job.election
+    # Freeze the published figures so later reads need no decryption
+    if load_materialized_tally(election.id) is None:
+        materialize_election_tally(election.id)
+
+    # Users are streamed in id order, so the batches are the same on every run
+    user_ids = (
+        get_user_model()
+        .objects.filter(is_active=True)
+        .exclude(phone_number__exact="")
+        .order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=USER_FETCH_SIZE)
+    )
+    recipients, _ = create_batches(job, election, iter_voter_ids(election, user_ids))
+    return recipients
+
+
+PLANNERS = {
+    VOTING_REMINDER: _plan_voting_reminders,
+    RESULTS_PUBLISHED: _plan_results_published,
+}
+
+
+def plan_notification_job(job_id) -> Optional[List[int]]:
+    """
+    Create the job's batches and return their ids.
+    For a job that was already planned, returns the batches still pending, so a
+    redelivered task finishes fanning them out; returns None for a finished job.
+    """
+    from .models import NotificationJob
+
+    with transaction.atomic():
+        job = NotificationJob.objects.select_for_update().get(id=job_id)
+        if job.status == "running":
+            return list(job.batches.filter(status="pending").values_list("id", flat=True))
+        if job.status != "pending":
+            return None
+        job.total_recipients = PLANNERS[job.kind](job)
+        job.total_batches = job.batches.count()
+        job.status = "running"
+        job.save(update_fields=["total_recipients", "total_batches", "status"])
+    return list(job.batches.values_list("id", flat=True))
+
+
+def _render_voting_reminder(election, user) -> str:
+    return SMSMessageTemplates.voting_reminder(
+        {"title": election.title, "end_date": election.end_date.strftime("%Y-%m-%d %H:%M")},
+        {"first_name": user.first_name or user.username},
+    )
+
+
+def _render_results_published(election, user) -> str:
+    return SMSMessageTemplates.results_published(
+        {
+            "title": election.title,
+            "results_url": f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}/elections/{election.id}/results",
+        },
+        {"first_name": user.first_name or user.username},
+    )
+
+
+# Messages are rendered per batch, when it is sent
+RENDERERS = {
+    VOTING_REMINDER: _render_voting_reminder,
+    RESULTS_PUBLISHED: _render_results_published,
+}
+
+
+def send_notification_batch(batch_id) -> Dict:
+    """
+    Send a batch to its undelivered recipients and record who is still undelivered.
+    A batch that was fully delivered is not sent again; raises BatchInProgress
+    while another task is sending it.
+    """
+    lock_key = f"notification_batch:{batch_id}:lock"
+    if not cache.add(lock_key, 1, BATCH_LOCK_TIMEOUT):
+        raise BatchInProgress(f"Notification batch {batch_id} is already being sent")
+    try:
+        return _send_notification_batch(batch_id)
+    finally:
+        cache.delete(lock_key)
+
+
+def _send_notification_batch(batch_id) -> Dict:
+    from django.contrib.auth import get_user_model
+
+    from utils.sms_dispatcher import dispatch_sms
+
+    from .models import NotificationBatch
+
+    batch = NotificationBatch.objects.select_related("job", "election").get(id=batch_id)
+    if batch.status == "sent":
+        return {"batch_id": batch.id, "sent": 0, "failed": 0, "skipped": 0}
+
+    user_ids = batch.failed_user_ids if batch.attempts else batch.user_ids
+    users = (
+        get_user_model()
+        .objects.filter(id__in=user_ids, is_active=True)
+        .exclude(Q(phone_number__isnull=True) | Q(phone_number__exact=""))
+        .only("id", "phone_number", "first_name", "username")
+    )
+    render = RENDERERS[batch.job.kind]
+    users = list(users)
+    skipped = len(user_ids) - len(users)
+
+    result = {"success": 0, "results": []}
+    if users:
+        result = dispatch_sms(
+            [{"phone": user.phone_number, "message": render(batch.election, user)} for user in users]
+        )
+
+    # Results come back in input order
+    failed = [
+        str(user.id)
+        for user, entry in zip(users, result["results"])
+        if not entry["success"]
+    ]
+    batch.failed_user_ids = failed
+    batch.status = "failed" if failed else "sent"
+    batch.sent_count += result["success"]
+    batch.skipped_count += skipped
+    batch.attempts += 1
+    batch.error = next((entry["error"] for entry in result["results"] if entry.get("error")), "")
+    batch.completed_at = timezone.now()
+    batch.save(
+        update_fields=[
+            "failed_user_ids",
+            "status",
+            "sent_count",
+            "skipped_count",
+            "attempts",
+            "error",
+            "completed_at",
+        ]
+    )
+    return {"batch_id": batch.id, "sent": result["success"], "failed": len(failed), "skipped": skipped}
+
+
+def finish_notification_job(job_id) -> Dict:
+    """Mark the job completed once none of its batches is pending; returns its progress"""
+    from .models import NotificationJob
+
+    job = NotificationJob.objects.get(id=job_id)
+    if job.batches.filter(status="pending").exists():
+        # Another fan-out of the job is still sending; its callback completes it
+        logger.info(f"Notification job {job.id} still has pending batches")
+        return job.progress()
+    job.status = "completed"
+    job.completed_at = timezone.now()
+    job.save(update_fields=["status", "completed_at"])
+    progress = job.progress()
+    logger.info(
+        f"Notification job {job.id} finished: {progress['sent']} sent, "
+        f"{progress['failed']} failed, {progress['skipped']} skipped"
+    )
+    return progress
@@ -0,0 +1,149 @@
+"""
+Request rate limiting
+Fixed-window counters in the shared cache. On Redis one Lua call increments
+the counter and sets its TTL only when the window opens, so each request
+costs a single round trip, concurrent requests cannot overshoot the limit
+and hits never extend the window. While Redis is unreachable every process
+falls back to an in-memory token bucket with the same rate.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+
+from utils.cache import get_redis_client, run_script
+
+logger = logging.getLogger(__name__)
+
+# Returns the number of hits in the current window; the TTL check also repairs
+# a counter that lost its expiry
+RATE_LIMIT_SCRIPT = """
+local current = redis.call('INCR', KEYS[1])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return current
+"""
+
+# Seconds to skip the shared cache after it failed, so an outage does not add a
+# connection attempt to every request
+CACHE_RETRY_DELAY = 5
+
+LOCAL_BUCKETS_SIZE = 10000
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    max_requests: int
+    window: int  # seconds
+
+
+# Per-path limits live in settings.RATE_LIMITS; without them every path gets the default
+DEFAULT_RATE_LIMIT = (60, 60)
+
+_rules: Optional[List[Tuple[str, RateLimit]]] = None
+
+
+def _get_rules() -> List[Tuple[str, RateLimit]]:
+    global _rules
+    if _rules is None:
+        limits = getattr(settings, "RATE_LIMITS", {})
+        # Longest prefix first so specific paths win over their parents
+        _rules = sorted(
+            ((prefix, RateLimit(*limit)) for prefix, limit in limits.items()),
+            key=lambda rule: len(rule[0]),
+            reverse=True,
+        )
+    return _rules
+
+
+def get_rate_limit(path: str) -> Tuple[str, RateLimit]:
+    """(scope, limit) for a request path; scope is the matching prefix or "default" """
+    for prefix, limit in _get_rules():
+        if path.startswith(prefix):
+            return prefix, limit
+    return "default", RateLimit(*getattr(settings, "RATE_LIMIT_DEFAULT", DEFAULT_RATE_LIMIT))
+
+
+class TokenBucketLimiter:
+    """In-process token buckets, bounded to the most recently used keys"""
+
+    def __init__(self, maxsize: int = LOCAL_BUCKETS_SIZE):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str, limit: RateLimit, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        rate = limit.max_requests / limit.window
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.max_requests, now))
+            tokens = min(limit.max_requests, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RateLimiter:
+    def __init__(self):
+        self.local = TokenBucketLimiter()
+        self._cache_down_until = 0.0
+
+    def _count_hit(self, key: str, limit: RateLimit) -> int:
+        client = get_redis_client()
+        if client is not None:
+            return int(run_script(client, RATE_LIMIT_SCRIPT, [cache.make_key(key)], [limit.window]))
+
+        # Non-Redis caches (development, tests): add() never resets the window
+        cache.add(key, 0, limit.window)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # The window closed between add() and incr(); open the next one
+            cache.add(key, 0, limit.window)
+            return cache.incr(key)
+
+    def allow(self, scope: str, identity: str, limit: RateLimit) -> bool:
+        key = f"rate_limit:{scope}:{identity}"
+        if time.monotonic() >= self._cache_down_until:
+            try:
+                return self._count_hit(key, limit) <= limit.max_requests
+            except Exception as e:
+                logger.error(f"Rate limit cache unavailable, limiting in-process: {str(e)}")
+                self._cache_down_until = time.monotonic() + CACHE_RETRY_DELAY
+        return self.local.allow(key, limit)
+
+
+rate_limiter = RateLimiter()
+
+
+def is_rate_limited(path: str, identity: str) -> bool:
+    scope, limit = get_rate_limit(path)
+    return not rate_limiter.allow(scope, identity, limit)
+
+
+def _reset_on_setting_change(setting, **kwargs):
+    global _rules
+    if setting in ("RATE_LIMITS", "RATE_LIMIT_DEFAULT"):
+        _rules = None
+    elif setting == "CACHES":
+        rate_limiter.local.clear()
+
+
+setting_changed.connect(_reset_on_setting_change)
@@ -1,9 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from .models import Election, Position, Candidate, Vote, ElectionResult
-from accounts.serializers import UserSerializer
+from .tally import get_context_tally
 from utils.helpers import absolute_media_url_builder
 
+def tallies_visible(context, election) -> bool:
+    """Vote counts are included unless a view turned them off (include_tallies=False)
+    for voters; once results are published everyone sees them."""
+    return context.get("include_tallies", True) or bool(election.results_published)
+
+
+class CandidateUserSerializer(serializers.ModelSerializer):
+    """Public profile of a candidate's user, without per-user vote state"""
+
+    display_name = serializers.ReadOnlyField()
+
+    class Meta:
+        model = get_user_model()
+        fields = (
+            "id",
+            "username",
+            "first_name",
+            "last_name",
+            "display_name",
+            "student_id",
+            "email",
+            "year_of_study",
+            "program",
+        )
+
+
 class CandidateSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -18,9 +46,12 @@ class CandidateSerializer(serializers.ModelSerializer):
             "description": instance.position.description,
             "order": instance.position.order,
         }
-        data["user"] = UserSerializer(instance.user).data
-        data["vote_count"] = instance.vote_count
-        data["vote_percentage"] = instance.vote_percentage
+        data["user"] = CandidateUserSerializer(instance.user).data if instance.user else None
+        if tallies_visible(self.context, instance.position.election):
+            # Counts come from a tally shared by every serializer in this context
+            tally = get_context_tally(self.context, instance.position.election_id)
+            data["vote_count"] = tally.vote_count(instance.id)
+            data["vote_percentage"] = tally.vote_percentage(instance.id, instance.position_id)
         # Add absolute URL for profile picture if present
         try:
             if instance.profile_picture:
@@ -46,7 +77,10 @@ class PositionSerializer(serializers.ModelSerializer):
         data["candidates"] = CandidateSerializer(
             instance.candidates.all(), many=True, context=self.context
         ).data
-        data["total_votes"] = instance.total_votes
+        if tallies_visible(self.context, instance.election):
+            data["total_votes"] = get_context_tally(
+                self.context, instance.election_id
+            ).position_total(instance.id)
         return data
 
 
@@ -71,10 +105,17 @@ class ElectionSerializer(serializers.ModelSerializer):
         data["results_published_at"] = getattr(instance, "results_published_at", None)
         request = self.context.get("request") if hasattr(self, "context") else None
         user = getattr(request, "user", None)
-        # Candidate spotlight flag
+        # Candidate spotlight flag (read from the positions/candidates already loaded above)
         try:
-            from .models import Candidate as Cand
-            data["is_candidate"] = bool(user and user.is_authenticated and Cand.objects.filter(position__election=instance, user=user).exists())
+            data["is_candidate"] = bool(
+                user
+                and user.is_authenticated
+                and any(
+                    candidate.user_id == user.id
+                    for position in instance.positions.all()
+                    for candidate in position.candidates.all()
+                )
+            )
         except Exception:
             data["is_candidate"] = False
         can_review = bool(getattr(user, "is_ec_member", False) and instance.status == "completed" and not data["results_published"])
@@ -95,6 +136,40 @@ class ElectionSerializer(serializers.ModelSerializer):
         return data
 
 
+class BatchedElectionListSerializer(serializers.ListSerializer):
+    """Resolves voted state and candidacy for every listed election up front
+    (one query each for positions, votes and candidates) and shares it via context."""
+
+    def to_representation(self, data):
+        elections = list(data.all() if hasattr(data, "all") else data)
+        request = self.context.get("request")
+        user = getattr(request, "user", None)
+
+        if user and user.is_authenticated:
+            # Voted state only matters where it can unlock results
+            needs_vote_state = [
+                election.id
+                for election in elections
+                if election.show_results_after_voting
+                and election.status in ["active", "completed"]
+                and not election.results_published
+            ]
+            vote_map = (
+                Vote.get_user_election_vote_map(user, needs_vote_state) if needs_vote_state else {}
+            )
+            self.context["voted_election_ids"] = {
+                election_id for election_id, voted in vote_map.items() if voted
+            }
+            self.context["candidate_election_ids"] = {
+                str(election_id)
+                for election_id in Candidate.objects.filter(
+                    user=user, position__election_id__in=[e.id for e in elections]
+                ).values_list("position__election_id", flat=True)
+            }
+
+        return super().to_representation(elections)
+
+
 class ElectionListSerializer(serializers.ModelSerializer):
     is_active = serializers.ReadOnlyField()
     results_published = serializers.ReadOnlyField()
@@ -124,6 +199,7 @@ class ElectionListSerializer(serializers.ModelSerializer):
             "created_by_name",
             "created_at",
         )
+        list_serializer_class = BatchedElectionListSerializer
 
     def get_can_view_results(self, obj):
         request = self.context.get("request") if hasattr(self, "context") else None
@@ -131,8 +207,11 @@ class ElectionListSerializer(serializers.ModelSerializer):
         user_voted = False
         try:
             if user and user.is_authenticated:
-                from .models import Vote
-                user_voted = Vote.has_user_voted_in_election(user, obj)
+                voted_election_ids = self.context.get("voted_election_ids")
+                if voted_election_ids is not None:
+                    user_voted = str(obj.id) in voted_election_ids
+                else:
+                    user_voted = Vote.has_user_voted_in_election(user, obj)
         except Exception:
             user_voted = False
         return bool(
@@ -145,8 +224,12 @@ class ElectionListSerializer(serializers.ModelSerializer):
         request = self.context.get("request") if hasattr(self, "context") else None
         user = getattr(request, "user", None)
         try:
-            from .models import Candidate as Cand
-            return bool(user and user.is_authenticated and Cand.objects.filter(position__election=obj, user=user).exists())
+            if not (user and user.is_authenticated):
+                return False
+            candidate_election_ids = self.context.get("candidate_election_ids")
+            if candidate_election_ids is not None:
+                return str(obj.id) in candidate_election_ids
+            return Candidate.objects.filter(position__election=obj, user=user).exists()
         except Exception:
             return False
 
@@ -207,6 +290,18 @@ class BulkCastVoteSerializer(serializers.Serializer):
         if not selections:
             raise serializers.ValidationError("No selections provided")
 
+        # Load the whole ballot (positions, candidates and their users) in two
+        # queries and validate every selection in memory
+        positions = {
+            position.id: position
+            for position in election.positions.prefetch_related(
+                Prefetch(
+                    "candidates",
+                    queryset=Candidate.objects.select_related("user").order_by("order"),
+                )
+            )
+        }
+
         # Collect validated objects and enforce constraints
         validated_items = []
         seen_positions = set()
@@ -216,24 +311,23 @@ class BulkCastVoteSerializer(serializers.Serializer):
             cid = item.get("candidate_id")
             approve = item.get("approve", None)
 
-            try:
-                position = Position.objects.get(id=pid)
-            except Position.DoesNotExist:
+            position = positions.get(pid)
+            if position is None:
+                if Position.objects.filter(id=pid).exists():
+                    raise serializers.ValidationError(
+                        f"Position {pid} does not belong to this election"
+                    )
                 raise serializers.ValidationError(f"Invalid position: {pid}")
-
-            if position.election_id != election.id:
-                raise serializers.ValidationError(
-                    f"Position {position.id} does not belong to this election"
-                )
+            # Already loaded; avoids a query per vote when the ballot is written
+            position.election = election
 
             # If position has single candidate, we can allow approve flag without explicit candidate_id
-            candidates_qs = Candidate.objects.filter(position=position).order_by("order")
-            if cid is None and approve is not None and candidates_qs.count() == 1:
-                candidate = candidates_qs.first()
+            candidates = list(position.candidates.all())
+            if cid is None and approve is not None and len(candidates) == 1:
+                candidate = candidates[0]
             else:
-                try:
-                    candidate = Candidate.objects.get(id=cid, position=position)
-                except Candidate.DoesNotExist:
+                candidate = next((c for c in candidates if c.id == cid), None)
+                if candidate is None:
                     raise serializers.ValidationError(
                         f"Invalid candidate {cid} for position {position.id}"
                     )
@@ -246,7 +340,7 @@ class BulkCastVoteSerializer(serializers.Serializer):
             seen_positions.add(position.id)
 
             # For multi-candidate positions, approve shouldn't be set
-            if candidates_qs.count() > 1 and approve is not None:
+            if len(candidates) > 1 and approve is not None:
                 raise serializers.ValidationError(
                     f"'approve' is only valid for single-candidate positions ({position.title})"
                 )
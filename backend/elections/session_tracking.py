@@ -0,0 +1,287 @@
+"""
+Cached voting session tracking
+VotingSessionMiddleware records vote-path requests in a Redis hash per
+(user, election) instead of querying VotingSession. The hash keeps the first
+IP address and user agent seen in the session and flags later changes; one
+Lua call per request updates it and, only when something new was recorded,
+marks it dirty. flush_voting_sessions writes dirty records to VotingSession in
+batches: a missing session is opened and a suspicious one gets all of its
+reasons in a single update, so repeated requests cost no queries at all.
+A batch the database rejects is written record by record, and records
+without a valid IP address are dropped, so one bad record cannot hold up
+the rest.
+
+Without Redis (development, tests) records are plain cache entries.
+"""
+
+import logging
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DataError, IntegrityError
+from django.utils import timezone
+
+from utils.cache import get_redis_client, run_script
+from utils.network import clean_ip_address
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "voting_session:dirty"
+FLUSH_BATCH_SIZE = 500
+
+IP_CHANGED = "IP address changed during session"
+USER_AGENT_CHANGED = "User agent changed during session"
+HIGH_VOTE_COUNT = "Unusually high number of votes"
+
+# More votes than this in one session is flagged
+MAX_SESSION_VOTES = 10
+
+# Errors that make a record unwritable, as opposed to the database being unavailable
+RECORD_ERRORS = (DataError, IntegrityError, KeyError, ValueError)
+
+# KEYS[1] is the session hash, KEYS[2] the dirty set. ARGV: ip address, user agent,
+# session start, TTL, dirty set member. Returns 1 when the record was opened or
+# gained a flag, 0 for a repeat request.
+TRACK_SCRIPT = """
+local changed = redis.call('HSETNX', KEYS[1], 'ip_address', ARGV[1])
+if changed == 1 then
+    redis.call('HSET', KEYS[1], 'user_agent', ARGV[2], 'session_start', ARGV[3])
+else
+    if redis.call('HGET', KEYS[1], 'ip_address') ~= ARGV[1] then
+        changed = changed + redis.call('HSETNX', KEYS[1], 'ip_changed', 1)
+    end
+    if redis.call('HGET', KEYS[1], 'user_agent') ~= ARGV[2] then
+        changed = changed + redis.call('HSETNX', KEYS[1], 'user_agent_changed', 1)
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+if changed > 0 then
+    redis.call('SADD', KEYS[2], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+
+def _timeout() -> int:
+    security = getattr(settings, "VOTING_SECURITY_DEFAULTS", {})
+    return security.get("SESSION_TIMEOUT_MINUTES", 30) * 60
+
+
+def _record_key(member: str) -> str:
+    return f"voting_session:{member}"
+
+
+def _member(user_id, election_id) -> str:
+    return f"{user_id}:{election_id}"
+
+
+def track_voting_request(user_id, election_id, ip_address, user_agent: str = "") -> bool:
+    """Record a vote-path request; returns True when the record needs flushing"""
+    member = _member(user_id, election_id)
+    ip_address = ip_address or ""
+    user_agent = user_agent or ""
+    client = get_redis_client()
+    if client is not None:
+        return bool(
+            run_script(
+                client,
+                TRACK_SCRIPT,
+                [cache.make_key(_record_key(member)), cache.make_key(DIRTY_KEY)],
+                [ip_address, user_agent, timezone.now().isoformat(), _timeout(), member],
+            )
+        )
+
+    key = _record_key(member)
+    record = cache.get(key)
+    changed = record is None
+    if record is None:
+        record = {
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "session_start": timezone.now().isoformat(),
+        }
+    else:
+        for flag, first_seen, current in (
+            ("ip_changed", record["ip_address"], ip_address),
+            ("user_agent_changed", record["user_agent"], user_agent),
+        ):
+            if first_seen != current and not record.get(flag):
+                record[flag] = "1"
+                changed = True
+    cache.set(key, record, _timeout())
+    if changed:
+        dirty = cache.get(DIRTY_KEY) or set()
+        dirty.add(member)
+        cache.set(DIRTY_KEY, dirty, None)
+    return changed
+
+
+def _take_dirty(batch_size: int) -> List[Tuple[str, Dict]]:
+    """Pop up to batch_size dirty members with their records (expired ones are dropped)"""
+    client = get_redis_client()
+    if client is not None:
+        members = [
+            member.decode() if isinstance(member, bytes) else member
+            for member in client.spop(cache.make_key(DIRTY_KEY), batch_size) or []
+        ]
+        pipeline = client.pipeline(transaction=False)
+        for member in members:
+            pipeline.hgetall(cache.make_key(_record_key(member)))
+        records = [
+            {
+                (field.decode() if isinstance(field, bytes) else field): (
+                    value.decode() if isinstance(value, bytes) else value
+                )
+                for field, value in raw.items()
+            }
+            for raw in pipeline.execute()
+        ]
+        return [(member, record) for member, record in zip(members, records) if record]
+
+    dirty = cache.get(DIRTY_KEY) or set()
+    members = sorted(dirty)[:batch_size]
+    cache.set(DIRTY_KEY, dirty.difference(members), None)
+    records = cache.get_many([_record_key(member) for member in members])
+    return [
+        (member, records[_record_key(member)])
+        for member in members
+        if _record_key(member) in records
+    ]
+
+
+def _mark_dirty(members: List[str]):
+    if not members:
+        return
+    client = get_redis_client()
+    if client is not None:
+        client.sadd(cache.make_key(DIRTY_KEY), *members)
+        return
+    dirty = cache.get(DIRTY_KEY) or set()
+    cache.set(DIRTY_KEY, dirty.union(members), None)
+
+
+def _suspicious_reasons(record: Dict, session=None) -> List[str]:
+    reasons = []
+    if record.get("ip_changed") or (session and session.ip_address != record["ip_address"]):
+        reasons.append(IP_CHANGED)
+    if session and session.votes_cast > MAX_SESSION_VOTES:
+        reasons.append(HIGH_VOTE_COUNT)
+    if record.get("user_agent_changed") or (
+        session and session.user_agent != record["user_agent"]
+    ):
+        reasons.append(USER_AGENT_CHANGED)
+    return reasons
+
+
+def write_voting_sessions(records: List[Tuple[str, Dict]]) -> int:
+    """
+    Open or flag the VotingSession of each (member, record) pair.
+    Costs five queries however many records there are; returns the sessions written.
+    """
+    from django.contrib.auth import get_user_model
+
+    from .models import Election, VotingSession
+
+    pairs = {}
+    for member, record in records:
+        user_id, election_id = member.split(":", 1)
+        pairs[(user_id, election_id)] = record
+    if not pairs:
+        return 0
+
+    # Users and elections deleted since the request are skipped
+    user_ids = {
+        str(pk)
+        for pk in get_user_model().objects.filter(
+            id__in={user_id for user_id, _ in pairs}
+        ).values_list("id", flat=True)
+    }
+    election_ids = {
+        str(pk)
+        for pk in Election.objects.filter(
+            id__in={election_id for _, election_id in pairs}
+        ).values_list("id", flat=True)
+    }
+    open_sessions = {}
+    for session in VotingSession.objects.filter(
+        session_end__isnull=True, user_id__in=user_ids, election_id__in=election_ids
+    ).order_by("session_start"):
+        # The latest open session wins, as get_or_create would find only one
+        open_sessions[(str(session.user_id), str(session.election_id))] = session
+
+    created, flagged = [], []
+    for (user_id, election_id), record in pairs.items():
+        if user_id not in user_ids or election_id not in election_ids:
+            continue
+        ip_address = clean_ip_address(record.get("ip_address"))
+        if ip_address is None:
+            logger.warning(
+                f"Dropping voting session record {user_id}:{election_id} without a valid IP address"
+            )
+            continue
+        session = open_sessions.get((user_id, election_id))
+        reasons = _suspicious_reasons(record, session)
+        if session is None:
+            created.append(
+                VotingSession(
+                    user_id=user_id,
+                    election_id=election_id,
+                    ip_address=ip_address,
+                    user_agent=record["user_agent"],
+                    is_suspicious=bool(reasons),
+                    suspicious_reason="; ".join(reasons),
+                )
+            )
+        elif reasons and "; ".join(reasons) != session.suspicious_reason:
+            session.is_suspicious = True
+            session.suspicious_reason = "; ".join(reasons)
+            flagged.append(session)
+
+    if created:
+        VotingSession.objects.bulk_create(created)
+    if flagged:
+        VotingSession.objects.bulk_update(flagged, ["is_suspicious", "suspicious_reason"])
+    return len(created) + len(flagged)
+
+
+def flush_voting_sessions(max_batches: Optional[int] = None) -> int:
+    """Write dirty session records to VotingSession; returns the sessions written"""
+    written = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        records = _take_dirty(FLUSH_BATCH_SIZE)
+        if not records:
+            break
+        try:
+            written += write_voting_sessions(records)
+        except Exception as e:
+            logger.error(f"Writing {len(records)} voting sessions failed, retrying one by one: {str(e)}")
+            written += _write_one_by_one(records)
+        batches += 1
+    return written
+
+
+def _write_one_by_one(records: List[Tuple[str, Dict]]) -> int:
+    """Write records singly, dropping the ones the database rejects"""
+    written = 0
+    for index, (member, record) in enumerate(records):
+        try:
+            written += write_voting_sessions([(member, record)])
+        except RECORD_ERRORS as e:
+            logger.error(f"Dropping voting session record {member}: {str(e)}")
+        except Exception:
+            # The database is unavailable; the rest are flushed again on the next run
+            _mark_dirty([member for member, _ in records[index:]])
+            raise
+    return written
+
+
+def parse_election_id(value) -> Optional[str]:
+    """The election id in a path segment, or None if it is not a UUID"""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
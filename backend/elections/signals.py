@@ -0,0 +1,58 @@
+"""
+Signal handlers keeping cached election data in step with the database
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .ballot_definition import invalidate_ballot_definition_on_commit
+from .models import Candidate, Election, Position, TallySnapshot
+from .tally import FINAL_ELECTION_STATUSES
+from .voter_state import invalidate_active_elections_on_commit
+
+
+@receiver([post_save, post_delete], sender=Election)
+def invalidate_caches_for_election(sender, instance, **kwargs):
+    invalidate_ballot_definition_on_commit(instance.id)
+    # Status changes add or remove entries in every user's vote map
+    invalidate_active_elections_on_commit()
+
+
+@receiver(post_save, sender=Election)
+def discard_tally_for_reopened_election(sender, instance, update_fields=None, **kwargs):
+    """A snapshot is only valid while the election stays final; it is rebuilt on completion"""
+    if update_fields and "status" not in update_fields:
+        return
+    if instance.status not in FINAL_ELECTION_STATUSES:
+        TallySnapshot.objects.filter(election_id=instance.id).delete()
+
+
+@receiver([post_save, post_delete], sender=Position)
+def invalidate_caches_for_position(sender, instance, **kwargs):
+    invalidate_ballot_definition_on_commit(instance.election_id)
+    invalidate_active_elections_on_commit()
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+def invalidate_ballot_for_candidate(sender, instance, **kwargs):
+    try:
+        election_id = instance.position.election_id
+    except Position.DoesNotExist:
+        # Deleted along with its position, which invalidates the ballot itself
+        return
+    invalidate_ballot_definition_on_commit(election_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_ballot_for_candidate_user(sender, instance, created, update_fields=None, **kwargs):
+    """Candidate names and programmes are part of the ballot"""
+    if created or (update_fields and set(update_fields) <= {"last_login"}):
+        return
+    election_ids = (
+        Candidate.objects.filter(user=instance)
+        .values_list("position__election_id", flat=True)
+        .distinct()
+    )
+    for election_id in election_ids:
+        invalidate_ballot_definition_on_commit(election_id)
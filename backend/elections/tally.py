@@ -0,0 +1,242 @@
+"""
+Single-pass tally engine for election results
+Streams the votes of an election once, decrypts every row exactly once and
+aggregates candidate counts, approve/reject splits, position totals and
+unique voters into one structure that views and serializers can share.
+Once an election is final the tally is materialized into TallySnapshot /
+TallyEntry rows so results can be served without any decryption.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Elections whose votes can no longer change; only these are materialized
+FINAL_ELECTION_STATUSES = ("completed", "archived")
+
+
+class ElectionTally:
+    """Aggregated results for a single election"""
+
+    def __init__(self, election_id):
+        self.election_id = str(election_id)
+        self.total_votes = 0
+        self.corrupt_votes = 0
+        # (position_id, candidate_id or None, approve or None) -> votes
+        self.entries = defaultdict(int)
+        # candidate_id -> {"approve": int, "reject": int}
+        self.candidate_votes = defaultdict(lambda: {"approve": 0, "reject": 0})
+        # position_id -> number of stored vote rows (including undecryptable ones)
+        self.position_totals = defaultdict(int)
+        # position_id -> {"yes_count": int, "no_count": int}
+        self.position_approvals = defaultdict(lambda: {"yes_count": 0, "no_count": 0})
+        self.voter_ids = set()
+        self.stored_total_voters = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "ElectionTally":
+        """Rebuild a tally from materialized rows without touching Vote"""
+        tally = cls(snapshot.election_id)
+        for entry in snapshot.entries.all():
+            tally._count(
+                str(entry.position_id),
+                str(entry.candidate_id) if entry.candidate_id else None,
+                entry.approve,
+                entry.votes,
+            )
+        tally.stored_total_voters = snapshot.total_voters
+        return tally
+
+    def add_vote(self, position_id, vote_data: Optional[Dict]):
+        """Account for one stored vote row; vote_data is None when it could not be decrypted"""
+        if vote_data is None:
+            self._count(str(position_id), None, None, 1)
+            return
+
+        approved = vote_data.get("approve", True) is not False
+        candidate_id = vote_data.get("candidate_id")
+        self._count(str(position_id), str(candidate_id) if candidate_id else None, approved, 1)
+
+        voter_id = vote_data.get("voter_id")
+        if voter_id:
+            self.voter_ids.add(voter_id)
+
+    def _count(self, position_key, candidate_key, approved, votes):
+        self.total_votes += votes
+        self.position_totals[position_key] += votes
+        self.entries[(position_key, candidate_key, approved)] += votes
+
+        if approved is None:
+            self.corrupt_votes += votes
+            return
+
+        if candidate_key:
+            self.candidate_votes[candidate_key]["approve" if approved else "reject"] += votes
+        self.position_approvals[position_key]["yes_count" if approved else "no_count"] += votes
+
+    @property
+    def total_voters(self) -> int:
+        if self.stored_total_voters is not None:
+            return self.stored_total_voters
+        return len(self.voter_ids)
+
+    def vote_count(self, candidate_id) -> int:
+        """Approving votes received by a candidate"""
+        counts = self.candidate_votes.get(str(candidate_id))
+        return counts["approve"] if counts else 0
+
+    def reject_count(self, candidate_id) -> int:
+        counts = self.candidate_votes.get(str(candidate_id))
+        return counts["reject"] if counts else 0
+
+    def position_total(self, position_id) -> int:
+        return self.position_totals.get(str(position_id), 0)
+
+    def vote_percentage(self, candidate_id, position_id) -> float:
+        total_votes = self.position_total(position_id)
+        if total_votes == 0:
+            return 0
+        return round((self.vote_count(candidate_id) / total_votes) * 100, 2)
+
+    def approval_breakdown(self, position_id) -> Dict[str, int]:
+        """Yes/no split for a position, used for single-candidate positions"""
+        counts = self.position_approvals.get(str(position_id))
+        if not counts:
+            return {"yes_count": 0, "no_count": 0}
+        return dict(counts)
+
+
+def build_election_tally(election_id) -> ElectionTally:
+    """Stream all votes of an election once and decrypt each row a single time"""
+    from .crypto import get_voting_crypto
+    from .models import Vote
+
+    crypto = get_voting_crypto()
+    tally = ElectionTally(election_id)
+
+    rows = crypto.bulk_decrypt_queryset(
+        Vote.objects.filter(election_id=election_id).order_by("id"),
+        key_fields=("position_id",),
+    )
+    for position_id, vote_data, error in rows:
+        # Corrupted votes are counted in totals but not attributed
+        tally.add_vote(position_id, vote_data)
+
+    if tally.corrupt_votes:
+        logger.warning(
+            f"Election {election_id}: {tally.corrupt_votes} vote(s) could not be decrypted"
+        )
+    return tally
+
+
+def materialize_election_tally(election_id) -> ElectionTally:
+    """Compute the tally from encrypted votes and store it as TallySnapshot rows"""
+    from .models import TallySnapshot, TallyEntry
+
+    tally = build_election_tally(election_id)
+
+    with transaction.atomic():
+        snapshot, _created = TallySnapshot.objects.update_or_create(
+            election_id=election_id,
+            defaults={
+                "total_votes": tally.total_votes,
+                "total_voters": tally.total_voters,
+                "corrupt_votes": tally.corrupt_votes,
+            },
+        )
+        snapshot.entries.all().delete()
+        TallyEntry.objects.bulk_create(
+            [
+                TallyEntry(
+                    snapshot=snapshot,
+                    position_id=position_id,
+                    candidate_id=candidate_id,
+                    approve=approve,
+                    votes=votes,
+                )
+                for (position_id, candidate_id, approve), votes in tally.entries.items()
+            ]
+        )
+
+    return tally
+
+
+def load_materialized_tally(election_id) -> Optional[ElectionTally]:
+    """Return the stored tally for a final election, or None if it has not been materialized"""
+    from .models import TallySnapshot
+
+    snapshot = (
+        TallySnapshot.objects.filter(
+            election_id=election_id, election__status__in=FINAL_ELECTION_STATUSES
+        )
+        .prefetch_related("entries")
+        .first()
+    )
+    if snapshot is None:
+        return None
+    return ElectionTally.from_snapshot(snapshot)
+
+
+def get_election_tally(election_id) -> ElectionTally:
+    """Materialized tally when available, otherwise a live single-pass tally"""
+    tally = load_materialized_tally(election_id)
+    if tally is None:
+        tally = build_election_tally(election_id)
+    return tally
+
+
+def get_context_tally(context: Dict, election_id) -> ElectionTally:
+    """Return the tally for an election, computing it at most once per serializer context"""
+    tallies = context.setdefault("election_tallies", {})
+    key = str(election_id)
+    if key not in tallies:
+        tallies[key] = get_election_tally(election_id)
+    return tallies[key]
+
+
+def check_tally_consistency(election_id) -> List[Dict]:
+    """Re-derive the tally from Vote.encrypted_vote_data and report drift from the stored rows.
+
+    Returns an empty list when the materialized tally matches the votes.
+    """
+    from .models import TallySnapshot
+
+    snapshot = (
+        TallySnapshot.objects.filter(election_id=election_id)
+        .prefetch_related("entries")
+        .first()
+    )
+    if snapshot is None:
+        return [{"field": "snapshot", "stored": None, "actual": "missing"}]
+
+    stored = ElectionTally.from_snapshot(snapshot)
+    actual = build_election_tally(election_id)
+
+    drift = []
+    for field in ("total_votes", "total_voters", "corrupt_votes"):
+        if getattr(stored, field) != getattr(actual, field):
+            drift.append(
+                {"field": field, "stored": getattr(stored, field), "actual": getattr(actual, field)}
+            )
+
+    for key in sorted(set(stored.entries) | set(actual.entries), key=str):
+        stored_votes = stored.entries.get(key, 0)
+        actual_votes = actual.entries.get(key, 0)
+        if stored_votes != actual_votes:
+            position_id, candidate_id, approve = key
+            drift.append(
+                {
+                    "field": "entry",
+                    "position_id": position_id,
+                    "candidate_id": candidate_id,
+                    "approve": approve,
+                    "stored": stored_votes,
+                    "actual": actual_votes,
+                }
+            )
+
+    return drift
@@ -1,3 +1,1392 @@
-from django.test import TestCase
+"""
+Tests for election tallying, results and ballot casting
+"""
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from celery.exceptions import Retry
+from cryptography.fernet import Fernet
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DataError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.models import ExhibitionEntry, User
+from utils.http_client import GatewayClient, get_gateway_metrics
+from utils.network import get_client_ip
+from utils.sms_dispatcher import dispatch_sms
+from utils.sms_service import SMSService
+from utils.tasks import (
+    plan_notification_job_task,
+    send_notification_batch_task,
+    reconcile_vote_counters,
+    update_election_statuses,
+)
+from elections.audit import build_audit_entry, enqueue_audit_entries, flush_audit_log
+from elections.audit_chain import verify_audit_chain
+from elections.ballot import DuplicateVoteError, cast_ballot
+from elections.ballot_definition import get_ballot_definition, warm_ballot_definition
+from elections import counters
+from elections.counters import (
+    get_election_counts,
+    get_position_total,
+    get_total_votes,
+    refresh_election_counters,
+)
+from elections.crypto import (
+    ED25519,
+    RSA_PSS_SHA256,
+    VotingCrypto,
+    generate_signing_key_pem,
+    get_digital_signature,
+    get_voting_crypto,
+    reset_crypto_services,
+)
+from elections.integrity import verify_election_votes
+from elections.live import build_turnout_snapshot
+from elections.middleware import VotingSessionMiddleware
+from elections.ratelimit import RateLimit, TokenBucketLimiter, rate_limiter
+from elections.models import (
+    AuditCheckpoint,
+    AuditLog,
+    Election,
+    Position,
+    Candidate,
+    NotificationBatch,
+    NotificationJob,
+    TallySnapshot,
+    Vote,
+    VotingSession,
+)
+from elections.notifications import (
+    RESULTS_PUBLISHED,
+    finish_notification_job,
+    plan_notification_job,
+    send_notification_batch,
+)
+from elections.serializers import BulkCastVoteSerializer
+from elections.session_tracking import (
+    IP_CHANGED,
+    USER_AGENT_CHANGED,
+    flush_voting_sessions,
+    track_voting_request,
+    write_voting_sessions,
+)
+from elections.tally import (
+    build_election_tally,
+    check_tally_consistency,
+    load_materialized_tally,
+    materialize_election_tally,
+)
+from elections.tokens import VoterTokenCache, get_voter_tokens
+from elections.voter_state import get_user_vote_map
+
+
+TEST_SECURITY_SETTINGS = {
+    "VOTING_ENCRYPTION_KEY": Fernet.generate_key().decode(),
+    "CACHES": {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    },
+}
+
+
+@override_settings(**TEST_SECURITY_SETTINGS)
+class ElectionTestCase(TestCase):
+    """Shared election fixture: one multi-candidate and one single-candidate position"""
+
+    def setUp(self):
+        # Cached election state must not leak between tests
+        cache.clear()
+        # Entries queued by earlier tests are written now, not mid-assertion
+        flush_audit_log()
+        self.ec_member = User.objects.create_user(
+            username="ecmember", student_id="EC0001", password="testpassword123", is_ec_member=True
+        )
+        self.voters = [
+            User.objects.create_user(
+                username=f"voter{i}", student_id=f"ST000{i}", password="testpassword123"
+            )
+            for i in range(3)
+        ]
+        now = timezone.now()
+        self.election = Election.objects.create(
+            title="GMSA General Election",
+            description="Test election",
+            start_date=now - timedelta(hours=1),
+            end_date=now + timedelta(hours=1),
+            status="active",
+            created_by=self.ec_member,
+        )
+        self.president = Position.objects.create(election=self.election, title="President", order=1)
+        self.secretary = Position.objects.create(election=self.election, title="Secretary", order=2)
+        self.candidate_a = Candidate.objects.create(
+            position=self.president, user=self.voters[0], manifesto="A", order=1
+        )
+        self.candidate_b = Candidate.objects.create(
+            position=self.president, user=self.voters[1], manifesto="B", order=2
+        )
+        self.sole_candidate = Candidate.objects.create(
+            position=self.secretary, user=self.voters[2], manifesto="C", order=1
+        )
+
+    def cast_sample_votes(self):
+        """voter0 and voter1 vote A, voter2 votes B; secretary gets two yes and one no"""
+        Vote.create_secure_vote(self.voters[0], self.candidate_a)
+        Vote.create_secure_vote(self.voters[1], self.candidate_a)
+        Vote.create_secure_vote(self.voters[2], self.candidate_b)
+        Vote.create_secure_vote(self.voters[0], self.sole_candidate, approve=True)
+        Vote.create_secure_vote(self.voters[1], self.sole_candidate, approve=True)
+        Vote.create_secure_vote(self.voters[2], self.sole_candidate, approve=False)
+
+
+class ElectionTallyTest(ElectionTestCase):
+    def test_single_pass_tally(self):
+        """Tally aggregates counts, splits, totals and unique voters in one scan"""
+        self.cast_sample_votes()
+        # A vote that cannot be decrypted is counted in totals but not attributed
+        Vote.objects.create(
+            election_id=self.election.id,
+            position_id=self.president.id,
+            encrypted_vote_data="garbage",
+            anonymous_voter_token="anon_corrupt",
+        )
+
+        with self.assertNumQueries(1):
+            tally = build_election_tally(self.election.id)
+
+        self.assertEqual(tally.total_votes, 7)
+        self.assertEqual(tally.corrupt_votes, 1)
+        self.assertEqual(tally.total_voters, 3)
+        self.assertEqual(tally.vote_count(self.candidate_a.id), 2)
+        self.assertEqual(tally.vote_count(self.candidate_b.id), 1)
+        self.assertEqual(tally.position_total(self.president.id), 4)
+        self.assertEqual(tally.vote_percentage(self.candidate_a.id, self.president.id), 50.0)
+        self.assertEqual(tally.vote_count(self.sole_candidate.id), 2)
+        self.assertEqual(tally.reject_count(self.sole_candidate.id), 1)
+        self.assertEqual(
+            tally.approval_breakdown(self.secretary.id), {"yes_count": 2, "no_count": 1}
+        )
+
+    def test_election_results_view(self):
+        """Results endpoint reads every figure from the tally"""
+        self.cast_sample_votes()
+        self.election.status = "completed"
+        self.election.save()
+
+        client = APIClient()
+        client.force_authenticate(self.ec_member)
+        response = client.get(f"/api/elections/{self.election.id}/results/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["election"]["total_votes"], 6)
+        self.assertEqual(response.data["election"]["total_voters"], 3)
+        president, secretary = response.data["positions"]
+        self.assertEqual(president["total_votes"], 3)
+        self.assertEqual(president["candidates"][0]["id"], self.candidate_a.id)
+        self.assertEqual(president["candidates"][0]["vote_count"], 2)
+        self.assertEqual(secretary["yes_count"], 2)
+        self.assertEqual(secretary["no_count"], 1)
+
+
+class MaterializedTallyTest(ElectionTestCase):
+    def test_completed_election_reads_stored_tally(self):
+        """After materialization counts are served from TallyEntry rows and drift is detected"""
+        self.cast_sample_votes()
+        self.election.status = "completed"
+        self.election.save()
+        materialize_election_tally(self.election.id)
+        self.assertEqual(check_tally_consistency(self.election.id), [])
+
+        with self.assertNumQueries(2):
+            # snapshot and its entries; no Vote rows are read
+            self.assertEqual(self.candidate_a.vote_count, 2)
+        self.assertEqual(self.president.total_votes, 3)
+        self.assertEqual(self.candidate_a.vote_percentage, 66.67)
+
+        # A late vote row makes the stored tally drift
+        Vote.create_secure_vote(self.ec_member, self.candidate_b)
+        drift = check_tally_consistency(self.election.id)
+        self.assertIn("total_votes", [item["field"] for item in drift])
+
+    def test_reopened_election_drops_its_snapshot(self):
+        """Moving an election out of a final status discards the stored tally"""
+        self.cast_sample_votes()
+        self.election.status = "completed"
+        self.election.save()
+        materialize_election_tally(self.election.id)
+
+        self.election.status = "active"
+        self.election.save(update_fields=["status"])
+        Vote.create_secure_vote(self.ec_member, self.candidate_a)
+        self.election.status = "completed"
+        self.election.save()
+
+        self.assertFalse(TallySnapshot.objects.filter(election=self.election).exists())
+        self.assertIsNone(load_materialized_tally(self.election.id))
+        self.assertEqual(self.candidate_a.vote_count, 3)
+
+    def test_candidate_admin_loads_one_tally_per_election(self):
+        """The changelist reads the snapshot once for all candidates on the page"""
+        self.cast_sample_votes()
+        self.election.status = "completed"
+        self.election.save()
+        materialize_election_tally(self.election.id)
+        admin_user = User.objects.create_superuser(
+            username="admin", student_id="AD0001", password="testpassword123"
+        )
+        self.client.force_login(admin_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/elections/candidate/")
+
+        self.assertEqual(response.status_code, 200)
+        snapshot_queries = [
+            query for query in queries.captured_queries
+            if 'FROM "elections_tallysnapshot"' in query["sql"]
+        ]
+        self.assertEqual(len(snapshot_queries), 1)
+
+
+@override_settings(**TEST_SECURITY_SETTINGS)
+class BulkDecryptionTest(TestCase):
+    def test_parallel_decryption_preserves_order_and_reports_corrupt_rows(self):
+        """Chunks decrypted across worker processes come back in input order"""
+        crypto = VotingCrypto()
+        rows = [(i, crypto.encrypt_vote_data({"voter_id": str(i)})) for i in range(9)]
+        rows[4] = (4, "not-a-valid-token")
+        rows[7] = (7, None)
+
+        results = list(crypto.bulk_decrypt_votes(rows, workers=2, chunk_size=2))
+
+        self.assertEqual([key for key, _data, _error in results], list(range(9)))
+        for key, data, error in results:
+            if key in (4, 7):
+                self.assertIsNone(data)
+                self.assertTrue(error)
+            else:
+                self.assertEqual(data["voter_id"], str(key))
+                self.assertIsNone(error)
+
+    def test_decryption_inside_a_daemonic_process_runs_serially(self):
+        """Celery prefork workers are daemonic and may not start a process pool"""
+        crypto = VotingCrypto()
+        rows = [(i, crypto.encrypt_vote_data({"voter_id": str(i)})) for i in range(5)]
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+
+        def scan():
+            try:
+                decrypted = crypto.bulk_decrypt_votes(rows, workers=2, chunk_size=2)
+                results.put([data["voter_id"] for _key, data, _error in decrypted])
+            except Exception as e:
+                results.put(repr(e))
+
+        worker = context.Process(target=scan, daemon=True)
+        worker.start()
+        self.assertEqual(results.get(timeout=30), [str(i) for i in range(5)])
+        worker.join()
+
+
+@override_settings(**TEST_SECURITY_SETTINGS)
+class CryptoServiceCacheTest(TestCase):
+    def test_services_are_shared_and_reset_on_settings_change(self):
+        """One crypto/signature instance per process, rebuilt when key settings change"""
+        crypto = get_voting_crypto()
+        signer = get_digital_signature()
+        self.assertIs(get_voting_crypto(), crypto)
+        self.assertIs(get_digital_signature(), signer)
+
+        with override_settings(VOTING_ENCRYPTION_KEY=Fernet.generate_key().decode()):
+            self.assertIsNot(get_voting_crypto(), crypto)
+            self.assertIsNot(get_digital_signature(), signer)
+
+
+class SigningKeyStoreTest(ElectionTestCase):
+    def test_signatures_verify_across_restarts_with_key_file(self):
+        """A key loaded from VOTE_SIGNING_KEY_PATH verifies votes signed by an earlier process"""
+        with tempfile.TemporaryDirectory() as key_dir:
+            key_path = os.path.join(key_dir, "signing.pem")
+            with open(key_path, "wb") as key_file:
+                key_file.write(generate_signing_key_pem())
+
+            with override_settings(VOTE_SIGNING_KEY_PATH=key_path):
+                vote = Vote.create_secure_vote(self.voters[0], self.candidate_a)
+                # Simulate a new process reading the key store again
+                reset_crypto_services()
+                self.assertTrue(vote.verify_integrity())
+
+
+class BatchVerificationTest(ElectionTestCase):
+    def test_batch_verification_flags_tampered_votes(self):
+        """Hashes and signatures are re-checked in worker processes and stored in bulk"""
+        self.cast_sample_votes()
+        votes = list(Vote.objects.filter(election_id=self.election.id).order_by("id"))
+        Vote.objects.filter(id=votes[0].id).update(vote_hash="0" * 64)
+        Vote.objects.filter(id=votes[1].id).update(digital_signature="00" * 256)
+        Vote.objects.filter(id=votes[2].id).update(encrypted_vote_data="garbage")
+
+        summary = verify_election_votes(self.election.id, workers=2, chunk_size=2)
+
+        self.assertEqual(summary["total_votes"], 6)
+        self.assertEqual(summary["valid_votes"], 3)
+        self.assertEqual(summary["integrity_failures"], 2)
+        self.assertEqual(summary["signature_failures"], 2)
+        self.assertEqual(summary["unreadable_votes"], 1)
+        # Votes are created verified, so only the three failing rows change
+        self.assertEqual(summary["updated_votes"], 3)
+
+        flags = dict(
+            Vote.objects.filter(election_id=self.election.id).values_list(
+                "id", "integrity_verified"
+            )
+        )
+        self.assertFalse(flags[votes[0].id])
+        self.assertTrue(flags[votes[1].id])
+        self.assertTrue(flags[votes[3].id])
+        self.assertFalse(Vote.objects.get(id=votes[1].id).signature_verified)
+
+
+class SignatureBackendTest(ElectionTestCase):
+    def test_switching_to_ed25519_keeps_rsa_votes_verifiable(self):
+        """New votes use the configured scheme; old votes verify by their stored tag"""
+        with tempfile.TemporaryDirectory() as key_dir:
+            rsa_path = os.path.join(key_dir, "rsa.pem")
+            ed25519_path = os.path.join(key_dir, "ed25519.pem")
+            with open(rsa_path, "wb") as key_file:
+                key_file.write(generate_signing_key_pem(RSA_PSS_SHA256))
+            with open(ed25519_path, "wb") as key_file:
+                key_file.write(generate_signing_key_pem(ED25519))
+
+            with override_settings(VOTE_SIGNING_KEY_PATH=rsa_path):
+                rsa_vote = Vote.create_secure_vote(self.voters[0], self.candidate_a)
+
+            with override_settings(
+                VOTE_SIGNING_KEY_PATH=rsa_path,
+                VOTE_ED25519_KEY_PATH=ed25519_path,
+                VOTE_SIGNATURE_ALGORITHM=ED25519,
+            ):
+                ed25519_vote = Vote.create_secure_vote(self.voters[1], self.candidate_a)
+                self.assertEqual(rsa_vote.signature_algorithm, RSA_PSS_SHA256)
+                self.assertEqual(ed25519_vote.signature_algorithm, ED25519)
+                self.assertEqual(len(bytes.fromhex(ed25519_vote.digital_signature)), 64)
+
+                self.assertTrue(rsa_vote.verify_integrity())
+                self.assertTrue(ed25519_vote.verify_integrity())
+
+                summary = verify_election_votes(self.election.id, workers=1)
+                self.assertEqual(summary["valid_votes"], 2)
+
+
+class BallotWriterTest(ElectionTestCase):
+    def build_ballot(self, positions, prefix):
+        items = []
+        for i in range(positions):
+            position = Position.objects.create(
+                election=self.election, title=f"{prefix} {i}", order=10 + i
+            )
+            candidate = Candidate.objects.create(position=position, user=self.voters[i % 3])
+            candidate = Candidate.objects.select_related("user").get(id=candidate.id)
+            items.append({"position": position, "candidate": candidate, "approve": True})
+        return items
+
+    def test_query_count_does_not_grow_with_ballot_size(self):
+        """A 12-position ballot costs the same queries as a 2-position one"""
+        small_ballot = self.build_ballot(2, "Committee")
+        large_ballot = self.build_ballot(12, "Board")
+        # First-ballot detection reads the cached ballot definition
+        warm_ballot_definition(self.election.id)
+
+        with CaptureQueriesContext(connection) as small:
+            with self.captureOnCommitCallbacks(execute=True):
+                cast_ballot(self.voters[0], self.election, small_ballot, ip_address="127.0.0.1")
+        with CaptureQueriesContext(connection) as large:
+            with self.captureOnCommitCallbacks(execute=True):
+                cast_ballot(self.voters[1], self.election, large_ballot, ip_address="127.0.0.1")
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Vote.objects.filter(election_id=self.election.id).count(), 14)
+        # Audit entries are queued, not written by the ballot
+        self.assertFalse(AuditLog.objects.filter(action="vote_cast").exists())
+        self.assertEqual(flush_audit_log(), 14)
+        self.assertEqual(AuditLog.objects.filter(action="vote_cast").count(), 14)
+        self.assertTrue(all(log.integrity_hash for log in AuditLog.objects.all()))
+        self.assertEqual(
+            VotingSession.objects.get(user=self.voters[1], election=self.election).votes_cast, 12
+        )
+
+    def test_duplicate_ballot_is_rejected_without_writes(self):
+        """Re-voting any position on the ballot rejects the whole ballot"""
+        Vote.create_secure_vote(self.voters[0], self.candidate_a)
+        items = [
+            {"position": self.secretary, "candidate": self.sole_candidate, "approve": True},
+            {"position": self.president, "candidate": self.candidate_b, "approve": True},
+        ]
+
+        with self.assertRaises(DuplicateVoteError) as raised:
+            cast_ballot(self.voters[0], self.election, items, ip_address="127.0.0.1")
+        self.assertEqual(raised.exception.positions, [self.president])
+        self.assertEqual(Vote.objects.count(), 1)
+
+        client = APIClient()
+        client.force_authenticate(self.voters[0])
+        response = client.post(
+            "/api/elections/vote/",
+            {
+                "election_id": str(self.election.id),
+                "selections": [
+                    {"position_id": str(self.president.id), "candidate_id": str(self.candidate_b.id)}
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class BallotValidationTest(ElectionTestCase):
+    def test_selections_are_validated_in_memory(self):
+        """Election, positions and candidates are loaded once regardless of selections"""
+        serializer = BulkCastVoteSerializer(
+            data={
+                "election_id": str(self.election.id),
+                "selections": [
+                    {"position_id": str(self.president.id), "candidate_id": str(self.candidate_b.id)},
+                    {"position_id": str(self.secretary.id), "approve": False},
+                ],
+            }
+        )
+        with self.assertNumQueries(3):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        president, secretary = serializer.validated_data["validated_items"]
+        self.assertEqual(president["candidate"], self.candidate_b)
+        self.assertEqual(secretary["candidate"], self.sole_candidate)
+        self.assertFalse(secretary["approve"])
+
+        # Casting the validated ballot needs no further lookups of the ballot itself
+        with self.assertNumQueries(0):
+            for item in serializer.validated_data["validated_items"]:
+                Vote.build_secure_vote(
+                    self.voters[0], item["candidate"], position=item["position"]
+                )
+
+    def test_invalid_selections_are_rejected(self):
+        """Unknown candidates and approve flags on contested positions still fail"""
+        for selection in (
+            {"position_id": str(self.president.id), "candidate_id": str(self.sole_candidate.id)},
+            {"position_id": str(self.president.id), "candidate_id": str(self.candidate_a.id), "approve": True},
+        ):
+            serializer = BulkCastVoteSerializer(
+                data={"election_id": str(self.election.id), "selections": [selection]}
+            )
+            self.assertFalse(serializer.is_valid())
+
+
+class BallotDefinitionTest(ElectionTestCase):
+    def test_cached_ballot_needs_no_queries_and_follows_edits(self):
+        """The ballot is served from cache until a candidate changes"""
+        warm_ballot_definition(self.election.id)
+
+        with self.assertNumQueries(0):
+            ballot = get_ballot_definition(self.election.id)
+        president, secretary = ballot.positions
+        self.assertEqual(president.title, "President")
+        self.assertEqual(
+            [candidate.id for candidate in president.candidates],
+            [str(self.candidate_a.id), str(self.candidate_b.id)],
+        )
+        self.assertFalse(president.is_single_candidate)
+        self.assertTrue(secretary.is_single_candidate)
+        self.assertEqual(secretary.candidates[0].student_id, "ST0002")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Candidate.objects.create(position=self.secretary, user=self.ec_member, order=2)
+        ballot = get_ballot_definition(self.election.id)
+        self.assertFalse(ballot.positions[1].is_single_candidate)
+
+        client = APIClient()
+        client.force_authenticate(self.voters[0])
+        response = client.get(f"/api/elections/{self.election.id}/ballot/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["positions"][1]["candidates"]), 2)
+        self.assertNotIn("vote_count", response.data["positions"][0]["candidates"][0])
+
+    def test_activation_builds_ballot(self):
+        """update_election_statuses caches the ballot of elections it activates"""
+        self.election.status = "upcoming"
+        self.election.save()
+
+        update_election_statuses()
+
+        self.election.refresh_from_db()
+        self.assertEqual(self.election.status, "active")
+        with self.assertNumQueries(0):
+            self.assertEqual(get_ballot_definition(self.election.id).status, "active")
+
+
+class ElectionDetailQueryTest(ElectionTestCase):
+    def test_voter_detail_omits_tallies_in_constant_queries(self):
+        """Voters get the ballot without counts; queries do not grow with candidates"""
+        self.cast_sample_votes()
+        client = APIClient()
+        client.force_authenticate(self.voters[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f"/api/elections/{self.election.id}/")
+        self.assertEqual(response.status_code, 200)
+        president = response.data["positions"][0]
+        self.assertNotIn("total_votes", president)
+        self.assertNotIn("vote_count", president["candidates"][0])
+        self.assertEqual(president["candidates"][0]["user"]["student_id"], "ST0000")
+        self.assertNotIn("active_elections_vote_status", president["candidates"][0]["user"])
+        self.assertTrue(response.data["is_candidate"])
+
+        # More candidates must not add queries
+        for i in range(3):
+            user = User.objects.create_user(username=f"extra{i}", student_id=f"EX000{i}", password="x")
+            Candidate.objects.create(position=self.president, user=user, order=3 + i)
+        with self.assertNumQueries(len(queries)):
+            client.get(f"/api/elections/{self.election.id}/")
+
+    def test_ec_detail_includes_tallies(self):
+        """EC members still see counts, computed from one shared tally"""
+        self.cast_sample_votes()
+        client = APIClient()
+        client.force_authenticate(self.ec_member)
+
+        response = client.get(f"/api/elections/{self.election.id}/")
+        president = response.data["positions"][0]
+        self.assertEqual(president["total_votes"], 3)
+        self.assertEqual(president["candidates"][0]["vote_count"], 2)
+
+
+class ElectionListQueryTest(ElectionTestCase):
+    def add_elections(self, count):
+        now = timezone.now()
+        for i in range(count):
+            election = Election.objects.create(
+                title=f"By-election {Election.objects.count()}",
+                description="Test election",
+                start_date=now - timedelta(hours=1),
+                end_date=now + timedelta(hours=1),
+                status="active",
+                show_results_after_voting=True,
+                created_by=self.ec_member,
+            )
+            Position.objects.create(election=election, title="Treasurer")
+
+    def test_list_queries_do_not_grow_with_elections(self):
+        """Voted state and candidacy are resolved once for the whole page"""
+        self.election.show_results_after_voting = True
+        self.election.save()
+        Vote.create_secure_vote(self.voters[0], self.candidate_a)
+        client = APIClient()
+        client.force_authenticate(self.voters[0])
+
+        self.add_elections(1)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/elections/")
+        self.add_elections(4)
+        with self.assertNumQueries(len(queries)):
+            response = client.get("/api/elections/")
+
+        results = {item["id"]: item for item in response.data["results"]}
+        listed = results[str(self.election.id)]
+        self.assertTrue(listed["can_view_results"])
+        self.assertTrue(listed["is_candidate"])
+        others = [item for key, item in results.items() if key != str(self.election.id)]
+        self.assertEqual(len(others), 5)
+        self.assertFalse(any(item["can_view_results"] or item["is_candidate"] for item in others))
+
+
+class VoterStateCacheTest(ElectionTestCase):
+    def test_vote_map_is_cached_and_written_through(self):
+        """Profile vote state is served from cache and flips when a ballot commits"""
+        voter = self.voters[0]
+        self.assertEqual(get_user_vote_map(voter), {str(self.election.id): False})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_vote_map(voter), {str(self.election.id): False})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_ballot(
+                voter,
+                self.election,
+                [{"position": self.president, "candidate": self.candidate_a}],
+                ip_address="127.0.0.1",
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_vote_map(voter), {str(self.election.id): True})
+        self.assertEqual(
+            Vote.get_user_active_election_vote_map(voter), {str(self.election.id): True}
+        )
+
+        # Closing the election removes it from every user's map
+        with self.captureOnCommitCallbacks(execute=True):
+            self.election.status = "completed"
+            self.election.save()
+        self.assertEqual(get_user_vote_map(voter), {})
+
+
+class VoterTokenCacheTest(ElectionTestCase):
+    def test_tokens_are_derived_once_per_voter_and_election(self):
+        """Repeated checks reuse tokens; the LRU stays bounded"""
+        crypto = get_voting_crypto()
+        positions = [self.president.id, self.secretary.id]
+        expected = {
+            str(pid): crypto.anonymize_voter_data(str(self.voters[0].id), str(self.election.id), str(pid))
+            for pid in positions
+        }
+        self.assertEqual(get_voter_tokens(self.voters[0].id, self.election.id, positions), expected)
+
+        with mock.patch.object(VotingCrypto, "anonymize_voter_data") as anonymize:
+            Vote.has_user_voted_in_election(self.voters[0], self.election)
+            Vote.has_voter_voted_for_position(self.voters[0], self.president)
+            anonymize.assert_not_called()
+
+        token_cache = VoterTokenCache(maxsize=2)
+        for voter in self.voters:
+            token_cache.get_tokens(voter.id, self.election.id, positions)
+        self.assertEqual(len(token_cache), 2)
+
+        with override_settings(VOTER_ANONYMIZATION_SALT="rotated-salt"):
+            self.assertNotEqual(
+                get_voter_tokens(self.voters[0].id, self.election.id, positions), expected
+            )
+
+
+class VoteCounterTest(ElectionTestCase):
+    def test_counters_follow_ballots_without_counting_votes(self):
+        """Warm counters answer totals with no queries and follow committed ballots"""
+        self.cast_sample_votes()
+        position_ids = [self.president.id, self.secretary.id]
+        self.assertEqual(
+            get_election_counts(self.election.id, position_ids),
+            {
+                "total": 6,
+                "encrypted": 6,
+                "verified": 6,
+                "voters": 0,
+                "positions": {str(self.president.id): 3, str(self.secretary.id): 3},
+            },
+        )
+
+        voter = User.objects.create_user(
+            username="late", password="pass12345", student_id="ST0099", email="late@test.com"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_ballot(
+                voter,
+                self.election,
+                [
+                    {"position": self.president, "candidate": self.candidate_b},
+                    {"position": self.secretary, "candidate": self.sole_candidate, "approve": True},
+                ],
+                ip_address="127.0.0.1",
+            )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.election.total_votes, 8)
+            self.assertEqual(self.president.total_votes, 4)
+            self.assertEqual(self.candidate_a.position.total_votes, 4)
+            counts = get_election_counts(self.election.id, position_ids)
+        self.assertEqual(counts["verified"], 8)
+
+        # Drift (e.g. rows removed outside the ballot writer) is corrected by reconciliation
+        Vote.objects.filter(position_id=self.secretary.id).update(signature_verified=False)
+        reconcile_vote_counters()
+        counts = get_election_counts(self.election.id, position_ids)
+        self.assertEqual((counts["total"], counts["verified"]), (8, 4))
+        self.assertEqual(refresh_election_counters(self.election.id), counts)
+
+    def test_ballot_committed_while_seeding_is_kept(self):
+        """Increments that arrive while the database is counted are added to the seeded counters"""
+        self.cast_sample_votes()
+        cache.clear()
+        counted = counters.count_election_votes(self.election.id)
+        voter = User.objects.create_user(
+            username="late", password="pass12345", student_id="ST0099", email="late@test.com"
+        )
+
+        def count_then_ballot_commits(election_id):
+            with self.captureOnCommitCallbacks(execute=True):
+                cast_ballot(
+                    voter,
+                    self.election,
+                    [{"position": self.president, "candidate": self.candidate_b}],
+                    ip_address="127.0.0.1",
+                )
+            return counted
+
+        with mock.patch(
+            "elections.counters.count_election_votes", side_effect=count_then_ballot_commits
+        ):
+            self.assertEqual(get_total_votes(self.election.id), 7)
+        self.assertEqual(get_position_total(self.election.id, self.president.id), 4)
+        self.assertEqual(counters.count_election_votes(self.election.id)["total"], 7)
+
+    def test_voters_are_counted_on_their_first_ballot_only(self):
+        """First ballots are found from the voter's tokens, whatever their sessions say"""
+        position_ids = [self.president.id, self.secretary.id]
+        self.assertEqual(get_election_counts(self.election.id, position_ids)["voters"], 0)
+
+        # No address, so no session is opened for either ballot
+        for item in (
+            {"position": self.president, "candidate": self.candidate_a},
+            {"position": self.secretary, "candidate": self.sole_candidate, "approve": True},
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                cast_ballot(self.voters[0], self.election, [item])
+        self.assertEqual(get_election_counts(self.election.id, position_ids)["voters"], 1)
+
+        # A session opened by request tracking before any vote
+        VotingSession.objects.create(
+            user=self.voters[1], election=self.election, ip_address="10.0.0.1", votes_cast=0
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_ballot(
+                self.voters[1],
+                self.election,
+                [{"position": self.president, "candidate": self.candidate_b}],
+                ip_address="10.0.0.1",
+            )
+        self.assertEqual(get_election_counts(self.election.id, position_ids)["voters"], 2)
+        self.assertEqual(
+            VotingSession.objects.get(user=self.voters[1], election=self.election).votes_cast, 1
+        )
+
+
+class LiveTurnoutTest(ElectionTestCase):
+    def cast_ballots(self):
+        for voter in self.voters[:2]:
+            with self.captureOnCommitCallbacks(execute=True):
+                cast_ballot(
+                    voter,
+                    self.election,
+                    [{"position": self.president, "candidate": self.candidate_a}],
+                    ip_address="127.0.0.1",
+                )
+        for i in range(4):
+            ExhibitionEntry.objects.create(phone_number=f"02400000{i}", is_verified=True)
+
+    def test_turnout_snapshot_and_poll(self):
+        """Snapshots come from the counters; under WSGI the current one is returned at once"""
+        self.cast_ballots()
+        build_turnout_snapshot(self.election.id)
+        with self.assertNumQueries(0):
+            snapshot = build_turnout_snapshot(self.election.id)
+        self.assertEqual((snapshot["voters"], snapshot["eligible_voters"]), (2, 4))
+        self.assertEqual(snapshot["turnout_percentage"], 50.0)
+        self.assertEqual(snapshot["total_votes"], 2)
+        self.assertEqual(
+            [(p["title"], p["votes"]) for p in snapshot["positions"]],
+            [("President", 2), ("Secretary", 0)],
+        )
+        self.assertEqual(snapshot["votes_per_minute"][-1]["votes"], 2)
+
+        url = f"/api/elections/{self.election.id}/turnout/"
+        self.assertEqual(self.client.get(url).status_code, 401)
+        # Tokens in the query string are ignored
+        response = self.client.get(url, {"token": str(AccessToken.for_user(self.ec_member))})
+        self.assertEqual(response.status_code, 401)
+
+        # EventSource authenticates with the refresh token cookie set at login
+        self.client.cookies["refresh_token"] = str(RefreshToken.for_user(self.voters[0]))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        refresh = RefreshToken.for_user(self.ec_member)
+        self.client.cookies["refresh_token"] = str(refresh)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        refresh.blacklist()
+        self.assertEqual(self.client.get(url).status_code, 401)
+        del self.client.cookies["refresh_token"]
+
+        auth = f"Bearer {AccessToken.for_user(self.ec_member)}"
+        response = self.client.get(url, {"since": -1}, HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["sequence"], 1)
+        self.assertEqual(response.json()["voters"], 2)
+
+        # Nothing newer: no long-poll under WSGI, and the shared sequence holds
+        started = time.monotonic()
+        response = self.client.get(url, {"since": 1}, HTTP_AUTHORIZATION=auth)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(response.json()["sequence"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_ballot(
+                self.voters[2],
+                self.election,
+                [{"position": self.president, "candidate": self.candidate_a}],
+                ip_address="127.0.0.1",
+            )
+        response = self.client.get(url, HTTP_AUTHORIZATION=auth)
+        self.assertEqual((response.json()["sequence"], response.json()["voters"]), (2, 3))
+
+    async def test_event_stream(self):
+        """Over ASGI the endpoint streams turnout events"""
+        await sync_to_async(self.cast_ballots)()
+        token = await sync_to_async(AccessToken.for_user)(self.ec_member)
+        response = await self.async_client.get(
+            f"/api/elections/{self.election.id}/turnout/",
+            headers={"authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b"retry: 5000\n\n")
+        event = (await anext(events)).decode()
+        await events.aclose()
+        self.assertTrue(event.startswith("id: 1\nevent: turnout\n"))
+        self.assertEqual(json.loads(event.split("data: ", 1)[1])["voters"], 2)
+
+
+class RateLimitTest(ElectionTestCase):
+    @override_settings(RATE_LIMITS={"/api/elections/vote/": (2, 60)})
+    def test_limits_per_path_prefix(self):
+        """Each prefix has its own window; the fallback bucket enforces the same rate"""
+        client = APIClient()
+        client.force_authenticate(self.voters[0])
+        url = "/api/elections/vote/"
+        codes = [client.post(url, {}, format="json").status_code for _ in range(3)]
+        self.assertNotEqual(codes[1], 429)
+        self.assertEqual(codes[2], 429)
+        # Other paths are counted separately
+        self.assertNotEqual(client.get("/api/elections/").status_code, 429)
+
+        with mock.patch.object(rate_limiter, "_count_hit", side_effect=ConnectionError):
+            with mock.patch.object(rate_limiter, "_cache_down_until", 0.0):
+                self.assertTrue(rate_limiter.allow("outage", "10.0.0.1", RateLimit(1, 60)))
+                # Redis is not retried for a while; the in-process bucket is used
+                self.assertFalse(rate_limiter.allow("outage", "10.0.0.1", RateLimit(1, 60)))
+                self.assertEqual(rate_limiter._count_hit.call_count, 1)
+
+        buckets = TokenBucketLimiter(maxsize=2)
+        limit = RateLimit(2, 60)
+        self.assertEqual([buckets.allow("ip", limit, now=0) for _ in range(3)], [True, True, False])
+        self.assertTrue(buckets.allow("ip", limit, now=30))
+
+        # A window that closes between add() and incr() is reopened, not treated as an outage
+        with mock.patch.object(rate_limiter, "_cache_down_until", 0.0):
+            with mock.patch("elections.ratelimit.cache.incr", side_effect=[ValueError, 1]):
+                self.assertTrue(rate_limiter.allow("rollover", "10.0.0.1", RateLimit(1, 60)))
+            self.assertEqual(rate_limiter._cache_down_until, 0.0)
+
+    @override_settings(RATE_LIMITS={"/api/elections/vote/": (2, 60)}, TRUSTED_PROXY_COUNT=0)
+    def test_forwarded_for_is_only_trusted_from_proxies(self):
+        """Rotating X-Forwarded-For does not reset the limit; users are limited per account"""
+        url = "/api/elections/vote/"
+        codes = [
+            self.client.post(url, HTTP_X_FORWARDED_FOR=f"198.51.100.{i}").status_code
+            for i in range(3)
+        ]
+        self.assertEqual(codes[2], 429)
+
+        # Behind one proxy the client is the address it appended, not the client's own entries
+        request = RequestFactory().get("/", HTTP_X_FORWARDED_FOR="203.0.113.9, 10.1.1.1")
+        self.assertEqual(get_client_ip(request), "127.0.0.1")
+        with override_settings(TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(get_client_ip(request), "10.1.1.1")
+            request.META["HTTP_X_FORWARDED_FOR"] = "unknown"
+            self.assertEqual(get_client_ip(request), "127.0.0.1")
+
+        # Same address, separate accounts: each has its own allowance
+        for voter in self.voters[:2]:
+            auth = f"Bearer {AccessToken.for_user(voter)}"
+            codes = [self.client.post(url, HTTP_AUTHORIZATION=auth).status_code for _ in range(3)]
+            self.assertNotEqual(codes[1], 429)
+            self.assertEqual(codes[2], 429)
+
+
+class AuditSinkTest(ElectionTestCase):
+    def test_flush_writes_hashed_entries_once(self):
+        """Queued entries keep their event time and id; a repeated flush adds nothing"""
+        entry = build_audit_entry(
+            "vote_verified", "vote", "abc", user_id=self.ec_member.id, details={"ok": True}
+        )
+        gone = build_audit_entry("user_login", "user", "x", user_id=self.voters[2].id)
+        enqueue_audit_entries([entry, gone])
+        self.voters[2].delete()
+
+        # Known ids, known users, then chain head and insert inside a savepoint
+        with self.assertNumQueries(6):
+            self.assertEqual(flush_audit_log(), 2)
+        log = AuditLog.objects.get(id=entry["id"])
+        self.assertEqual(log.timestamp.isoformat(), entry["timestamp"])
+        self.assertEqual(log.user, self.ec_member)
+        self.assertEqual(log.integrity_hash, log.compute_integrity_hash())
+        self.assertIsNone(AuditLog.objects.get(id=gone["id"]).user_id)
+
+        # Redelivery after a flush that stored the batch but died before trimming the queue
+        enqueue_audit_entries([entry])
+        self.assertEqual(flush_audit_log(), 0)
+        self.assertEqual(AuditLog.objects.filter(id__in=[entry["id"], gone["id"]]).count(), 2)
+
+    def test_unstorable_entry_does_not_hold_up_the_batch(self):
+        first = build_audit_entry("user_login", "user", "a", ip_address="unknown")
+        self.assertIsNone(first["ip_address"])
+        bad = build_audit_entry("user_login", "user", "b")
+        bad["timestamp"] = "2024-13-45T00:00:00"
+        last = build_audit_entry("user_login", "user", "c", ip_address="10.0.0.1")
+        enqueue_audit_entries([first, bad, last])
+
+        self.assertEqual(flush_audit_log(), 2)
+        self.assertEqual(AuditLog.objects.filter(id__in=[first["id"], last["id"]]).count(), 2)
+        self.assertFalse(AuditLog.objects.filter(id=bad["id"]).exists())
+        self.assertEqual(flush_audit_log(), 0)
+
+
+class AuditChainTest(ElectionTestCase):
+    def log(self, count):
+        enqueue_audit_entries(
+            [build_audit_entry("vote_cast", "vote", i, user_id=self.voters[0].id) for i in range(count)]
+        )
+        flush_audit_log()
+
+    def test_chain_is_verified_incrementally_from_checkpoints(self):
+        """Only entries after the last checkpoint are walked; edits and gaps are reported"""
+        self.log(3)
+        AuditLog.objects.create(action="admin_access", resource_type="election", resource_id="x")
+        total = AuditLog.objects.count()
+        self.assertEqual(
+            sorted(AuditLog.objects.values_list("sequence", flat=True)), list(range(1, total + 1))
+        )
+
+        summary = verify_audit_chain(chunk_size=2)
+        self.assertEqual((summary["failure_count"], summary["entries_verified"]), (0, total))
+        self.assertEqual(AuditCheckpoint.objects.get().sequence, total)
+
+        self.log(2)
+        summary = verify_audit_chain(chunk_size=2)
+        self.assertEqual((summary["start_sequence"], summary["entries_verified"]), (total, 2))
+        self.assertEqual(AuditCheckpoint.objects.count(), 2)
+
+        AuditLog.objects.filter(sequence=total + 1).update(details={"candidate_id": "forged"})
+        AuditLog.objects.filter(sequence=2).delete()
+        summary = verify_audit_chain(full=True, checkpoint=False)
+        self.assertEqual(
+            [failure["sequence"] for failure in summary["failures"]], [2, 3, total + 1]
+        )
+        with self.assertRaises(CommandError):
+            call_command("verify_audit_chain", "--full", stdout=io.StringIO())
+        self.assertEqual(AuditCheckpoint.objects.count(), 2)
+
+
+class AuditTrailQueryTest(ElectionTestCase):
+    def test_audit_trail_pages_by_cursor(self):
+        """Entries are found by the indexed election_id and paged newest first"""
+        enqueue_audit_entries(
+            [
+                build_audit_entry(
+                    "vote_cast",
+                    "vote",
+                    i,
+                    user_id=self.voters[i % 3].id,
+                    details={"election_id": str(self.election.id)},
+                )
+                for i in range(5)
+            ]
+            + [build_audit_entry("vote_cast", "vote", "other", details={"election_id": "x"})]
+        )
+        flush_audit_log()
+        self.assertEqual(AuditLog.objects.filter(election_id=self.election.id).count(), 5)
+
+        client = APIClient()
+        client.force_authenticate(self.ec_member)
+        url = f"/api/elections/{self.election.id}/audit-trail/"
+        pages = []
+        cursor = ""
+        while cursor is not None:
+            # election, audit page with users joined
+            with self.assertNumQueries(2):
+                response = client.get(url, {"page_size": 2, "cursor": cursor})
+            pages.append([entry["resource_id"] for entry in response.data["audit_trail"]])
+            cursor = response.data["next_cursor"]
+        self.assertEqual(pages, [["4", "3"], ["2", "1"], ["0"]])
+
+        # Sizes below one are served one entry at a time
+        for page_size in (0, -3):
+            response = client.get(url, {"page_size": page_size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([entry["resource_id"] for entry in response.data["audit_trail"]], ["4"])
+            self.assertEqual(response.data["next_cursor"], response.data["audit_trail"][0]["sequence"])
+
+
+class VotingSessionTrackingTest(ElectionTestCase):
+    def request(self, ip="10.0.0.1", agent="browser"):
+        request = RequestFactory().post(
+            f"/api/elections/{self.election.id}/vote/", REMOTE_ADDR=ip, HTTP_USER_AGENT=agent
+        )
+        request.user = self.voters[0]
+        return request
+
+    def test_requests_are_tracked_without_queries(self):
+        """The middleware only touches the cache; the flush coalesces the flags"""
+        middleware = VotingSessionMiddleware(lambda request: None)
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                middleware.process_request(self.request())
+        self.assertEqual(flush_voting_sessions(), 1)
+        session = VotingSession.objects.get(user=self.voters[0], election=self.election)
+        self.assertEqual((session.ip_address, session.is_suspicious), ("10.0.0.1", False))
+
+        with self.assertNumQueries(0):
+            middleware.process_request(self.request(ip="10.0.0.2"))
+            middleware.process_request(self.request(ip="10.0.0.3", agent="script"))
+        # Users, elections, open sessions, one update for both reasons
+        with self.assertNumQueries(4):
+            self.assertEqual(flush_voting_sessions(), 1)
+        session.refresh_from_db()
+        self.assertTrue(session.is_suspicious)
+        self.assertEqual(session.suspicious_reason, f"{IP_CHANGED}; {USER_AGENT_CHANGED}")
+        self.assertEqual(VotingSession.objects.count(), 1)
+        # Nothing new to write
+        self.assertEqual(flush_voting_sessions(), 0)
+
+    def test_invalid_addresses_and_rejected_records_are_skipped(self):
+        middleware = VotingSessionMiddleware(lambda request: None)
+        request = self.request(ip="10.0.0.2")
+        request.META["HTTP_X_FORWARDED_FOR"] = "unknown, 10.0.0.9"
+        middleware.process_request(request)
+        for voter, agent in ((self.voters[1], "bad"), (self.voters[2], "browser")):
+            request = self.request(agent=agent)
+            request.user = voter
+            middleware.process_request(request)
+
+        def reject_bad_agent(records):
+            if any(record["user_agent"] == "bad" for _, record in records):
+                raise DataError("rejected")
+            return write_voting_sessions(records)
+
+        with mock.patch(
+            "elections.session_tracking.write_voting_sessions", side_effect=reject_bad_agent
+        ):
+            self.assertEqual(flush_voting_sessions(), 2)
+        self.assertEqual(
+            dict(VotingSession.objects.values_list("user_id", "ip_address")),
+            {self.voters[0].id: "10.0.0.2", self.voters[2].id: "10.0.0.1"},
+        )
+        # Dropped, not retried
+        self.assertEqual(flush_voting_sessions(), 0)
+
+        # A record cached without a valid address is dropped
+        cache.clear()
+        track_voting_request(self.voters[1].id, self.election.id, "unknown")
+        self.assertEqual(flush_voting_sessions(), 0)
+        self.assertFalse(VotingSession.objects.filter(user=self.voters[1]).exists())
+
+
+@override_settings(MNOTIFY_API_KEY="test-key", SMS_BULK_CHUNK_SIZE=2, SMS_MAX_CONCURRENCY=2)
+class BulkSMSTest(TestCase):
+    def test_shared_messages_are_grouped(self):
+        """One request per chunk of a shared message; personalised messages go alone"""
+        response = mock.Mock()
+        response.json.return_value = {"code": "2000", "summary": {"_id": "batch"}}
+        client = mock.Mock()
+        client.post.return_value = response
+        recipients = [{"phone": f"024123456{i}", "message": "Results are out"} for i in range(3)]
+        recipients += [
+            {"phone": "0201234567", "message": "Hello Amina"},
+            {"phone": "12", "message": "Results are out"},
+            {"phone": "", "message": "Results are out"},
+        ]
+        with mock.patch("utils.sms_service.get_gateway_client", return_value=client):
+            result = SMSService().send_bulk_sms(recipients)
+
+        self.assertEqual((result["total"], result["success"], result["failed"]), (6, 4, 2))
+        self.assertEqual([entry["phone"] for entry in result["results"]], [r["phone"] for r in recipients])
+        sent = sorted(
+            (call.kwargs["data"]["message"], tuple(call.kwargs["data"]["recipient[]"]))
+            for call in client.post.call_args_list
+        )
+        self.assertEqual(
+            sent,
+            [
+                ("Hello Amina", ("0201234567",)),
+                ("Results are out", ("0241234560", "0241234561")),
+                ("Results are out", ("0241234562",)),
+            ],
+        )
+
+
+class GatewayStubHandler(BaseHTTPRequestHandler):
+    """Answers 503 to the first request on each path, then 200"""
+
+    def respond(self):
+        self.server.hits.append((self.command, self.path))
+        seen = [path for _, path in self.server.hits].count(self.path)
+        self.send_response(503 if seen == 1 else 200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(GATEWAY_BACKOFF_FACTOR=0)
+class GatewayClientTest(TestCase):
+    def test_retries_idempotent_calls_over_one_connection(self):
+        """GETs are retried on 503; POSTs that reached the gateway are not"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), GatewayStubHandler)
+        server.hits = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+
+        client = GatewayClient("stub", f"http://127.0.0.1:{server.server_port}")
+        self.assertEqual(client.get("/verify").status_code, 200)
+        self.assertEqual(client.post("/initialize").status_code, 503)
+        self.assertEqual(
+            server.hits, [("GET", "/verify"), ("GET", "/verify"), ("POST", "/initialize")]
+        )
+        metrics = get_gateway_metrics()["stub"]
+        self.assertEqual((metrics["calls"], metrics["errors"]), (2, 1))
+
+
+class MnotifyStubHandler(BaseHTTPRequestHandler):
+    """Rate-limits the first request, then accepts every message after a short delay"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        with self.server.lock:
+            self.server.requests += 1
+            first = self.server.requests == 1
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(0.05)
+        with self.server.lock:
+            self.server.in_flight -= 1
+            if not first:
+                self.server.bodies.append(body)
+        payload = b'{"code": "2000", "summary": {"_id": "stub"}}'
+        self.send_response(429 if first else 200)
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class SMSDispatcherTest(TestCase):
+    def test_dispatches_concurrently_within_bounds(self):
+        """Requests overlap up to the concurrency limit and a 429 is retried"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), MnotifyStubHandler)
+        server.lock = threading.Lock()
+        server.requests = server.in_flight = server.max_in_flight = 0
+        server.bodies = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+
+        recipients = [{"phone": f"024123456{i}", "message": f"Hello voter {i}"} for i in range(8)]
+        with override_settings(
+            MNOTIFY_API_KEY="test-key", MNOTIFY_BASE_URL=f"http://127.0.0.1:{server.server_port}/api"
+        ):
+            result = dispatch_sms(recipients, concurrency=3, rate=0)
+
+        self.assertEqual((result["success"], result["failed"]), (8, 0))
+        self.assertEqual(server.requests, 9)
+        self.assertEqual(len(server.bodies), 8)
+        self.assertGreater(server.max_in_flight, 1)
+        self.assertLessEqual(server.max_in_flight, 3)
+
+
+@override_settings(NOTIFICATION_BATCH_SIZE=2)
+class VotingReminderJobTest(ElectionTestCase):
+    def test_reminders_fan_out_in_batches(self):
+        """Non-voters are found by token and messaged per batch; retries skip delivered recipients"""
+        extra = [
+            User.objects.create_user(
+                username=f"member{i}", student_id=f"ST100{i}", password="testpassword123"
+            )
+            for i in range(3)
+        ]
+        for i, user in enumerate(self.voters + extra):
+            user.phone_number = f"024123450{i}"
+            user.save(update_fields=["phone_number"])
+        Vote.create_secure_vote(self.voters[0], self.candidate_a)
+
+        client = APIClient()
+        client.force_authenticate(self.ec_member)
+        with mock.patch("utils.tasks.plan_notification_job_task.delay") as plan:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post("/api/accounts/admin/send-voting-reminders/")
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data["job_id"]
+        plan.assert_called_once_with(job_id)
+
+        batch_ids = plan_notification_job(job_id)
+        job = NotificationJob.objects.get(id=job_id)
+        # voter0 voted; the other five are split into batches of two
+        self.assertEqual((job.total_recipients, job.total_batches, len(batch_ids)), (5, 3, 3))
+        planned = [user_id for batch in job.batches.all() for user_id in batch.user_ids]
+        self.assertNotIn(str(self.voters[0].id), planned)
+
+        batch = NotificationBatch.objects.get(id=batch_ids[0])
+        _, second = batch.user_ids
+        phones = {str(user.id): user.phone_number for user in self.voters + extra}
+
+        def deliver(failing):
+            def dispatch(recipients):
+                results = [
+                    {"phone": r["phone"], "success": r["phone"] not in failing} for r in recipients
+                ]
+                ok = sum(entry["success"] for entry in results)
+                return {"success": ok, "failed": len(results) - ok, "results": results}
+
+            return mock.patch("utils.sms_dispatcher.dispatch_sms", side_effect=dispatch)
+
+        with deliver({phones[second]}) as dispatch:
+            self.assertEqual(send_notification_batch(batch.id)["failed"], 1)
+        with deliver(set()) as dispatch:
+            send_notification_batch(batch.id)
+            send_notification_batch(batch.id)
+        # The retry only went to the undelivered recipient, and a sent batch is not resent
+        self.assertEqual(
+            [r["phone"] for r in dispatch.call_args_list[0].args[0]], [phones[second]]
+        )
+        self.assertEqual(dispatch.call_count, 1)
+
+        response = client.get(f"/api/elections/notification-jobs/{job_id}/")
+        self.assertEqual(
+            (response.data["sent"], response.data["failed"], response.data["batches_done"]),
+            (2, 0, 1),
+        )
+
+    def test_reminders_are_planned_per_election_in_index_order(self):
+        """Each active election gets its own batches, numbered on from the previous one"""
+        for i, user in enumerate(self.voters):
+            user.phone_number = f"024123450{i}"
+            user.save(update_fields=["phone_number"])
+        Vote.create_secure_vote(self.voters[0], self.candidate_a)
+        now = timezone.now()
+        other = Election.objects.create(
+            title="Hall Election",
+            description="Second election",
+            start_date=now - timedelta(minutes=30),
+            end_date=now + timedelta(hours=2),
+            status="active",
+            created_by=self.ec_member,
+        )
+        Position.objects.create(election=other, title="Hall President", order=1)
+        job = NotificationJob.objects.create(kind="voting_reminder")
+
+        plan_notification_job(job.id)
+        batches = list(job.batches.order_by("index"))
+        self.assertEqual([batch.index for batch in batches], list(range(len(batches))))
+        per_election = {}
+        for batch in batches:
+            per_election.setdefault(batch.election_id, []).extend(batch.user_ids)
+        # voter0 voted in the first election only, so is reminded of the second
+        self.assertEqual(len(per_election[self.election.id]), len(per_election[other.id]) - 1)
+        self.assertIn(str(self.voters[0].id), per_election[other.id])
+
+
+@override_settings(NOTIFICATION_BATCH_SIZE=1)
+class ResultsPublishedJobTest(ElectionTestCase):
+    def test_publish_hands_voters_to_a_background_job(self):
+        """Publishing only starts a job; voters are streamed into batches planned once"""
+        for i, user in enumerate(self.voters):
+            user.phone_number = f"024123450{i}"
+            user.save(update_fields=["phone_number"])
+        Vote.create_secure_vote(self.voters[0], self.candidate_a)
+        Vote.create_secure_vote(self.voters[2], self.sole_candidate, approve=True)
+        self.election.status = "completed"
+        self.election.save()
+
+        client = APIClient()
+        client.force_authenticate(self.ec_member)
+        url = f"/api/elections/{self.election.id}/publish/"
+        with mock.patch("elections.crypto.VotingCrypto.bulk_decrypt_queryset") as decrypt:
+            with mock.patch("utils.tasks.plan_notification_job_task.delay") as plan:
+                with self.captureOnCommitCallbacks(execute=True):
+                    job_id = client.post(url).data["job_id"]
+                self.assertEqual(client.post(url).data["message"], "Results already published")
+            decrypt.assert_not_called()
+        plan.assert_called_once_with(job_id)
+
+        batch_ids = plan_notification_job(job_id)
+        # A redelivered planning task fans out the batches still pending
+        self.assertEqual(plan_notification_job(job_id), batch_ids)
+        batches = NotificationBatch.objects.filter(id__in=batch_ids)
+        self.assertEqual(
+            sorted(user_id for batch in batches for user_id in batch.user_ids),
+            sorted([str(self.voters[0].id), str(self.voters[2].id)]),
+        )
+        self.assertIsNotNone(load_materialized_tally(self.election.id))
+
+        with mock.patch(
+            "utils.sms_dispatcher.dispatch_sms",
+            return_value={"success": 1, "failed": 0, "results": [{"success": True}]},
+        ) as dispatch:
+            for batch_id in batch_ids:
+                send_notification_batch(batch_id)
+        self.assertIn(self.election.title, dispatch.call_args.args[0][0]["message"])
+        self.assertEqual(NotificationJob.objects.get(id=job_id).progress()["sent"], 2)
+        self.assertEqual(plan_notification_job(job_id), [])
+
+    def test_publish_restarts_a_job_whose_planning_failed(self):
+        self.election.status = "completed"
+        self.election.save()
+        client = APIClient()
+        client.force_authenticate(self.ec_member)
+        url = f"/api/elections/{self.election.id}/publish/"
+        with mock.patch("utils.tasks.plan_notification_job_task.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                job_id = client.post(url).data["job_id"]
+
+        with mock.patch(
+            "elections.notifications.PLANNERS", {RESULTS_PUBLISHED: mock.Mock(side_effect=RuntimeError("down"))}
+        ):
+            with mock.patch.object(plan_notification_job_task, "retry", side_effect=Retry()) as retry:
+                with self.assertRaises(Retry):
+                    plan_notification_job_task(job_id)
+            retry.assert_called_once()
+            self.assertEqual(NotificationJob.objects.get(id=job_id).status, "pending")
+
+            # Out of retries: the job is failed
+            with mock.patch.object(plan_notification_job_task, "max_retries", 0):
+                plan_notification_job_task(job_id)
+        self.assertEqual(NotificationJob.objects.get(id=job_id).status, "failed")
+
+        with mock.patch("utils.tasks.plan_notification_job_task.delay") as plan:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post(url)
+        self.assertEqual(response.data["job_id"], job_id)
+        plan.assert_called_once_with(job_id)
+        job = NotificationJob.objects.get(id=job_id)
+        self.assertEqual((job.status, job.error), ("pending", ""))
+        self.assertEqual(NotificationJob.objects.filter(election=self.election).count(), 1)
+
+    def test_batch_held_by_another_task_is_not_sent_twice(self):
+        self.voters[0].phone_number = "0241234500"
+        self.voters[0].save(update_fields=["phone_number"])
+        job = NotificationJob.objects.create(kind=RESULTS_PUBLISHED, election=self.election)
+        batch = NotificationBatch.objects.create(
+            job=job, election=self.election, index=0, user_ids=[str(self.voters[0].id)]
+        )
+        cache.add(f"notification_batch:{batch.id}:lock", 1)
+        with mock.patch("utils.sms_dispatcher.dispatch_sms") as dispatch:
+            with mock.patch.object(send_notification_batch_task, "retry", side_effect=Retry()):
+                with self.assertRaises(Retry):
+                    send_notification_batch_task(batch.id)
+        dispatch.assert_not_called()
+        self.assertEqual(NotificationBatch.objects.get(id=batch.id).status, "pending")
+
+        # A second fan-out's callback does not complete the job while the batch is sending
+        finish_notification_job(job.id)
+        self.assertEqual(NotificationJob.objects.get(id=job.id).status, "pending")
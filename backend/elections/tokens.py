@@ -0,0 +1,81 @@
+"""
+Anonymous voter token derivation
+Tokens are deterministic (voter, election, position, salt) hashes, so each
+voter's tokens for an election are derived once and kept in a bounded
+in-process LRU keyed by (user_id, election_id). The voter-to-token mapping
+only ever lives in this process's memory; it is never written to the
+database or a shared cache, which would defeat the anonymity of Vote rows.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+
+class VoterTokenCache:
+    """LRU of {position_id: token} per (user_id, election_id)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_tokens(self, user_id, election_id, position_ids: Iterable) -> Dict[str, str]:
+        from .crypto import get_voting_crypto
+
+        key = (str(user_id), str(election_id))
+        position_ids = [str(position_id) for position_id in position_ids]
+
+        with self._lock:
+            tokens = self._entries.get(key)
+            if tokens is not None:
+                self._entries.move_to_end(key)
+                if all(position_id in tokens for position_id in position_ids):
+                    return {position_id: tokens[position_id] for position_id in position_ids}
+
+        crypto = get_voting_crypto()
+        derived = {
+            position_id: crypto.anonymize_voter_data(key[0], key[1], position_id)
+            for position_id in position_ids
+        }
+
+        with self._lock:
+            tokens = self._entries.setdefault(key, {})
+            tokens.update(derived)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return derived
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+voter_tokens = VoterTokenCache(getattr(settings, "VOTER_TOKEN_CACHE_SIZE", 10000))
+
+
+def get_voter_tokens(user_id, election_id, position_ids: Iterable) -> Dict[str, str]:
+    """Anonymous tokens of a voter for the given positions of one election"""
+    return voter_tokens.get_tokens(user_id, election_id, position_ids)
+
+
+def get_voter_token(user_id, election_id, position_id) -> str:
+    return voter_tokens.get_tokens(user_id, election_id, [position_id])[str(position_id)]
+
+
+def _clear_tokens_on_setting_change(setting, **kwargs):
+    if setting == "VOTER_ANONYMIZATION_SALT":
+        voter_tokens.clear()
+    elif setting == "VOTER_TOKEN_CACHE_SIZE":
+        voter_tokens.maxsize = getattr(settings, "VOTER_TOKEN_CACHE_SIZE", 10000)
+        voter_tokens.clear()
+
+
+setting_changed.connect(_clear_tokens_on_setting_change)
@@ -6,6 +6,7 @@ urlpatterns = [
     path("", views.ElectionListCreateView.as_view(), name="election-list-create"),
     path("<uuid:pk>/", views.ElectionDetailView.as_view(), name="election-detail"),
     path("vote/", views.cast_vote, name="cast-vote"),
+    path("<uuid:election_id>/ballot/", views.election_ballot, name="election-ballot"),
     path(
         "<uuid:election_id>/results/", views.election_results, name="election-results"
     ),
@@ -62,10 +63,21 @@ urlpatterns = [
         views.verify_vote_integrity,
         name="verify-vote-integrity",
     ),
+    path(
+        "<uuid:election_id>/verify-votes/",
+        views.verify_election_votes,
+        name="verify-election-votes",
+    ),
+    path("<uuid:election_id>/turnout/", views.election_turnout, name="election-turnout"),
     path("<uuid:election_id>/audit-trail/", views.audit_trail, name="audit-trail"),
     path(
         "admin/suspicious-activity/",
         views.suspicious_activity,
         name="suspicious-activity",
     ),
+    path(
+        "notification-jobs/<uuid:job_id>/",
+        views.notification_job_status,
+        name="notification-job-status",
+    ),
 ]
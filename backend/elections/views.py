@@ -1,13 +1,20 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
 from rest_framework import generics, status, permissions
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from accounts.models import ExhibitionEntry
+from utils.network import get_client_ip
 from .models import (
     Election,
     Position,
@@ -17,6 +24,7 @@ from .models import (
     AuditLog,
     VotingSession,
     ElectionSecurity,
+    NotificationJob,
 )
 from .serializers import (
     ElectionSerializer,
@@ -26,11 +34,17 @@ from .serializers import (
     CastVoteSerializer,
     BulkCastVoteSerializer,
 )
+from .ballot import DuplicateVoteError, cast_ballot
+from .audit import log_audit_event
+from .ballot_definition import get_ballot_definition
+from .counters import get_election_counts
 from .crypto import check_security_configuration
+from .tally import get_election_tally
 from utils.helpers import absolute_media_url_builder
 from docs.elections import (
     list_create_elections_schema,
     retrieve_update_delete_election_schema,
+    election_ballot_schema,
     cast_vote_schema,
     election_results_schema,
     list_create_positions_schema,
@@ -44,22 +58,42 @@ from docs.elections import (
     send_reminder_schema,
     security_status_schema,
     verify_vote_integrity_schema,
+    verify_election_votes_schema,
     audit_trail_schema,
     suspicious_activity_schema,
+    notification_job_schema,
 )
 
 User = get_user_model()
 
 
+class TallyVisibilityMixin:
+    """Voter-facing ballot views omit vote counts until results are published;
+    EC members and staff always get them."""
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        user = self.request.user
+        context["include_tallies"] = bool(
+            getattr(user, "is_ec_member", False) or getattr(user, "is_staff", False)
+        )
+        return context
+
+
+def candidates_prefetch(lookup="candidates"):
+    return Prefetch(lookup, queryset=Candidate.objects.select_related("user"))
+
+
 @list_create_elections_schema
 class ElectionListCreateView(generics.ListCreateAPIView):
     serializer_class = ElectionListSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
+        queryset = Election.objects.select_related("created_by")
         if self.request.user.is_ec_member or self.request.user.is_staff:
-            return Election.objects.all()
-        return Election.objects.filter(status__in=["upcoming", "active", "completed"]) 
+            return queryset
+        return queryset.filter(status__in=["upcoming", "active", "completed"])
     def perform_create(self, serializer):
         if not (self.request.user.is_ec_member or self.request.user.is_staff):
             raise PermissionDenied("Only EC members can create elections")
@@ -68,8 +102,10 @@ class ElectionListCreateView(generics.ListCreateAPIView):
 
 
 @retrieve_update_delete_election_schema
-class ElectionDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Election.objects.all()
+class ElectionDetailView(TallyVisibilityMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Election.objects.select_related("created_by").prefetch_related(
+        "positions", candidates_prefetch("positions__candidates")
+    )
     serializer_class = ElectionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -90,6 +126,17 @@ class ElectionDetailView(generics.RetrieveUpdateDestroyAPIView):
         serializer.save(created_by=self.request.user)
 
 
+@election_ballot_schema
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def election_ballot(request, election_id):
+    """Ballot definition (positions and candidates) from the ballot cache"""
+    definition = get_ballot_definition(election_id)
+    if definition is None:
+        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(definition.as_dict(request))
+
+
 @cast_vote_schema
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
@@ -108,62 +155,18 @@ def cast_vote(request):
         election = bulk_ser.validated_data["election"]
         items = bulk_ser.validated_data["validated_items"]
 
-        # Enforce one vote per position per voter (anonymized check), and do all atomically
-        created_votes = []
-        with transaction.atomic():
-            for item in items:
-                position = item["position"]
-                candidate = item["candidate"]
-                approve = item.get("approve", True)
-
-                # Duplicate check per position
-                if Vote.has_voter_voted_for_position(request.user, position):
-                    raise transaction.TransactionManagementError(
-                        f"Already voted for position {position.title}"
-                    )
-
-                v = Vote.create_secure_vote(
-                    voter=request.user,
-                    candidate=candidate,
-                    ip_address=request.META.get("REMOTE_ADDR"),
-                    approve=approve,
-                )
-                created_votes.append((v, position, candidate, approve))
-
-            # Audit logs and session update once per election
-            for v, position, candidate, approve in created_votes:
-                AuditLog.objects.create(
-                    action="vote_cast",
-                    user=request.user,
-                    resource_type="vote",
-                    resource_id=str(v.id),
-                    ip_address=request.META.get("REMOTE_ADDR"),
-                    user_agent=request.META.get("HTTP_USER_AGENT", ""),
-                    details={
-                        "election_id": str(position.election.id),
-                        "position_id": str(position.id),
-                        "candidate_id": str(candidate.id),
-                        "approve": bool(approve),
-                        "encrypted": bool(v.encrypted_vote_data),
-                        "verified": v.integrity_verified,
-                    },
-                )
-
-            # Update or create session for this election
-            try:
-                session = VotingSession.objects.get(
-                    user=request.user, election=election, session_end__isnull=True
-                )
-                session.votes_cast += len(created_votes)
-                session.save()
-            except VotingSession.DoesNotExist:
-                VotingSession.objects.create(
-                    user=request.user,
-                    election=election,
-                    ip_address=request.META.get("HTTP_X_REAL_IP", request.META.get("HTTP_X_FORWARDED_FOR")),
-                    user_agent=request.META.get("HTTP_USER_AGENT", ""),
-                    votes_cast=len(created_votes),
-                )
+        # One duplicate check and one insert per table for the whole ballot
+        try:
+            created_votes = cast_ballot(
+                request.user,
+                election,
+                items,
+                ip_address=request.META.get("REMOTE_ADDR"),
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
+                session_ip_address=get_client_ip(request),
+            )
+        except DuplicateVoteError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             {
@@ -181,50 +184,20 @@ def cast_vote(request):
     position = serializer.validated_data["position"]
     candidate = serializer.validated_data["candidate"]
 
-    if Vote.has_voter_voted_for_position(request.user, position):
+    try:
+        vote = cast_ballot(
+            request.user,
+            position.election,
+            [{"position": position, "candidate": candidate, "approve": True}],
+            ip_address=request.META.get("REMOTE_ADDR"),
+            user_agent=request.META.get("HTTP_USER_AGENT", ""),
+        )[0]
+    except DuplicateVoteError:
         return Response(
             {"error": "You have already voted for this position"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    with transaction.atomic():
-        vote = Vote.create_secure_vote(
-            voter=request.user,
-            candidate=candidate,
-            ip_address=request.META.get("REMOTE_ADDR"),
-        )
-
-        AuditLog.objects.create(
-            action="vote_cast",
-            user=request.user,
-            resource_type="vote",
-            resource_id=str(vote.id),
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            details={
-                "election_id": str(position.election.id),
-                "position_id": str(position.id),
-                "candidate_id": str(candidate.id),
-                "encrypted": bool(vote.encrypted_vote_data),
-                "verified": vote.integrity_verified,
-            },
-        )
-
-        try:
-            session = VotingSession.objects.get(
-                user=request.user, election=position.election, session_end__isnull=True
-            )
-            session.votes_cast += 1
-            session.save()
-        except VotingSession.DoesNotExist:
-            VotingSession.objects.create(
-                user=request.user,
-                election=position.election,
-                ip_address=request.META.get("REMOTE_ADDR"),
-                user_agent=request.META.get("HTTP_USER_AGENT", ""),
-                votes_cast=1,
-            )
-
     return Response(
         {
             "message": "Vote cast successfully",
@@ -258,38 +231,28 @@ def election_results(request, election_id):
             {"error": "Results are not yet available"}, status=status.HTTP_403_FORBIDDEN
         )
 
+    # Stored tally for final elections, otherwise decrypt every vote exactly once
+    tally = get_election_tally(election.id)
+
+    positions = election.positions.prefetch_related(
+        Prefetch("candidates", queryset=Candidate.objects.select_related("user"))
+    )
     positions_with_results = []
-    for position in election.positions.all():
+    for position in positions:
+        candidates = list(position.candidates.all())
         candidates_with_votes = []
-        for candidate in position.candidates.all():
+        for candidate in candidates:
             candidates_with_votes.append(
                 {
                     "id": candidate.id,
                     "name": candidate.user.display_name,
                     "student_id": candidate.user.student_id,
-                    "vote_count": candidate.vote_count,
-                    "vote_percentage": candidate.vote_percentage,
+                    "vote_count": tally.vote_count(candidate.id),
+                    "vote_percentage": tally.vote_percentage(candidate.id, position.id),
                     "profile_picture_url": absolute_media_url_builder(request, candidate.profile_picture.url) if getattr(candidate, "profile_picture", None) else None,
                 }
             )
 
-        # If single-candidate position, compute yes/no breakdown
-        yes_count = 0
-        no_count = 0
-        if position.candidates.count() == 1:
-            # Iterate all votes for this position and inspect approve flag
-            from .crypto import VotingCrypto
-            crypto = VotingCrypto()
-            for v in Vote.objects.filter(position_id=position.id):
-                try:
-                    data = crypto.decrypt_vote_data(v.encrypted_vote_data)
-                    if data.get("approve") is False:
-                        no_count += 1
-                    else:
-                        yes_count += 1
-                except Exception:
-                    continue
-
         # Sort by vote count descending
         candidates_with_votes.sort(key=lambda x: x["vote_count"], reverse=True)
 
@@ -297,16 +260,17 @@ def election_results(request, election_id):
             {
                 "id": position.id,
                 "title": position.title,
-                "total_votes": position.total_votes,
+                "total_votes": tally.position_total(position.id),
                 "candidates": candidates_with_votes,
-                **({"yes_count": yes_count, "no_count": no_count} if position.candidates.count() == 1 else {}),
+                # If single-candidate position, include yes/no breakdown
+                **(tally.approval_breakdown(position.id) if len(candidates) == 1 else {}),
             }
         )
 
     # Compute eligibility and turnout
     total_eligible_voters = User.objects.filter(is_active=True, is_staff=False).count()
-    total_votes_cast = election.total_votes
-    total_unique_voters = election.total_voters
+    total_votes_cast = tally.total_votes
+    total_unique_voters = tally.total_voters
     voter_turnout = round((total_unique_voters / total_eligible_voters * 100), 2) if total_eligible_voters else 0
 
     # Persist summary for admins
@@ -352,27 +316,31 @@ def publish_election_results(request, election_id):
     if not (request.user.is_ec_member or request.user.is_staff):
         return Response({"error": "Only EC members can publish results"}, status=status.HTTP_403_FORBIDDEN)
 
-    election = get_object_or_404(Election, id=election_id)
-    if election.status != "completed":
-        return Response({"error": "Election must be completed before publishing"}, status=status.HTTP_400_BAD_REQUEST)
-    if getattr(election, "results_published", False):
-        return Response({"message": "Results already published"})
-
-    election.results_published = True
-    election.results_published_at = timezone.now()
-    election.save(update_fields=["results_published", "results_published_at"])
-
-    # Notify ONLY voters via SMS (best effort)
-    try:
-        from utils.tasks import send_bulk_results_published_sms_task
-        from .models import Vote
-        voter_ids = Vote.get_unique_voter_ids(election)
-        if voter_ids:
-            send_bulk_results_published_sms_task.delay(str(election.id), voter_ids)
-    except Exception:
-        pass
+    from .notifications import RESULTS_PUBLISHED, start_results_published
 
-    return Response({"message": "Results published"})
+    with transaction.atomic():
+        # Locked so concurrent requests cannot both publish and notify
+        election = get_object_or_404(Election.objects.select_for_update(), id=election_id)
+        if election.status != "completed":
+            return Response({"error": "Election must be completed before publishing"}, status=status.HTTP_400_BAD_REQUEST)
+        if getattr(election, "results_published", False):
+            # A results job whose planning failed is restarted
+            job = NotificationJob.objects.filter(
+                kind=RESULTS_PUBLISHED, election=election, status="failed"
+            ).first()
+            if job is None:
+                return Response({"message": "Results already published"})
+            start_results_published(election, requested_by=request.user)
+            return Response({"message": "Results notification restarted", "job_id": str(job.id)})
+
+        election.results_published = True
+        election.results_published_at = timezone.now()
+        election.save(update_fields=["results_published", "results_published_at"])
+
+        # Tally freezing and SMS to voters run in a background job
+        job = start_results_published(election, requested_by=request.user)
+
+    return Response({"message": "Results published", "job_id": str(job.id)})
 
 
 @api_view(["POST"])
@@ -398,13 +366,18 @@ def archive_election(request, election_id):
 
 # Position Views
 @list_create_positions_schema
-class PositionListCreateView(generics.ListCreateAPIView):
+class PositionListCreateView(TallyVisibilityMixin, generics.ListCreateAPIView):
     serializer_class = PositionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         election_id = self.kwargs.get("election_id")
-        return Position.objects.filter(election_id=election_id).order_by("order")
+        return (
+            Position.objects.filter(election_id=election_id)
+            .select_related("election")
+            .prefetch_related(candidates_prefetch())
+            .order_by("order")
+        )
     def perform_create(self, serializer):
         if not (self.request.user.is_ec_member or self.request.user.is_staff):
             raise PermissionDenied("Only EC members can create positions")
@@ -423,8 +396,10 @@ class PositionListCreateView(generics.ListCreateAPIView):
 
 
 @retrieve_update_delete_position_schema
-class PositionDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Position.objects.all()
+class PositionDetailView(TallyVisibilityMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Position.objects.select_related("election").prefetch_related(
+        candidates_prefetch()
+    )
     serializer_class = PositionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -471,15 +446,17 @@ class PositionDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # Candidate Views
 @list_create_candidates_schema
-class CandidateListCreateView(generics.ListCreateAPIView):
+class CandidateListCreateView(TallyVisibilityMixin, generics.ListCreateAPIView):
     serializer_class = CandidateSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
 
     def get_queryset(self):
         position_id = self.kwargs.get("position_id")
-        return Candidate.objects.filter(position_id=position_id).order_by(
-            "user__student_id"
+        return (
+            Candidate.objects.filter(position_id=position_id)
+            .select_related("user", "position__election")
+            .order_by("user__student_id")
         )
     def perform_create(self, serializer):
         if not (self.request.user.is_ec_member or self.request.user.is_staff):
@@ -534,8 +511,8 @@ class CandidateListCreateView(generics.ListCreateAPIView):
 
 
 @retrieve_update_delete_candidate_schema
-class CandidateDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Candidate.objects.all()
+class CandidateDetailView(TallyVisibilityMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Candidate.objects.select_related("user", "position__election")
     serializer_class = CandidateSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -922,21 +899,14 @@ def security_status(request, election_id):
     config_checks = check_security_configuration()
 
     # Get voting statistics
-    total_votes = Vote.objects.filter(election_id=election.id).count()
-    secure_votes = (
-        Vote.objects.filter(election_id=election.id)
-        .exclude(encrypted_vote_data="")
-        .count()
-    )
-    verified_votes = Vote.objects.filter(
-        election_id=election.id,
-        integrity_verified=True,
-        signature_verified=True,
-    ).count()
+    vote_counts = get_election_counts(election.id)
+    total_votes = vote_counts["total"]
+    secure_votes = vote_counts["encrypted"]
+    verified_votes = vote_counts["verified"]
 
     # Get audit logs
     recent_audits = AuditLog.objects.filter(
-        resource_type="vote", details__election_id=str(election.id)
+        election_id=election.id, resource_type="vote"
     ).count()
 
     return Response(
@@ -970,6 +940,133 @@ def security_status(request, election_id):
     )
 
 
+def _authenticate_plain_request(request):
+    """
+    Run the DRF authenticators for a plain Django view. Browsers' EventSource
+    cannot send headers, so the HttpOnly refresh token cookie set at login is
+    accepted as well; tokens are never read from the query string, where they
+    would end up in access logs and browser history.
+    """
+    from django.contrib.auth.models import AnonymousUser
+    from rest_framework import exceptions
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        user = drf_request.user
+    except exceptions.APIException:
+        user = AnonymousUser()
+    if user.is_authenticated:
+        return user
+    return _user_from_refresh_cookie(request) or AnonymousUser()
+
+
+def _user_from_refresh_cookie(request):
+    """The active user of a valid, non-blacklisted refresh token cookie, or None"""
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    raw_token = request.COOKIES.get(getattr(settings, "JWT_REFRESH_COOKIE_NAME", "refresh_token"))
+    if not raw_token:
+        return None
+    try:
+        token = RefreshToken(raw_token)
+    except TokenError:
+        return None
+    return User.objects.filter(
+        **{jwt_settings.USER_ID_FIELD: token.get(jwt_settings.USER_ID_CLAIM)}, is_active=True
+    ).first()
+
+
+async def election_turnout(request, election_id):
+    """
+    Live turnout for EC dashboards, fed by the vote counters.
+
+    Streams server-sent "turnout" events when served over ASGI. With ?since=<sequence>
+    it long-polls instead: the next snapshot newer than `since` is returned, or the
+    current one after LIVE_TURNOUT_POLL_TIMEOUT seconds. Under WSGI, where waiting
+    would hold a worker, the current snapshot is returned straight away.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import JsonResponse, StreamingHttpResponse
+
+    from .live import current_turnout_snapshot, get_turnout_producer
+
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+
+    user = await sync_to_async(_authenticate_plain_request)(request)
+    if not user.is_authenticated:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+    if not (user.is_ec_member or user.is_staff):
+        return JsonResponse({"error": "Only EC members can view live turnout"}, status=403)
+    if await sync_to_async(get_ballot_definition)(election_id) is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    try:
+        since = int(request.GET.get("since", -1))
+    except ValueError:
+        return JsonResponse({"error": "since must be an integer"}, status=400)
+
+    if not isinstance(request, ASGIRequest):
+        # Each WSGI request runs its own short-lived event loop, so no producer
+        # could outlive it; dashboards poll with the sequence they last saw
+        snapshot = await sync_to_async(current_turnout_snapshot)(election_id)
+        return JsonResponse(snapshot or {"sequence": 0})
+
+    producer = get_turnout_producer(election_id)
+
+    if "since" in request.GET:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + getattr(settings, "LIVE_TURNOUT_POLL_TIMEOUT", 25)
+        queue = producer.subscribe()
+        try:
+            snapshot = producer.snapshot
+            while snapshot is None or snapshot["sequence"] <= since:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+        finally:
+            producer.unsubscribe(queue)
+        return JsonResponse(producer.snapshot or {"sequence": 0})
+
+    async def events():
+        queue = producer.subscribe()
+        heartbeat = getattr(settings, "LIVE_TURNOUT_HEARTBEAT", 15)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield (
+                    f"id: {snapshot['sequence']}\n"
+                    f"event: turnout\n"
+                    f"data: {json.dumps(snapshot)}\n\n"
+                )
+        finally:
+            producer.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @verify_vote_integrity_schema
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
@@ -993,12 +1090,12 @@ def verify_vote_integrity(request, vote_id):
     # Perform integrity verification
     is_valid = vote.verify_integrity()
 
-    # Create audit log for verification
-    AuditLog.objects.create(
-        action="vote_verified",
-        user=request.user,
-        resource_type="vote",
-        resource_id=str(vote.id),
+    # Queue an audit entry for the verification
+    log_audit_event(
+        "vote_verified",
+        "vote",
+        vote.id,
+        user_id=request.user.id,
         ip_address=request.META.get("REMOTE_ADDR"),
         user_agent=request.META.get("HTTP_USER_AGENT", ""),
         details={
@@ -1021,6 +1118,37 @@ def verify_vote_integrity(request, vote_id):
     )
 
 
+@verify_election_votes_schema
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+def verify_election_votes(request, election_id):
+    """
+    Queue integrity and signature verification for every vote of an election
+    """
+
+    # Only EC members and staff can verify votes
+    if not (request.user.is_ec_member or request.user.is_staff):
+        return Response(
+            {"error": "Only EC members can verify vote integrity"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    election = get_object_or_404(Election, id=election_id)
+
+    from utils.tasks import verify_election_votes_task
+
+    task = verify_election_votes_task.delay(str(election.id), str(request.user.id))
+
+    return Response(
+        {
+            "message": "Vote verification started",
+            "election_id": str(election.id),
+            "task_id": task.id,
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
 @audit_trail_schema
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
@@ -1038,12 +1166,27 @@ def audit_trail(request, election_id):
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    # Get audit logs for this election
-    audit_logs = AuditLog.objects.filter(
-        details__election_id=str(election.id)
-    ).order_by("-timestamp")[
-        :100
-    ]  # Latest 100 entries
+    try:
+        page_size = max(1, min(int(request.GET.get("page_size", 100)), 500))
+        cursor = request.GET.get("cursor")
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return Response(
+            {"error": "page_size and cursor must be integers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Newest first; the cursor is the sequence of the last entry already seen
+    audit_logs = (
+        AuditLog.objects.filter(election_id=election.id)
+        .select_related("user")
+        .order_by("-sequence")
+    )
+    if cursor is not None:
+        audit_logs = audit_logs.filter(sequence__lt=cursor)
+    audit_logs = list(audit_logs[: page_size + 1])
+    has_more = len(audit_logs) > page_size
+    audit_logs = audit_logs[:page_size]
 
     # Format audit data
     audit_data = []
@@ -1051,6 +1194,7 @@ def audit_trail(request, election_id):
         audit_data.append(
             {
                 "id": str(log.id),
+                "sequence": log.sequence,
                 "timestamp": log.timestamp,
                 "action": log.action,
                 "user": log.user.display_name if log.user else "System",
@@ -1067,7 +1211,8 @@ def audit_trail(request, election_id):
             "election_id": str(election.id),
             "election_title": election.title,
             "audit_trail": audit_data,
-            "total_entries": audit_logs.count(),
+            "total_entries": len(audit_data),
+            "next_cursor": audit_logs[-1].sequence if has_more else None,
             "generated_at": timezone.now(),
             "generated_by": request.user.display_name,
         }
@@ -1120,3 +1265,21 @@ def suspicious_activity(request):
             "generated_by": request.user.display_name,
         }
     )
+
+
+@notification_job_schema
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def notification_job_status(request, job_id):
+    """
+    Get the progress of a bulk notification job
+    """
+
+    if not (request.user.is_ec_member or request.user.is_staff):
+        return Response(
+            {"error": "Only EC members can view notification jobs"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    job = get_object_or_404(NotificationJob, id=job_id)
+    return Response(job.progress())
@@ -0,0 +1,93 @@
+"""
+Cached voted-state per user
+Serves the {election_id: has_voted} map shown on profiles from the shared
+Django cache (Redis in production) so every worker process sees the same
+state. Flags are written through when a ballot commits; the list of active
+elections is dropped whenever an election or position changes.
+"""
+
+import logging
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_ELECTIONS_KEY = "voter_state:active_elections"
+
+
+def _timeout() -> int:
+    return getattr(settings, "VOTER_STATE_CACHE_TIMEOUT", 60 * 60 * 6)
+
+
+def _flag_key(user_id, election_id) -> str:
+    return f"voter_state:{user_id}:{election_id}"
+
+
+def get_active_election_ids() -> List[str]:
+    """Ids of active elections that have positions, as used by the vote map"""
+    from .models import Position
+
+    election_ids = cache.get(ACTIVE_ELECTIONS_KEY)
+    if election_ids is None:
+        election_ids = sorted(
+            str(election_id)
+            for election_id in Position.objects.filter(election__status="active")
+            .values_list("election_id", flat=True)
+            .distinct()
+        )
+        cache.set(ACTIVE_ELECTIONS_KEY, election_ids, _timeout())
+    return election_ids
+
+
+def get_user_vote_map(user) -> Dict[str, bool]:
+    """Cached equivalent of Vote.get_user_active_election_vote_map"""
+    from .models import Vote
+
+    try:
+        election_ids = get_active_election_ids()
+        if not election_ids:
+            return {}
+
+        keys = {_flag_key(user.id, election_id): election_id for election_id in election_ids}
+        cached = cache.get_many(list(keys))
+        vote_map = {keys[key]: voted for key, voted in cached.items()}
+
+        missing = [election_id for election_id in election_ids if election_id not in vote_map]
+        if missing:
+            computed = Vote.get_user_election_vote_map(user, missing)
+            for election_id in missing:
+                voted = computed.get(election_id, False)
+                vote_map[election_id] = voted
+                # add() never overwrites a flag written through by a ballot
+                # that committed while this lookup was running
+                cache.add(_flag_key(user.id, election_id), voted, _timeout())
+        return vote_map
+    except Exception as e:
+        logger.error(f"Voter state cache unavailable: {str(e)}")
+        return Vote.get_user_active_election_vote_map(user)
+
+
+def mark_user_voted(user_id, election_id):
+    """Write-through after a ballot commits"""
+    try:
+        cache.set(_flag_key(user_id, election_id), True, _timeout())
+    except Exception as e:
+        logger.error(f"Failed to record voted state for election {election_id}: {str(e)}")
+
+
+def mark_user_voted_on_commit(user_id, election_id):
+    transaction.on_commit(lambda: mark_user_voted(user_id, election_id))
+
+
+def invalidate_active_elections():
+    try:
+        cache.delete(ACTIVE_ELECTIONS_KEY)
+    except Exception as e:
+        logger.error(f"Failed to invalidate active elections cache: {str(e)}")
+
+
+def invalidate_active_elections_on_commit():
+    transaction.on_commit(invalidate_active_elections)
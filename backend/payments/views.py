@@ -12,6 +12,7 @@ from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from .models import Payment, DuesPayment, Donation, PaymentCallback
+from utils.http_client import get_gateway_client
 from utils.sms_service import SMSService
 from .serializers import (
     PaymentSerializer,
@@ -22,6 +23,13 @@ from .serializers import (
 from accounts.models import AcademicYear
 
 
+PAYSTACK_BASE_URL = "https://api.paystack.co"
+
+
+def get_paystack_client():
+    return get_gateway_client("paystack", PAYSTACK_BASE_URL)
+
+
 class InitiatePaymentView(APIView):
     permission_classes = [permissions.AllowAny]  # Allow anonymous donations
 
@@ -123,8 +131,8 @@ class InitiatePaymentView(APIView):
         }
 
         try:
-            response = requests.post(
-                "https://api.paystack.co/transaction/initialize",
+            response = get_paystack_client().post(
+                "/transaction/initialize",
                 headers=headers,
                 data=json.dumps(paystack_data),
             )
@@ -270,8 +278,8 @@ def verify_payment(request, reference):
     }
 
     try:
-        response = requests.get(
-            f"https://api.paystack.co/transaction/verify/{reference}", headers=headers
+        response = get_paystack_client().get(
+            f"/transaction/verify/{reference}", headers=headers
         )
         response.raise_for_status()
         result = response.json()
@@ -0,0 +1,34 @@
+"""
+Helpers for talking to the cache backend directly
+"""
+
+from typing import Dict
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+
+# Lua scripts by source, registered once per process
+_scripts: Dict[str, object] = {}
+
+
+def get_redis_client(alias: str = "default"):
+    """
+    Raw redis-py client behind a Django cache alias, or None when the alias is
+    not a Redis cache (e.g. the LocMem cache used in development and tests).
+    Keys passed to it must go through caches[alias].make_key().
+    """
+    backend = caches[alias]
+    if not isinstance(backend, RedisCache):
+        return None
+    return backend._cache.get_client(write=True)
+
+
+def run_script(client, source: str, keys, args):
+    """
+    Run a Lua script on a client from get_redis_client(). The script's SHA is
+    computed once per process, so each call is a single EVALSHA.
+    """
+    script = _scripts.get(source)
+    if script is None:
+        script = _scripts[source] = client.register_script(source)
+    return script(keys=keys, args=args, client=client)
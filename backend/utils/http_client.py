@@ -0,0 +1,140 @@
+"""
+HTTP client for external gateways (mnotify, Paystack)
+Each host gets one requests.Session with a keep-alive connection pool, so
+repeated calls skip the DNS lookup and TLS handshake. Every call has a
+(connect, read) timeout. Connection failures, and idempotent requests that
+fail with a retryable status, are retried with exponential backoff; a POST
+that reached the gateway is never resent. Each call's latency is logged and
+aggregated per gateway (see get_gateway_metrics).
+"""
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class GatewayStats:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+_sessions: Dict[Tuple[str, str], requests.Session] = {}
+_clients: Dict[str, "GatewayClient"] = {}
+_stats: Dict[str, GatewayStats] = {}
+_lock = threading.Lock()
+
+
+def _timeout() -> Tuple[float, float]:
+    return tuple(getattr(settings, "GATEWAY_TIMEOUT", (5, 30)))
+
+
+def _build_session(pool_size: int) -> requests.Session:
+    retry = Retry(
+        total=getattr(settings, "GATEWAY_MAX_RETRIES", 3),
+        backoff_factor=getattr(settings, "GATEWAY_BACKOFF_FACTOR", 0.5),
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str, pool_size: Optional[int] = None) -> requests.Session:
+    """The shared session for url's host"""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = _build_session(
+                pool_size or getattr(settings, "GATEWAY_POOL_SIZE", 10)
+            )
+        return session
+
+
+def record_gateway_call(name: str, seconds: float, failed: bool):
+    """Add one call to a gateway's latency metrics"""
+    with _lock:
+        stats = _stats.setdefault(name, GatewayStats())
+        stats.calls += 1
+        stats.errors += failed
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+
+
+def get_gateway_metrics() -> Dict[str, Dict]:
+    """Calls, errors and latency per gateway since the process started"""
+    with _lock:
+        return {
+            name: {**asdict(stats), "mean_seconds": stats.mean_seconds}
+            for name, stats in _stats.items()
+        }
+
+
+class GatewayClient:
+    """Calls one gateway's API over its host's pooled session"""
+
+    def __init__(self, name: str, base_url: str, pool_size: Optional[int] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.session = get_session(self.base_url, pool_size)
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request to base_url + path. Raises requests' exceptions like
+        requests.request; a timeout is applied unless one is given.
+        """
+        kwargs.setdefault("timeout", _timeout())
+        started = time.monotonic()
+        status_code = None
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            seconds = time.monotonic() - started
+            failed = status_code is None or status_code >= 400
+            record_gateway_call(self.name, seconds, failed)
+            # Only the path is logged; query strings may carry API keys
+            logger.info(
+                f"{self.name} {method.upper()} {path} -> {status_code or 'error'} in {seconds * 1000:.0f}ms"
+            )
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+
+def get_gateway_client(name: str, base_url: str, pool_size: Optional[int] = None) -> GatewayClient:
+    """The process-wide client for a gateway"""
+    with _lock:
+        client = _clients.get(name)
+    if client is None or client.base_url != base_url.rstrip("/"):
+        client = GatewayClient(name, base_url, pool_size)
+        with _lock:
+            _clients[name] = client
+    return client
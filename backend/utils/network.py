@@ -0,0 +1,39 @@
+"""
+Client address helpers
+X-Forwarded-For is set by the client as much as by our proxies, so only the
+entries appended by the TRUSTED_PROXY_COUNT proxies in front of the app are
+believed: the client is the address the outermost trusted proxy saw. With no
+trusted proxies (or a header shorter than expected) REMOTE_ADDR is used.
+"""
+
+import ipaddress
+from typing import Optional
+
+from django.conf import settings
+
+
+def clean_ip_address(value) -> Optional[str]:
+    """value if it is an IP address, else None"""
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
+
+
+def client_ip_address(forwarded_for, remote_addr) -> Optional[str]:
+    """The client address from an X-Forwarded-For value and REMOTE_ADDR; None if it is not valid"""
+    hops = getattr(settings, "TRUSTED_PROXY_COUNT", 0)
+    if hops > 0 and forwarded_for:
+        entries = [entry.strip() for entry in forwarded_for.split(",")]
+        if len(entries) >= hops:
+            ip_address = clean_ip_address(entries[-hops])
+            if ip_address:
+                return ip_address
+    return clean_ip_address(remote_addr) if remote_addr else None
+
+
+def get_client_ip(request) -> Optional[str]:
+    """The address of the client that sent request"""
+    return client_ip_address(
+        request.META.get("HTTP_X_FORWARDED_FOR"), request.META.get("REMOTE_ADDR")
+    )
@@ -0,0 +1,136 @@
+"""
+Asynchronous SMS dispatcher
+Sends a batch of SMS concurrently from one event loop over a single
+httpx.AsyncClient, so a worker process keeps many mnotify requests in
+flight instead of blocking on one at a time. Recipients are grouped like
+SMSService.send_bulk_sms. At most SMS_DISPATCH_CONCURRENCY requests are in
+flight, requests start no faster than SMS_DISPATCH_RATE per second, and a
+429 from the provider pauses every sender for its Retry-After before the
+request is retried.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from django.conf import settings
+
+from utils.http_client import record_gateway_call
+from utils.sms_service import SMSService, batch_label
+
+logger = logging.getLogger(__name__)
+
+# Times a request is retried after the provider rate-limits it
+RATE_LIMIT_RETRIES = 3
+# Pause after a 429 without a usable Retry-After header (seconds)
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class RequestPacer:
+    """Spaces request starts to a rate and holds them all while the provider asks us to back off"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0.0
+        self._next_start = 0.0
+        self._paused_until = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        start = max(now, self._next_start, self._paused_until)
+        # Claim the slot before sleeping; the event loop runs one coroutine at a time
+        self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return max(float(response.headers.get("Retry-After", "")), 0.0)
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
+
+
+class AsyncSMSDispatcher:
+    def __init__(
+        self,
+        service: Optional[SMSService] = None,
+        concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+    ):
+        self.service = service or SMSService()
+        self.concurrency = concurrency or getattr(settings, "SMS_DISPATCH_CONCURRENCY", 50)
+        self.pacer = RequestPacer(rate if rate is not None else getattr(settings, "SMS_DISPATCH_RATE", 200))
+
+    def _client(self) -> httpx.AsyncClient:
+        connect, read = getattr(settings, "GATEWAY_TIMEOUT", (5, 30))
+        return httpx.AsyncClient(
+            base_url=self.service.base_url,
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(
+                max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+            ),
+        )
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        batch: Tuple[str, List[Tuple[int, str, str]]],
+    ) -> Dict:
+        message, members = batch
+        label = batch_label(members)
+        payload = self.service.build_payload([cleaned for _, _, cleaned in members], message)
+
+        async with semaphore:
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                await self.pacer.wait()
+                started = time.monotonic()
+                status_code = None
+                try:
+                    response = await client.post(
+                        "/sms/quick", params={"key": self.service.api_key}, data=payload
+                    )
+                    status_code = response.status_code
+                except httpx.HTTPError as e:
+                    logger.error(f"SMS service error for {label}: {str(e)}")
+                    return {"success": False, "error": f"Network error: {str(e)}"}
+                finally:
+                    record_gateway_call(
+                        "mnotify", time.monotonic() - started, status_code is None or status_code >= 400
+                    )
+
+                if status_code == 429 and attempt < RATE_LIMIT_RETRIES:
+                    delay = _retry_after(response)
+                    logger.warning(f"SMS provider rate limited {label}; pausing {delay}s")
+                    self.pacer.pause(delay)
+                    continue
+
+                try:
+                    response.raise_for_status()
+                    return self.service.parse_response(label, response.json())
+                except httpx.HTTPStatusError as e:
+                    logger.error(f"SMS service error for {label}: {str(e)}")
+                    return {"success": False, "error": f"Network error: {str(e)}"}
+                except ValueError as e:
+                    logger.error(f"Unexpected error sending SMS to {label}: {str(e)}")
+                    return {"success": False, "error": f"Unexpected error: {str(e)}"}
+
+    async def dispatch(self, recipients: List[Dict[str, str]]) -> Dict:
+        """Send to recipients ({'phone', 'message'} dicts); same summary as send_bulk_sms"""
+        entries, batches = self.service.plan_bulk_sms(recipients)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._client() as client:
+            batch_results = await asyncio.gather(
+                *(self._send(client, semaphore, batch) for batch in batches)
+            )
+        return self.service.collect_bulk_results(entries, batches, batch_results)
+
+
+def dispatch_sms(recipients: List[Dict[str, str]], **kwargs) -> Dict:
+    """Run AsyncSMSDispatcher.dispatch on a fresh event loop (Celery workers are synchronous)"""
+    return asyncio.run(AsyncSMSDispatcher(**kwargs).dispatch(recipients))
@@ -10,12 +10,20 @@ This service handles all SMS communications including:
 
 import requests
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from utils.http_client import get_gateway_client
 
 logger = logging.getLogger(__name__)
 
 
+def batch_label(members: List[Tuple[int, str, str]]) -> str:
+    """How a request's recipients appear in the logs"""
+    return members[0][2] if len(members) == 1 else f"{len(members)} recipients"
+
+
 class SMSService:
     """SMS service using mnotify API"""
 
@@ -30,6 +38,11 @@ class SMSService:
             logger.error("MNOTIFY_API_KEY not configured in settings")
             raise ValueError("MNOTIFY_API_KEY is required for SMS service")
 
+        # Bulk sends keep up to SMS_MAX_CONCURRENCY connections busy
+        self.client = get_gateway_client(
+            "mnotify", self.base_url, pool_size=getattr(settings, "SMS_MAX_CONCURRENCY", 8)
+        )
+
     def send_single_sms(self, phone_number: str, message: str) -> Dict:
         """
         Send SMS to a single recipient
@@ -47,90 +60,149 @@ class SMSService:
         if not phone_number:
             return {"success": False, "error": "Invalid phone number"}
 
-        url = f"{self.base_url}/sms/quick?key={self.api_key}"
-
-        payload = {
-            "recipient[]": [phone_number],
-            "sender": self.sender_id,
-            "message": message,
-            "is_schedule": False,
-            "schedule_date": "",
-        }
+        return self._send(phone_number, [phone_number], message)
 
+    def _send(self, label: str, phone_numbers: List[str], message: str) -> Dict:
+        """Send one message to cleaned phone numbers in a single mnotify request"""
         try:
-            response = requests.post(url, data=payload, timeout=30)
+            response = self.client.post(
+                "/sms/quick",
+                params={"key": self.api_key},
+                data=self.build_payload(phone_numbers, message),
+            )
             response.raise_for_status()
 
-            result = response.json()
-
-            # mnotify response format: {"status": "success", "code": "2000", "message": "messages sent successfully"}
-            if result.get("code") == "2000":
-                logger.info(f"SMS sent successfully to {phone_number}")
-                return {
-                    "success": True,
-                    "message_id": result.get("summary", {}).get("_id"),
-                    "response": result,
-                }
-            else:
-                logger.error(f"SMS failed to {phone_number}: {result}")
-                return {
-                    "success": False,
-                    "error": result.get("message", "Unknown error"),
-                    "response": result,
-                }
+            return self.parse_response(label, response.json())
 
         except requests.exceptions.RequestException as e:
-            logger.error(f"SMS service error for {phone_number}: {str(e)}")
+            logger.error(f"SMS service error for {label}: {str(e)}")
             return {"success": False, "error": f"Network error: {str(e)}"}
         except Exception as e:
-            logger.error(f"Unexpected error sending SMS to {phone_number}: {str(e)}")
+            logger.error(f"Unexpected error sending SMS to {label}: {str(e)}")
             return {"success": False, "error": f"Unexpected error: {str(e)}"}
 
+    def build_payload(self, phone_numbers: List[str], message: str) -> Dict:
+        """Form data for one mnotify quick SMS request"""
+        return {
+            "recipient[]": phone_numbers,
+            "sender": self.sender_id,
+            "message": message,
+            "is_schedule": False,
+            "schedule_date": "",
+        }
+
+    @staticmethod
+    def parse_response(label: str, result: Dict) -> Dict:
+        """Turn an mnotify response body into a send result"""
+        # mnotify response format: {"status": "success", "code": "2000", "message": "messages sent successfully"}
+        if result.get("code") == "2000":
+            logger.info(f"SMS sent successfully to {label}")
+            return {
+                "success": True,
+                "message_id": result.get("summary", {}).get("_id"),
+                "response": result,
+            }
+        else:
+            logger.error(f"SMS failed to {label}: {result}")
+            return {
+                "success": False,
+                "error": result.get("message", "Unknown error"),
+                "response": result,
+            }
+
     def send_bulk_sms(self, recipients: List[Dict[str, str]]) -> Dict:
         """
         Send SMS to multiple recipients
 
+        Recipients sharing a message are sent together in multi-recipient
+        requests of up to SMS_BULK_CHUNK_SIZE numbers; personalised messages
+        are sent individually. Requests run concurrently, at most
+        SMS_MAX_CONCURRENCY at a time.
+
         Args:
             recipients: List of dicts with 'phone' and 'message' keys
 
         Returns:
-            dict: Summary of results
+            dict: Summary of results, one entry per recipient in input order
+        """
+        entries, batches = self.plan_bulk_sms(recipients)
+
+        def send_batch(batch):
+            message, members = batch
+            return self._send(batch_label(members), [cleaned for _, _, cleaned in members], message)
+
+        batch_results = []
+        if batches:
+            workers = min(getattr(settings, "SMS_MAX_CONCURRENCY", 8), len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                batch_results = list(executor.map(send_batch, batches))
+
+        return self.collect_bulk_results(entries, batches, batch_results)
+
+    def plan_bulk_sms(self, recipients: List[Dict[str, str]]) -> Tuple[List, List]:
+        """
+        Split recipients into requests
+
+        Returns:
+            tuple: (entries, batches). entries holds a result for each recipient
+            that cannot be sent and None for the rest; batches lists
+            (message, [(index, phone, cleaned phone)]) per request
         """
-        results = {"total": len(recipients), "success": 0, "failed": 0, "results": []}
+        entries = [None] * len(recipients)
 
-        for recipient in recipients:
+        # message -> [(index, phone, cleaned phone)] in input order
+        groups = OrderedDict()
+        for index, recipient in enumerate(recipients):
             phone = recipient.get("phone")
             message = recipient.get("message")
 
             if not phone or not message:
-                results["failed"] += 1
-                results["results"].append(
-                    {
-                        "phone": phone,
-                        "success": False,
-                        "error": "Missing phone or message",
-                    }
-                )
+                entries[index] = {
+                    "phone": phone,
+                    "success": False,
+                    "error": "Missing phone or message",
+                }
                 continue
 
-            result = self.send_single_sms(phone, message)
+            cleaned = self._clean_phone_number(phone)
+            if not cleaned:
+                entries[index] = {"phone": phone, "success": False, "error": "Invalid phone number"}
+                continue
 
-            if result["success"]:
-                results["success"] += 1
-            else:
-                results["failed"] += 1
+            groups.setdefault(message, []).append((index, phone, cleaned))
+
+        chunk_size = getattr(settings, "SMS_BULK_CHUNK_SIZE", 500)
+        batches = [
+            (message, members[start : start + chunk_size])
+            for message, members in groups.items()
+            for start in range(0, len(members), chunk_size)
+        ]
+        return entries, batches
 
-            results["results"].append(
-                {
+    @staticmethod
+    def collect_bulk_results(entries: List, batches: List, batch_results: List[Dict]) -> Dict:
+        """Summary of a bulk send, one result per recipient in input order"""
+        entries = list(entries)
+        for (message, members), result in zip(batches, batch_results):
+            for index, phone, _ in members:
+                entries[index] = {
                     "phone": phone,
                     "success": result["success"],
                     "error": result.get("error"),
                     "message_id": result.get("message_id"),
                 }
-            )
+
+        results = {"total": len(entries), "success": 0, "failed": 0, "results": []}
+        for entry in entries:
+            if entry["success"]:
+                results["success"] += 1
+            else:
+                results["failed"] += 1
+            results["results"].append(entry)
 
         logger.info(
-            f"Bulk SMS completed: {results['success']}/{results['total']} successful"
+            f"Bulk SMS completed: {results['success']}/{results['total']} successful "
+            f"in {len(batches)} request(s)"
         )
         return results
 
@@ -78,6 +78,27 @@ def send_bulk_sms_task(self, recipients: List[Dict[str, str]]) -> Dict[str, Any]
         raise self.retry(countdown=120, exc=exc)
 
 
+@shared_task(bind=True, max_retries=2)
+def dispatch_sms_batch_task(self, recipients: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Send a batch of SMS concurrently from one event loop (async)
+
+    Args:
+        recipients: List of dicts with 'phone' and 'message' keys
+
+    Returns:
+        dict: Summary of bulk SMS results
+    """
+    try:
+        from utils.sms_dispatcher import dispatch_sms
+
+        return dispatch_sms(recipients)
+
+    except Exception as exc:
+        logger.error(f"SMS dispatch task failed: {str(exc)}")
+        raise self.retry(countdown=120, exc=exc)
+
+
 @shared_task(bind=True, max_retries=3)
 def send_welcome_sms_task(self, user_id: str, user_data: dict) -> Dict[str, Any]:
     """
@@ -216,48 +237,88 @@ def send_daily_voting_reminders(self) -> Dict[str, Any]:
     Runs every day at 9 AM
     """
     try:
-        from elections.models import Election, Vote
-
-        # Get active elections (ongoing voting)
-        now = timezone.now()
-        active_elections = Election.objects.filter(
-            start_date__lte=now, end_date__gte=now, is_active=True
-        )
+        from elections.models import Election
+        from elections.notifications import start_voting_reminders
 
-        if not active_elections.exists():
+        if not Election.objects.filter(status="active").exists():
             logger.info("No active elections found for voting reminders")
             return {"success": True, "message": "No active elections"}
 
-        total_reminders = 0
+        job = start_voting_reminders()
+        logger.info(f"Started voting reminder job {job.id}")
+        return {"success": True, "job_id": str(job.id)}
 
-        for election in active_elections:
-            # Get users who haven't voted in this election
-            voted_user_ids = Vote.objects.filter(election=election).values_list(
-                "voter_id", flat=True
-            )
-
-            eligible_users = User.objects.filter(
-                is_active=True,
-                phone_number__isnull=False,
-            ).exclude(id__in=voted_user_ids)
+    except Exception as exc:
+        logger.error(f"Daily voting reminders task failed: {str(exc)}")
+        return {"success": False, "error": str(exc)}
 
-            # Send reminders in batches to avoid overwhelming the system
-            batch_size = 50
-            for i in range(0, eligible_users.count(), batch_size):
-                batch_users = eligible_users[i : i + batch_size]
 
-                for user in batch_users:
-                    # Schedule individual SMS tasks
-                    send_voting_reminder_task.delay(user.id, election.id)
-                    total_reminders += 1
+@shared_task(bind=True, max_retries=3)
+def plan_notification_job_task(self, job_id: str) -> Dict[str, Any]:
+    """
+    Split a notification job into batches and fan them out.
+    The batches run in parallel as a chord whose callback completes the job;
+    a redelivered task fans out the batches that are still pending.
+    """
+    from celery import chord
 
-        logger.info(f"Scheduled {total_reminders} voting reminder SMS tasks")
-        return {"success": True, "reminders_scheduled": total_reminders}
+    from elections.models import NotificationJob
+    from elections.notifications import plan_notification_job
 
+    try:
+        batch_ids = plan_notification_job(job_id)
     except Exception as exc:
-        logger.error(f"Daily voting reminders task failed: {str(exc)}")
+        logger.error(f"Planning notification job {job_id} failed: {str(exc)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=60, exc=exc)
+        NotificationJob.objects.filter(id=job_id).update(status="failed", error=str(exc))
         return {"success": False, "error": str(exc)}
 
+    if batch_ids is None:
+        # The job already finished
+        return {"success": True, "job_id": job_id, "batches": 0}
+    if not batch_ids:
+        finish_notification_job_task.delay(job_id)
+    else:
+        chord(send_notification_batch_task.s(batch_id) for batch_id in batch_ids)(
+            finish_notification_job_task.si(job_id)
+        )
+    return {"success": True, "job_id": job_id, "batches": len(batch_ids)}
+
+
+@shared_task(bind=True, max_retries=3)
+def send_notification_batch_task(self, batch_id: int) -> Dict[str, Any]:
+    """
+    Send one notification batch; retries resend only to undelivered recipients.
+    Never fails the chord: the last attempt's outcome is returned.
+    """
+    from elections.notifications import BatchInProgress, send_notification_batch
+
+    try:
+        result = send_notification_batch(batch_id)
+    except BatchInProgress as exc:
+        # Sent by an earlier fan-out of the job; check again once it is done
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=60, exc=exc)
+        return {"batch_id": batch_id, "success": False, "error": str(exc)}
+    except Exception as exc:
+        logger.error(f"Notification batch {batch_id} failed: {str(exc)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=60, exc=exc)
+        return {"batch_id": batch_id, "success": False, "error": str(exc)}
+
+    if result["failed"] and self.request.retries < self.max_retries:
+        raise self.retry(countdown=60)
+    return {"success": not result["failed"], **result}
+
+
+@shared_task(bind=True)
+def finish_notification_job_task(self, job_id: str) -> Dict[str, Any]:
+    """Complete a notification job after its batches ran"""
+    from elections.notifications import finish_notification_job
+
+    return {"success": True, **finish_notification_job(job_id)}
+
 
 # Periodic task to manage election lifecycle based on start/end times
 @shared_task(bind=True)
@@ -267,19 +328,55 @@ def update_election_statuses(self) -> Dict[str, Any]:
     Runs periodically via Celery Beat.
     """
     try:
+        from elections.ballot_definition import (
+            invalidate_ballot_definition,
+            warm_ballot_definition,
+        )
+        from elections.counters import refresh_election_counters
         from elections.models import Election
+        from elections.tally import materialize_election_tally
+        from elections.voter_state import invalidate_active_elections
 
         now = timezone.now()
 
         # Activate elections that are scheduled to start
         to_activate = Election.objects.filter(status="upcoming", start_date__lte=now)
-        activated = to_activate.update(status="active") if to_activate.exists() else 0
+        activated_ids = list(to_activate.values_list("id", flat=True))
+        activated = (
+            Election.objects.filter(id__in=activated_ids).update(status="active")
+            if activated_ids
+            else 0
+        )
+
+        # The ballot is fixed from here on; build it once for every voter to share
+        for election_id in activated_ids:
+            try:
+                warm_ballot_definition(election_id)
+            except Exception as exc:
+                logger.error(f"Ballot caching failed for election {election_id}: {str(exc)}")
 
         # Complete elections that have ended
         to_complete = Election.objects.filter(status="active", end_date__lt=now)
-        completed = to_complete.update(status="completed") if to_complete.exists() else 0
+        completed_ids = list(to_complete.values_list("id", flat=True))
+        completed = (
+            Election.objects.filter(id__in=completed_ids).update(status="completed")
+            if completed_ids
+            else 0
+        )
+
+        # Votes are final now; store the tallies once instead of decrypting on every read
+        for election_id in completed_ids:
+            # queryset.update() skips the save signals that normally drop the cached ballot
+            invalidate_ballot_definition(election_id)
+            try:
+                refresh_election_counters(election_id)
+                materialize_election_tally(election_id)
+            except Exception as exc:
+                logger.error(f"Tally materialization failed for election {election_id}: {str(exc)}")
 
         if activated or completed:
+            # queryset.update() skips the save signals, so refresh the cached election set
+            invalidate_active_elections()
             logger.info(
                 f"Election status update: activated={activated}, completed={completed}"
             )
@@ -291,31 +388,91 @@ def update_election_statuses(self) -> Dict[str, Any]:
         return {"success": False, "error": str(exc)}
 
 
-@shared_task(bind=True, max_retries=3)
-def send_bulk_results_published_sms_task(self, election_id: str, user_ids: list) -> Dict[str, Any]:
-    """Send 'results published' SMS to a list of users."""
+@shared_task(bind=True)
+def reconcile_vote_counters(self) -> Dict[str, Any]:
+    """
+    Overwrite the cached vote counters of active elections with database counts.
+    Runs periodically via Celery Beat.
+    """
     try:
+        from elections.counters import refresh_election_counters
         from elections.models import Election
-        election = Election.objects.get(id=election_id)
-        users = User.objects.filter(id__in=user_ids, is_active=True)
-        recipients = []
-        for u in users:
-            if not u.phone_number:
-                continue
-            message = SMSMessageTemplates.results_published({
-                "title": election.title,
-                "results_url": f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}/elections/{election.id}/results",
-            }, {
-                "first_name": u.first_name or u.username,
-            })
-            recipients.append({"phone": u.phone_number, "message": message})
-
-        if not recipients:
-            return {"success": True, "total": 0}
 
-        sms_service = SMSService()
-        result = sms_service.send_bulk_sms(recipients)
-        return result
+        election_ids = list(Election.objects.filter(status="active").values_list("id", flat=True))
+        for election_id in election_ids:
+            refresh_election_counters(election_id)
+        return {"success": True, "reconciled": len(election_ids)}
+
     except Exception as exc:
-        logger.error(f"send_bulk_results_published_sms_task failed: {str(exc)}")
-        raise self.retry(countdown=120, exc=exc)
+        logger.error(f"reconcile_vote_counters failed: {str(exc)}")
+        return {"success": False, "error": str(exc)}
+
+
+@shared_task(bind=True)
+def flush_audit_log_task(self) -> Dict[str, Any]:
+    """
+    Write queued audit entries to AuditLog.
+    Runs periodically via Celery Beat and whenever a full batch is queued.
+    """
+    try:
+        from elections.audit import flush_audit_log
+
+        return {"success": True, "written": flush_audit_log()}
+
+    except Exception as exc:
+        logger.error(f"flush_audit_log_task failed: {str(exc)}")
+        return {"success": False, "error": str(exc)}
+
+
+@shared_task(bind=True)
+def flush_voting_sessions_task(self) -> Dict[str, Any]:
+    """
+    Write cached voting session records to VotingSession.
+    Runs periodically via Celery Beat.
+    """
+    try:
+        from elections.session_tracking import flush_voting_sessions
+
+        return {"success": True, "written": flush_voting_sessions()}
+
+    except Exception as exc:
+        logger.error(f"flush_voting_sessions_task failed: {str(exc)}")
+        return {"success": False, "error": str(exc)}
+
+
+@shared_task(bind=True)
+def checkpoint_audit_chain(self) -> Dict[str, Any]:
+    """
+    Verify audit entries added since the last checkpoint and record a new one.
+    Runs periodically via Celery Beat.
+    """
+    try:
+        from elections.audit_chain import verify_audit_chain
+
+        summary = verify_audit_chain()
+        return {"success": not summary["failure_count"], **summary}
+
+    except Exception as exc:
+        logger.error(f"checkpoint_audit_chain failed: {str(exc)}")
+        return {"success": False, "error": str(exc)}
+
+
+@shared_task(bind=True)
+def verify_election_votes_task(self, election_id: str, requested_by: str = None) -> Dict[str, Any]:
+    """Re-verify the hash and signature of every vote in an election and audit the outcome."""
+    try:
+        from elections.audit import log_audit_event
+        from elections.integrity import verify_election_votes
+
+        summary = verify_election_votes(election_id)
+        log_audit_event(
+            "vote_verified",
+            "election",
+            election_id,
+            user_id=requested_by,
+            details=summary,
+        )
+        return {"success": True, **summary}
+    except Exception as exc:
+        logger.error(f"verify_election_votes_task failed for election {election_id}: {str(exc)}")
+        return {"success": False, "error": str(exc)}
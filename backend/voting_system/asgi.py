@@ -3,6 +3,12 @@ ASGI config for voting_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live turnout stream (elections.views.election_turnout) needs an ASGI
+server; under gunicorn's WSGI workers it only answers with the current
+snapshot. Serve it with uvicorn, e.g.:
+
+    uvicorn voting_system.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
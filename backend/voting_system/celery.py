@@ -42,12 +42,38 @@ app.conf.beat_schedule = {
         "schedule": 60.0,
         "options": {"queue": "default"},
     },
+    # Correct drift in the cached vote counters of active elections
+    "reconcile-vote-counters": {
+        "task": "utils.tasks.reconcile_vote_counters",
+        "schedule": 60.0 * 5,
+        "options": {"queue": "default"},
+    },
+    # Write queued audit entries (a full batch also triggers a flush)
+    "flush-audit-log": {
+        "task": "utils.tasks.flush_audit_log_task",
+        "schedule": 5.0,
+        "options": {"queue": "default"},
+    },
+    # Open and flag voting sessions recorded by VotingSessionMiddleware
+    "flush-voting-sessions": {
+        "task": "utils.tasks.flush_voting_sessions_task",
+        "schedule": 30.0,
+        "options": {"queue": "default"},
+    },
+    # Verify new audit entries and checkpoint the hash chain hourly
+    "checkpoint-audit-chain": {
+        "task": "utils.tasks.checkpoint_audit_chain",
+        "schedule": 60.0 * 60,
+        "options": {"queue": "default"},
+    },
 }
 
 # Task routing
 app.conf.task_routes = {
     "utils.tasks.send_single_sms_task": {"queue": "sms_queue"},
     "utils.tasks.send_bulk_sms_task": {"queue": "sms_queue"},
+    "utils.tasks.dispatch_sms_batch_task": {"queue": "sms_queue"},
+    "utils.tasks.send_notification_batch_task": {"queue": "sms_queue"},
     "utils.tasks.send_welcome_sms_task": {"queue": "sms_queue"},
     "utils.tasks.send_password_reset_sms_task": {"queue": "sms_queue"},
 }
@@ -64,7 +64,7 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
-    # "elections.middleware.SecurityMiddleware",  # Rate limiting and audit logging
+    "elections.middleware.SecurityMiddleware",  # Rate limiting and audit logging
     "elections.middleware.VotingSessionMiddleware",  # Session tracking
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -228,6 +228,24 @@ PAYSTACK_SECRET_KEY = config("PAYSTACK_SECRET_KEY", default="")
 MNOTIFY_API_KEY = config("MNOTIFY_API_KEY", default="")
 MNOTIFY_SENDER_ID = config("MNOTIFY_SENDER_ID", default="GMSA")
 MNOTIFY_BASE_URL = config("MNOTIFY_BASE_URL", default="https://api.mnotify.com/api")
+# Bulk SMS: numbers per multi-recipient request and concurrent requests per send
+SMS_BULK_CHUNK_SIZE = config("SMS_BULK_CHUNK_SIZE", default=500, cast=int)
+SMS_MAX_CONCURRENCY = config("SMS_MAX_CONCURRENCY", default=8, cast=int)
+# Async dispatcher (utils.sms_dispatcher): requests in flight and request starts per second
+SMS_DISPATCH_CONCURRENCY = config("SMS_DISPATCH_CONCURRENCY", default=50, cast=int)
+SMS_DISPATCH_RATE = config("SMS_DISPATCH_RATE", default=200, cast=float)
+# Recipients per batch task of a bulk notification job (see elections.notifications)
+NOTIFICATION_BATCH_SIZE = config("NOTIFICATION_BATCH_SIZE", default=500, cast=int)
+
+# External gateway calls (see utils.http_client): (connect, read) timeout in seconds,
+# retries of failed connections and idempotent requests, and connections per host
+GATEWAY_TIMEOUT = (
+    config("GATEWAY_CONNECT_TIMEOUT", default=5, cast=float),
+    config("GATEWAY_READ_TIMEOUT", default=30, cast=float),
+)
+GATEWAY_MAX_RETRIES = config("GATEWAY_MAX_RETRIES", default=3, cast=int)
+GATEWAY_BACKOFF_FACTOR = config("GATEWAY_BACKOFF_FACTOR", default=0.5, cast=float)
+GATEWAY_POOL_SIZE = config("GATEWAY_POOL_SIZE", default=10, cast=int)
 
 # Frontend URL for SMS links
 FRONTEND_URL = config("FRONTEND_URL", default="http://localhost:3000")
@@ -300,6 +318,35 @@ VOTE_HASH_SECRET = config("VOTE_HASH_SECRET", default="voting-hash-secret-key-20
 VOTER_ANONYMIZATION_SALT = config(
     "VOTER_ANONYMIZATION_SALT", default="gmsa-voter-salt-2024"
 )
+# RSA private key used to sign votes: a PEM file path (preferred) or the inline PEM.
+# Generated per process when neither is set, so stored signatures cannot be re-verified.
+VOTE_SIGNING_KEY_PATH = config("VOTE_SIGNING_KEY_PATH", default="")
+VOTE_SIGNING_PRIVATE_KEY = config("VOTE_SIGNING_PRIVATE_KEY", default="")
+# Scheme for new vote signatures: "rsa-pss-sha256" or "ed25519" (much faster to sign).
+# Existing votes keep verifying with the scheme stored on them, so keep the RSA key configured.
+VOTE_SIGNATURE_ALGORITHM = config("VOTE_SIGNATURE_ALGORITHM", default="rsa-pss-sha256")
+VOTE_ED25519_KEY_PATH = config("VOTE_ED25519_KEY_PATH", default="")
+VOTE_ED25519_PRIVATE_KEY = config("VOTE_ED25519_PRIVATE_KEY", default="")
+
+# Bulk vote decryption (tallying, publishing): worker processes and rows per chunk.
+# Defaults to one worker per CPU core.
+VOTE_DECRYPT_WORKERS = config("VOTE_DECRYPT_WORKERS", default=0, cast=int) or None
+VOTE_DECRYPT_CHUNK_SIZE = config("VOTE_DECRYPT_CHUNK_SIZE", default=500, cast=int)
+
+# Seconds a cached ballot definition is kept in the shared cache (invalidated on edits)
+BALLOT_CACHE_TIMEOUT = config("BALLOT_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int)
+# Seconds a user's cached voted-state per election is kept (written through on each ballot)
+VOTER_STATE_CACHE_TIMEOUT = config("VOTER_STATE_CACHE_TIMEOUT", default=60 * 60 * 6, cast=int)
+# (voter, election) entries of derived anonymous tokens kept in each process's memory
+VOTER_TOKEN_CACHE_SIZE = config("VOTER_TOKEN_CACHE_SIZE", default=10000, cast=int)
+# Seconds the cached per-election vote counters live without a write or reconciliation
+VOTE_COUNTER_TIMEOUT = config("VOTE_COUNTER_TIMEOUT", default=60 * 60 * 24 * 7, cast=int)
+# Live turnout feed: seconds between counter reads, minutes of per-minute history,
+# seconds a long-poll waits for a change (ASGI only) and between keep-alives on the event stream
+LIVE_TURNOUT_INTERVAL = config("LIVE_TURNOUT_INTERVAL", default=2, cast=float)
+LIVE_TURNOUT_MINUTES = config("LIVE_TURNOUT_MINUTES", default=60, cast=int)
+LIVE_TURNOUT_POLL_TIMEOUT = config("LIVE_TURNOUT_POLL_TIMEOUT", default=25, cast=int)
+LIVE_TURNOUT_HEARTBEAT = config("LIVE_TURNOUT_HEARTBEAT", default=15, cast=int)
 
 # Security settings
 SECURE_SSL_REDIRECT = config("SECURE_SSL_REDIRECT", default=False, cast=bool)
@@ -344,6 +391,26 @@ CACHES = {
     },
 }
 
+# Audit entries are queued and written in batches of AUDIT_FLUSH_BATCH_SIZE, at least
+# every AUDIT_FLUSH_INTERVAL seconds (see elections.audit)
+AUDIT_FLUSH_BATCH_SIZE = config("AUDIT_FLUSH_BATCH_SIZE", default=200, cast=int)
+AUDIT_FLUSH_INTERVAL = config("AUDIT_FLUSH_INTERVAL", default=5, cast=float)
+# Audit entries read per query when verifying the hash chain
+AUDIT_VERIFY_CHUNK_SIZE = config("AUDIT_VERIFY_CHUNK_SIZE", default=1000, cast=int)
+
+# Requests per user (or per client IP when unauthenticated): {path prefix: (max_requests,
+# window_seconds)}; the longest matching prefix applies, other paths get RATE_LIMIT_DEFAULT
+RATE_LIMITS = {
+    "/api/elections/vote/": (10, 60),
+    "/api/accounts/login/": (5, 300),
+    "/api/accounts/jwt/login/": (5, 300),
+    "/api/accounts/register/": (3, 3600),
+}
+RATE_LIMIT_DEFAULT = (60, 60)
+# Reverse proxies in front of the app that append to X-Forwarded-For; the client
+# address is read from the entry the outermost of them added (0: use REMOTE_ADDR)
+TRUSTED_PROXY_COUNT = config("TRUSTED_PROXY_COUNT", default=0, cast=int)
+
 # Voting security defaults
 VOTING_SECURITY_DEFAULTS = {
     "ENABLE_VOTE_ENCRYPTION": True,